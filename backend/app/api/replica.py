@@ -0,0 +1,118 @@
+import asyncio
+import os
+import urllib.error
+import urllib.request
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session
+from app.api.simulation import get_events
+from app.db.database import get_db
+from app.db.models import SimulationHistory
+from app.core.response_cache import ResponseCache
+from app.core.shm import SnapshotReader, SnapshotUnavailable
+from app.core import spatial
+
+# Read replica of /api/simulation (SWORM_ROLE=replica): serves the engine process's shared
+# memory snapshot, so any number of uvicorn workers can answer reads for one world
+router = APIRouter()
+
+reader = SnapshotReader(os.getenv("SWORM_SHM_NAME", "sworm_world"))
+response_cache = ResponseCache()
+# Control requests are forwarded to the engine process when its URL is known
+ENGINE_URL = os.getenv("SWORM_ENGINE_URL")
+
+STATE_KEY = ("/api/simulation/state", ())
+
+def _version() -> str:
+    try:
+        return reader.version()
+    except SnapshotUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+def _respond(etag: str, body) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/state")
+async def get_state(request: Request):
+    # Same key and ETag as the engine process, so clients can revalidate against any worker
+    cached = response_cache.lookup(STATE_KEY, _version(), request.headers.get("if-none-match"))
+    if cached is None:
+        try:
+            version, body = reader.read(lambda meta, body, columns: (meta["version"], bytes(body)))
+        except SnapshotUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        cached = response_cache.store(STATE_KEY, version, body), body
+    return _respond(*cached)
+
+@router.get("/history")
+async def get_history(request: Request, db: Session = Depends(get_db)):
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    build = lambda: jsonable_encoder(db.query(SimulationHistory).order_by(SimulationHistory.tick).all())
+    return _respond(*response_cache.get(key, _version(), build, request.headers.get("if-none-match")))
+
+router.add_api_route("/events", get_events, methods=["GET"])
+
+@router.get("/map")
+async def get_map(
+    request: Request,
+    x0: float = 0.0, y0: float = 0.0, x1: float = 800.0, y1: float = 600.0,
+    level: Optional[int] = Query(None, ge=0, le=9),
+    cols: Optional[int] = Query(None, ge=1, le=512),
+    rows: Optional[int] = Query(None, ge=1, le=512),
+    max_agents: int = Query(500, ge=0, le=20000)
+):
+    """Same as the engine's /map, aggregated straight from the shared citizen columns (no ids or landmarks)."""
+    if x1 <= x0 or y1 <= y0:
+        raise HTTPException(status_code=400, detail="Empty viewport")
+    viewport = (x0, y0, x1, y1)
+    cols, rows = spatial.grid_shape(viewport, level, cols, rows)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+    def build(meta, body, columns):
+        return dict(spatial.aggregate(columns, viewport, cols, rows, max_agents=max_agents), tick=meta["tick"])
+    return _respond(*response_cache.get(key, _version(), lambda: reader.read(build), request.headers.get("if-none-match")))
+
+@router.get("/replica")
+async def get_replica():
+    """Snapshot this worker serves (version, tick, age) and its seqlock read/retry counters."""
+    try:
+        meta = reader.read(lambda meta, body, columns: meta)
+    except SnapshotUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return dict(reader.stats(), version=meta["version"], tick=meta["tick"], citizens=meta["rows"],
+                published_at=meta["published_at"], cache=response_cache.stats())
+
+def _forward(path: str) -> Response:
+    request = urllib.request.Request(f"{ENGINE_URL.rstrip('/')}/api/simulation{path}", data=b"", method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return Response(content=response.read(), status_code=response.status, media_type="application/json")
+    except urllib.error.HTTPError as e:
+        return Response(content=e.read(), status_code=e.code, media_type="application/json")
+    except urllib.error.URLError as e:
+        raise HTTPException(status_code=502, detail=f"Engine process unreachable: {e.reason}")
+
+async def _control(path: str) -> Response:
+    if not ENGINE_URL:
+        raise HTTPException(status_code=409, detail="Read replica: send control requests to the engine process")
+    return await asyncio.to_thread(_forward, path)
+
+@router.post("/start")
+async def start_simulation():
+    return await _control("/start")
+
+@router.post("/stop")
+async def stop_simulation():
+    return await _control("/stop")
+
+@router.post("/tick")
+async def advance_tick():
+    return await _control("/tick")
+
+@router.post("/election")
+async def force_election():
+    return await _control("/election")
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Dict, Optional
+from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from app.core.sessions import session_manager
+
+router = APIRouter()
+
+async def _run(session_id: str, fn):
+    """Runs `fn(engine)` on the session's worker; responses are encoded there, before the next tick can touch the world."""
+    try:
+        future = session_manager.submit(session_id, lambda engine: jsonable_encoder(fn(engine)))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return await asyncio.wrap_future(future)
+
+@router.post("")
+async def create_session(config: Optional[Dict] = Body(None)):
+    """
+    Creates an independent world. Options: scenario, num_states, citizens_per_state,
+    citizen_brain, leader_brain, election_method, election_challengers, election_challenger_noise,
+    influence_mode, social_topology, prioritized_replay, warm_start_leaders, tick_budget, phase_config,
+    lod, lod_region_size.
+    """
+    try:
+        future = session_manager.create(config)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await asyncio.wrap_future(future)
+
+@router.get("")
+async def list_sessions():
+    return {"manager": session_manager.stats(), "sessions": session_manager.list()}
+
+@router.delete("/{session_id}")
+async def delete_session(session_id: str):
+    try:
+        session_manager.delete(session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    return {"status": "deleted"}
+
+@router.get("/{session_id}")
+async def get_session(session_id: str):
+    try:
+        return session_manager.get(session_id).stats()
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+
+@router.post("/{session_id}/tick")
+async def advance_session(session_id: str, steps: int = Query(1, ge=1)):
+    """Advances up to `steps` ticks; `truncated` is set when the per-request CPU budget ran out first."""
+    try:
+        future = session_manager.tick(session_id, steps, encode=jsonable_encoder)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown session: {session_id}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await asyncio.wrap_future(future)
+
+@router.get("/{session_id}/state")
+async def get_session_state(session_id: str):
+    return await _run(session_id, lambda engine: engine.get_state())
+
+@router.post("/{session_id}/election")
+async def force_session_election(session_id: str):
+    def elect(engine):
+        engine.run_elections()
+        return {"status": "election_triggered", "results": list(engine.last_election_results)}
+    return await _run(session_id, elect)
+
+@router.get("/{session_id}/brain")
+async def get_session_brain(session_id: str):
+    return await _run(session_id, lambda engine: engine.get_brain_snapshot())
+
+@router.get("/{session_id}/scheduler")
+async def get_session_scheduler(session_id: str):
+    return await _run(session_id, lambda engine: engine.scheduler.stats())
@@ -1,12 +1,84 @@
-from fastapi import APIRouter
-from app.core.engine import simulation_instance
+import json
+import os
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from app.core.engine import simulation_instance, log
+from app.core.response_cache import ResponseCache
+from app.core.shm import SnapshotWriter
+from app.core import spatial, wire
+from app.models.agents import AgentType
 from app.db.database import get_db
-from app.db.models import SimulationHistory
+from app.db.models import SimulationHistory, SimulationEvent, DistributionHistory
 from sqlalchemy.orm import Session
-from fastapi import Depends
+from fastapi import Depends, Query
 
 router = APIRouter()
 
+# Encoded /state and /history bodies per world version; repeat polls are a lookup or a 304
+response_cache = ResponseCache()
+# Replica workers import this module for shared handlers but run no engine
+if simulation_instance is not None:
+    simulation_instance.memory.register("response_cache", response_cache.stats, response_cache.trim)
+
+def _cached_response(request: Request, build, fmt: str = "json") -> Response:
+    """JSON responses cache `build()` JSON-encoded; columnar formats cache the bytes `build()` returns."""
+    query = tuple(sorted(request.query_params.multi_items()))
+    key = (request.url.path, query) if fmt == "json" else (request.url.path, fmt, query)
+    if fmt == "json":
+        etag, body = response_cache.get(key, simulation_instance.version, lambda: jsonable_encoder(build()),
+                                        request.headers.get("if-none-match"))
+    else:
+        etag, body = response_cache.get(key, simulation_instance.version, build,
+                                        request.headers.get("if-none-match"), encode=lambda body: body)
+    # no-cache: browsers keep the body but revalidate every poll with If-None-Match
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+    if body is None:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=wire.FORMATS[fmt], headers=headers)
+
+def _negotiate(request: Request, format: Optional[str], fields: Optional[str] = None):
+    """(format, agent field projection) from ?format= / Accept and ?fields=."""
+    try:
+        return wire.negotiate(request.headers.get("accept"), format), wire.projection(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=406 if format and format not in wire.FORMATS else 400, detail=str(e))
+
+def _state_body(state: Dict, fmt: str, fields: Optional[List[str]]):
+    """
+    JSON: the state with agents projected to `fields`. Arrow/MessagePack: agents (and LOD cohort
+    members) as columns, the rest of the state as metadata.
+    """
+    if fmt == "json":
+        if fields is None:
+            return state
+        include = {"id"} | {"ideology" if f.startswith("ideology_") else f for f in fields}
+        return dict(state, agents=[a.model_dump(include=include) for a in state["agents"]])
+    lod = simulation_instance.lod
+    columns = wire.agent_columns(state["agents"], lod.cohorts.values() if lod else (), fields)
+    return wire.encode(fmt, "agents", columns, jsonable_encoder({k: v for k, v in state.items() if k != "agents"}))
+
+# Engine process of a multi-worker deployment: every world change is published to shared memory,
+# where read replicas (SWORM_ROLE=replica, uvicorn --workers N) serve it
+publisher = SnapshotWriter(
+    os.getenv("SWORM_SHM_NAME", "sworm_world"), size=int(os.getenv("SWORM_SHM_BYTES", str(64 * 1024 * 1024)))
+) if os.getenv("SWORM_SHM_PUBLISH") == "1" else None
+
+STATE_KEY = ("/api/simulation/state", ())
+
+def _publish():
+    if not publisher:
+        return
+    version = simulation_instance.version
+    # Shares the encoded /state body with the response cache
+    _, body = response_cache.get(STATE_KEY, version, lambda: jsonable_encoder(simulation_instance.get_state()))
+    if body is None or not publisher.publish(version, simulation_instance.scheduler.current_tick, body,
+                                             [s.id for s in simulation_instance.nation.states],
+                                             [a for a in simulation_instance.agents.values() if a.type == AgentType.CITIZEN]):
+        log.error("shm", "World snapshot %s was not published", version)
+
+_publish()
+
 @router.post("/start")
 async def start_simulation():
     simulation_instance.start()
@@ -18,26 +90,226 @@ async def stop_simulation():
     return {"status": "stopped"}
 
 @router.post("/tick")
-async def advance_tick():
+async def advance_tick(request: Request, format: Optional[str] = None, fields: Optional[str] = None):
+    """Advances one tick and returns the new state (negotiated like GET /state)."""
+    fmt, projection = _negotiate(request, format, fields)
     state = simulation_instance.advance()
-    return state
+    _publish()
+    body = _state_body(state, fmt, projection)
+    return body if fmt == "json" else Response(content=body, media_type=wire.FORMATS[fmt])
 
 @router.post("/election")
 async def force_election():
     simulation_instance.run_elections()
-    return {"status": "election_triggered", "results": simulation_instance.last_election_results}
+    simulation_instance.flush_events()
+    _publish()
+    return {"status": "election_triggered", "results": list(simulation_instance.last_election_results)}
 
 @router.get("/state")
-async def get_state():
-    return simulation_instance.get_state()
+async def get_state(request: Request, format: Optional[str] = None, fields: Optional[str] = None):
+    """
+    World state. `Accept: application/vnd.apache.arrow.stream` or `application/msgpack` (or
+    ?format=arrow|msgpack) returns the agents as columns; ?fields=wealth,trust_score,x,y projects
+    the agent fields in every format (id is always included).
+    """
+    fmt, projection = _negotiate(request, format, fields)
+    return _cached_response(request, lambda: _state_body(simulation_instance.get_state(), fmt, projection), fmt)
+@router.get("/map")
+async def get_map(
+    request: Request,
+    x0: float = 0.0, y0: float = 0.0, x1: float = 800.0, y1: float = 600.0,
+    level: Optional[int] = Query(None, ge=0, le=9),
+    cols: Optional[int] = Query(None, ge=1, le=512),
+    rows: Optional[int] = Query(None, ge=1, le=512),
+    max_agents: int = Query(500, ge=0, le=20000)
+):
+    """
+    Citizens over a viewport, binned into a grid (quadtree `level` -> 2^level cells per side,
+    or explicit cols/rows) with per-cell counts and mean trust/wealth/happiness/ideology.
+    Viewports holding at most `max_agents` citizens return the individual citizens.
+    """
+    if x1 <= x0 or y1 <= y0:
+        raise HTTPException(status_code=400, detail="Empty viewport")
+    cols, rows = spatial.grid_shape((x0, y0, x1, y1), level, cols, rows)
+    return _cached_response(request, lambda: simulation_instance.get_map((x0, y0, x1, y1), cols, rows, max_agents))
+
 @router.get("/brain")
 async def get_brain():
-    return simulation_instance.economy_service.brain.q_table
+    return simulation_instance.get_brain_snapshot()
+
+@router.get("/scheduler")
+async def get_scheduler():
+    """Tick phases with their cadence and per-phase run/deferral counts and timings."""
+    return simulation_instance.scheduler.stats()
+
+@router.post("/scheduler/{phase}")
+async def configure_phase(
+    phase: str,
+    period: Optional[int] = Query(None, ge=1),
+    offset: Optional[int] = Query(None, ge=0),
+    priority: Optional[int] = None,
+    shards: Optional[int] = Query(None, ge=1),
+    enabled: Optional[bool] = None
+):
+    """
+    Retunes a phase at runtime (e.g. run social every 2 ticks, media on 1/4 of citizens per tick).
+    Only phases listed as `shardable` in GET /scheduler accept shards > 1.
+    """
+    if phase not in simulation_instance.scheduler.phases:
+        raise HTTPException(status_code=404, detail=f"Unknown phase: {phase}")
+    try:
+        updated = simulation_instance.scheduler.configure(
+            phase, period=period, offset=offset, priority=priority, shards=shards, enabled=enabled
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {phase: updated.stats()}
+
+@router.get("/lod")
+async def get_lod():
+    """Level-of-detail cohorts (collapsed citizens per state) and the current focus."""
+    if not simulation_instance.lod:
+        raise HTTPException(status_code=404, detail="LOD mode is disabled (SWORM_LOD=1)")
+    return simulation_instance.lod.stats()
+
+@router.post("/lod/focus")
+async def focus_region(x0: float, y0: float, x1: float, y1: float):
+    """Zoom into a region: its cohorts are re-materialized and it stays individually simulated."""
+    if not simulation_instance.lod:
+        raise HTTPException(status_code=404, detail="LOD mode is disabled (SWORM_LOD=1)")
+    materialized = simulation_instance.focus_region(x0, y0, x1, y1)
+    _publish()
+    return {"materialized": materialized}
+
+@router.delete("/lod/focus")
+async def clear_focus():
+    simulation_instance.clear_focus()
+    _publish()
+    return {"status": "focus_cleared"}
+
+@router.get("/influence/error")
+async def get_mean_field_error(cell_size: Optional[float] = Query(None, gt=0)):
+    """
+    Mean-field accuracy on the current citizens: MAE/RMSE/max of the grid neighbour means against
+    the exact radius model (sampled above 2000 citizens) and both timings. `cell_size` evaluates
+    another grid resolution without changing the running one.
+    """
+    if not simulation_instance.social_service.mean_field:
+        raise HTTPException(status_code=404, detail="Mean-field influence is disabled (SWORM_INFLUENCE_MODE=mean_field)")
+    return simulation_instance.social_service.mean_field_error(list(simulation_instance.agents.values()), cell_size)
+
+@router.get("/memory")
+async def get_memory(allocations: bool = False):
+    """
+    Bytes per subsystem (agents, policies, replay buffers, event feed, DB session, ...), process RSS,
+    budgets and recent enforcement actions. With SWORM_TRACEMALLOC set, `allocations=true` adds the
+    top allocation sites (slow). Runs on the event loop, like /tick, so the engine is not mutated mid-walk.
+    """
+    return simulation_instance.memory.report(allocations)
+
+@router.get("/cache")
+async def get_cache():
+    """Response cache entries and hit/miss/304 counters."""
+    stats = dict(response_cache.stats(), version=simulation_instance.version)
+    if publisher:
+        stats["shm"] = {"segment": publisher.name, "publishes": publisher.publishes, "skipped": publisher.skipped}
+    return stats
+
+@router.get("/logging")
+async def get_logging():
+    """Per-category sampling rates and emitted/suppressed event counters."""
+    return log.stats()
 
 @router.get("/history")
-async def get_history(db: Session = Depends(get_db)):
+async def get_history(request: Request, format: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Returns the full history of metrics (as columns for Arrow/MessagePack, see /state).
     """
-    Returns the full history of metrics.
+    fmt, _ = _negotiate(request, format)
+    rows = lambda: db.query(SimulationHistory).order_by(SimulationHistory.tick).all()
+    # History only grows when the engine ticks, so it shares the world version
+    if fmt == "json":
+        return _cached_response(request, rows)
+    return _cached_response(request, lambda: wire.encode(fmt, "history", wire.row_columns(rows(), SimulationHistory), {}), fmt)
+
+@router.get("/distribution")
+async def get_distribution(state_id: Optional[str] = None):
     """
-    history = db.query(SimulationHistory).order_by(SimulationHistory.tick).all()
-    return history
+    Current wealth/trust/happiness histograms per state and nationally, with count, mean,
+    Gini and p10/p50/p90 each. Bin edges are listed once per metric.
+    """
+    simulation_instance.distribution_metrics()
+    if state_id and state_id not in simulation_instance.distribution.by_state:
+        raise HTTPException(status_code=404, detail=f"Unknown state: {state_id}")
+    return simulation_instance.distribution.to_dict(state_id)
+
+@router.get("/distribution/history")
+async def get_distribution_history(
+    metric: str = "wealth",
+    state_id: Optional[str] = None,
+    tick_from: Optional[int] = None,
+    tick_to: Optional[int] = None,
+    histograms: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Persisted distribution summaries over time (national unless state_id is given)."""
+    query = db.query(DistributionHistory).filter(DistributionHistory.metric == metric)
+    query = query.filter(DistributionHistory.state_id == state_id if state_id else DistributionHistory.state_id.is_(None))
+    if tick_from is not None:
+        query = query.filter(DistributionHistory.tick >= tick_from)
+    if tick_to is not None:
+        query = query.filter(DistributionHistory.tick <= tick_to)
+    return [
+        dict(
+            tick=row.tick, count=row.count, mean=row.mean, gini=row.gini, p10=row.p10, p50=row.p50, p90=row.p90,
+            **({"histogram": json.loads(row.histogram)} if histograms else {})
+        )
+        for row in query.order_by(DistributionHistory.tick).all()
+    ]
+
+@router.get("/events")
+async def get_events(
+    event_type: Optional[str] = None,
+    state_id: Optional[str] = None,
+    tick_from: Optional[int] = None,
+    tick_to: Optional[int] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    Paginated event log (newest first), filterable by type, state and tick range.
+    Types: election, fired, turnover, narrative_warfare, world_event, social_feedback.
+    """
+    query = db.query(SimulationEvent)
+    if event_type:
+        query = query.filter(SimulationEvent.event_type == event_type)
+    if state_id:
+        query = query.filter(SimulationEvent.state_id == state_id)
+    if tick_from is not None:
+        query = query.filter(SimulationEvent.tick >= tick_from)
+    if tick_to is not None:
+        query = query.filter(SimulationEvent.tick <= tick_to)
+
+    total = query.count()
+    rows = (
+        query.order_by(SimulationEvent.tick.desc(), SimulationEvent.id.desc())
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+        .all()
+    )
+    return {
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "events": [
+            {
+                "tick": row.tick,
+                "event_type": row.event_type,
+                "state_id": row.state_id,
+                "outcome": row.outcome,
+                "details": json.loads(row.details) if row.details else {}
+            }
+            for row in rows
+        ]
+    }
@@ -1,4 +1,4 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict, Sequence, Tuple
 from app.models.agents import StateLeaderAgent, CitizenAgent, SupremeLeaderAgent
 from app.models.world import Nation, State
 import numpy as np
@@ -16,12 +16,15 @@ class EconomyService:
         for leader in state_leaders:
             leader.budget_allocated = per_state_budget
 
-    def process_state_economy(self, leader: StateLeaderAgent, citizens: List[CitizenAgent], inflation: float, unemployment: float) -> float:
+    def process_state_economy(self, leader: StateLeaderAgent, citizens: List[CitizenAgent], inflation: float, unemployment: float,
+                              cohorts: Sequence = ()) -> float:
         """
         Executes the economic consequences of the leader's action.
+        `cohorts` (LOD aggregates) share the budget and receive the expected per-citizen effects.
         Returns the step reward for the leader.
         """
-        if not citizens:
+        population = len(citizens) + sum(c.count for c in cohorts)
+        if not population:
             return 0.0
 
         action = leader.last_action
@@ -65,7 +68,8 @@ class EconomyService:
         leader.corruption_level = personal_gain
 
         # 2. Distribute to Citizens with Inflation/Unemployment effects
-        per_citizen = (funds_for_people / len(citizens)) * (1.0 - inflation)
+        per_citizen = (funds_for_people / population) * (1.0 - inflation)
+        fair_share = (initial_budget / population) * 0.8
         for citizen in citizens:
             citizen.wealth += per_citizen
             citizen.trust_score = max(0, min(100, citizen.trust_score + trust_change))
@@ -75,7 +79,6 @@ class EconomyService:
                  citizen.wealth *= 0.8 # Loss of income
                  citizen.happiness -= 5
             
-            fair_share = (initial_budget / len(citizens)) * 0.8
             if per_citizen < fair_share:
                 citizen.happiness -= 2
             else:
@@ -83,9 +86,13 @@ class EconomyService:
                 
             citizen.happiness = max(0, min(100, citizen.happiness + happiness_modifier))
 
+        for cohort in cohorts:
+            cohort.apply_economy(per_citizen, trust_change, happiness_modifier, unemployment, fair_share)
+
         # 3. Calculate Reward (Strategic Layer)
         # Reward is a mix of personal wealth, trust, and state stability
-        avg_happiness = sum(c.happiness for c in citizens) / len(citizens)
+        total_happiness = sum(c.happiness for c in citizens) + sum(c.count * c.mean_of("happiness") for c in cohorts)
+        avg_happiness = total_happiness / population
         step_reward = personal_gain + (trust_change * 2) + (avg_happiness / 10.0)
         
         return step_reward
@@ -1,11 +1,22 @@
 import random
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from app.models.agents import BaseAgent, StateLeaderAgent, CitizenAgent, AgentType
+from app.models.world import State
+import numpy as np
 import uuid
 
 class ElectionService:
-    def __init__(self):
-        pass
+    def __init__(self, perception_noise: float = 5.0, challenger_trust: float = 50.0, challenger_spread: float = 10.0,
+                 challenger_noise: Optional[bool] = None):
+        self.perception_noise = perception_noise
+        # Voters perceive the incumbent (candidate 0) with noise; True perturbs every candidate per voter.
+        # None (auto) keeps fixed challenger scores in a two-way race, the baseline odds, but perturbs
+        # them once there are several challengers, or every voter would rank the challengers alike
+        self.challenger_noise = challenger_noise
+        # Challenger has default trust of 50, +/- campaign luck
+        self.challenger_trust = challenger_trust
+        self.challenger_spread = challenger_spread
+        self.rng = np.random.default_rng()
 
     def conduct_state_election(self, state_id: str, current_leader: StateLeaderAgent, citizens: List[CitizenAgent]) -> Tuple[str, Dict]:
         """
@@ -16,30 +27,14 @@ class ElectionService:
             return current_leader.id, {"reason": "no_citizens"}
 
         # 1. Calculate Challenger Score (Random for now, simulating an opponent)
-        # Challenger has default trust of 50
-        challenger_trust = 50.0 
-        challenger_score = challenger_trust + random.uniform(-10, 10)
-
-        # 2. Calculate Incumbent Score
-        # Sum of citizen trust in the leader
-        incumbent_votes = 0
-        challenger_votes = 0
-
-        for citizen in citizens:
-            # Voting Logic:
-            # Probability to vote for incumbent = SIGMOID(Trust - 50)
-            # Simplified: If Trust > 50, mostly vote incumbent.
-            
-            # Noise factor
-            perception = current_leader.trust_score + random.uniform(-5, 5)
-            
-            if perception >= challenger_score:
-                incumbent_votes += 1
-            else:
-                challenger_votes += 1
+        challenger_score = self.challenger_trust + random.uniform(-self.challenger_spread, self.challenger_spread)
 
+        # 2. Every voter perceives the incumbent's trust with noise (one array draw)
+        perception = current_leader.trust_score + self.rng.uniform(-self.perception_noise, self.perception_noise, len(citizens))
+        incumbent_votes = int(np.count_nonzero(perception >= challenger_score))
+        challenger_votes = len(citizens) - incumbent_votes
         total_votes = incumbent_votes + challenger_votes
-        
+
         details = {
             "incumbent_id": current_leader.id,
             "incumbent_votes": incumbent_votes,
@@ -53,6 +48,124 @@ class ElectionService:
         else:
             return "challenger", details
 
+    def perceive(self, candidate_scores: np.ndarray, voter_group: np.ndarray,
+                 voter_ideology: Optional[np.ndarray] = None, candidate_ideology: Optional[np.ndarray] = None,
+                 ideology_weight: float = 10.0) -> np.ndarray:
+        """
+        Voter x candidate perception matrix in one array draw.
+        candidate_scores: (groups, candidates) appeal of each candidate in each race.
+        voter_group: (voters,) index of the race each voter takes part in.
+        Optional ideology positions penalise candidates far from the voter.
+        Only the incumbent column is noisy in a two-way race unless `challenger_noise` is set.
+        """
+        n_candidates = candidate_scores.shape[1]
+        all_noisy = n_candidates > 2 if self.challenger_noise is None else self.challenger_noise
+        noisy = n_candidates if all_noisy else 1
+        # float32 noise drawn in one shot, shifted in place to [-noise, noise)
+        noise = self.rng.random((len(voter_group), noisy), dtype=np.float32)
+        noise *= 2 * self.perception_noise
+        noise -= self.perception_noise
+        perceptions = candidate_scores.astype(np.float32)[voter_group]
+        perceptions[:, :noisy] += noise
+        if voter_ideology is not None and candidate_ideology is not None:
+            # candidate_ideology: (groups, candidates, dims)
+            distance = np.linalg.norm(candidate_ideology[voter_group] - voter_ideology[:, None, :], axis=2)
+            perceptions -= ideology_weight * distance
+        return perceptions
+
+    def tally(self, perceptions: np.ndarray, voter_group: np.ndarray, n_groups: int,
+              method: str = "plurality") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Counts votes for every race at once.
+        Returns (winner index per race, final-round vote counts (races x candidates), rounds per race).
+        Ranked-choice is instant-runoff: the weakest candidate is eliminated until someone has a majority.
+        """
+        n_candidates = perceptions.shape[1]
+        active = np.ones((n_groups, n_candidates), dtype=bool)
+        rounds = np.ones(n_groups, dtype=int)
+        electorate = np.bincount(voter_group, minlength=n_groups)
+
+        while True:
+            if active.all():
+                first_choice = perceptions.argmax(axis=1)
+            else:
+                first_choice = np.where(active[voter_group], perceptions, -np.inf).argmax(axis=1)
+            counts = np.bincount(
+                voter_group * n_candidates + first_choice, minlength=n_groups * n_candidates
+            ).reshape(n_groups, n_candidates)
+
+            if method != "ranked_choice":
+                break
+
+            undecided = (counts.max(axis=1) * 2 <= electorate) & (active.sum(axis=1) > 1)
+            if not undecided.any():
+                break
+
+            # Eliminate the active candidate with the fewest first preferences in each undecided race
+            weakest = np.where(active, counts, np.iinfo(counts.dtype).max).argmin(axis=1)
+            rows = np.flatnonzero(undecided)
+            active[rows, weakest[rows]] = False
+            rounds[rows] += 1
+
+        # Ties go to the lower index (the incumbent sits at index 0)
+        return counts.argmax(axis=1), counts, rounds
+
+    def conduct_multi_candidate_election(self, candidate_scores: List[float], n_voters: int,
+                                         method: str = "plurality") -> Tuple[int, Dict]:
+        """Single race between any number of candidates. Returns (winner index, details)."""
+        scores = np.asarray(candidate_scores, dtype=float)[None, :]
+        voter_group = np.zeros(n_voters, dtype=np.intp)
+        winners, counts, rounds = self.tally(self.perceive(scores, voter_group), voter_group, 1, method)
+        return int(winners[0]), {
+            "method": method,
+            "candidate_votes": counts[0].tolist(),
+            "rounds": int(rounds[0]),
+            "total_votes": n_voters
+        }
+
+    def conduct_national_election(self, states: List[State], leaders: Dict[str, StateLeaderAgent],
+                                  voter_state_idx: np.ndarray, challengers: int = 1,
+                                  method: str = "plurality") -> Dict[str, Tuple[str, Dict]]:
+        """
+        Runs every state race in one vectorized pass.
+        voter_state_idx: (voters,) index into `states` for each citizen.
+        Candidate 0 is the incumbent; the rest are challengers.
+        Returns {state_id: (winner_id or "challenger", details)}.
+        """
+        n_states = len(states)
+        scores = np.empty((n_states, 1 + challengers))
+        scores[:, 0] = [leaders[s.id].trust_score if s.id in leaders else -np.inf for s in states]
+        scores[:, 1:] = self.challenger_trust + self.rng.uniform(
+            -self.challenger_spread, self.challenger_spread, (n_states, challengers)
+        )
+
+        voter_state_idx = np.asarray(voter_state_idx, dtype=np.intp)
+        winners, counts, rounds = self.tally(self.perceive(scores, voter_state_idx), voter_state_idx, n_states, method)
+
+        results = {}
+        for i, state in enumerate(states):
+            leader = leaders.get(state.id)
+            if leader is None:
+                continue
+            if counts[i].sum() == 0:
+                results[state.id] = (leader.id, {"reason": "no_citizens"})
+                continue
+
+            details = {
+                "incumbent_id": leader.id,
+                "incumbent_votes": int(counts[i, 0]),
+                "challenger_votes": int(counts[i, 1:].sum()),
+                "total_votes": int(counts[i].sum()),
+                "state_id": state.id
+            }
+            if challengers > 1 or method != "plurality":
+                details["method"] = method
+                details["candidate_votes"] = counts[i].tolist()
+                details["rounds"] = int(rounds[i])
+
+            results[state.id] = (leader.id if winners[i] == 0 else "challenger", details)
+        return results
+
     def create_new_leader(self, state_id: str) -> StateLeaderAgent:
         """Generates a new random leader agent to replace the loser."""
         return StateLeaderAgent(
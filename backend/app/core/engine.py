@@ -1,5 +1,8 @@
+import json
+import os
+import sys
 import uuid
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 from app.models.world import Nation, State
 from app.models.agents import BaseAgent, CitizenAgent, StateLeaderAgent, SupremeLeaderAgent, AgentType, MediaAgent, ExternalFactorAgent
 from app.core.election import ElectionService
@@ -7,100 +10,249 @@ from app.core.economy import EconomyService
 from app.core.social import InfluenceService
 from app.core.supreme import SupremeLeaderService
 from app.db.database import SessionLocal, engine, Base
-from app.db.models import SimulationHistory
-from app.core.llm import LLMFeedbackService
+from app.db.models import SimulationHistory, DistributionHistory
+from app.core.llm import LLMFeedbackService, FeedbackPipeline, HTTPFeedbackBackend
+from app.core.events import EventLog
+from app.core.scheduler import TickScheduler, Shard
+from app.core.lod import LODManager, COL
+from app.core.logs import SampledLogger, configure_logging, parse_rates
+from app.core.sketches import DistributionTracker
+from app.core import spatial
 from app.ml.brain_stack import (
-    DecisionPolicy, RuleBasedPolicy, ANNPolicy, DQNPolicy, HybridPolicy
+    DecisionPolicy, RuleBasedPolicy, ANNPolicy, DQNPolicy, HybridPolicy, HybridEnsemble, TabularQPolicy
 )
-from app.core.generators import initialize_agents_with_dist, initialize_media_with_dist, ScenarioGenerator
-from app.core.fuzzy import FuzzyMoralityService
+from app.core.generators import initialize_population, initialize_media_with_dist, ScenarioGenerator
+from app.core.population import Population
+from app.core.fuzzy import FuzzyMoralityService, FuzzyEmotionService
+from app.ml.policy_gradient import CitizenPolicyGradient
+from app.ml.async_learner import AsyncDQNLearner
+from app.ml.brain_pool import LeaderBrainPool
+from app.ml.learner import VectorizedQLearner
+from app.ml.traces import DecisionTrace, TraceWriter
+from app.ml.pretrain import load_pretrained
+from app.core.memory import MemoryAccountant, sizeof, sampled_sizeof, parse_budgets
+from collections import deque
 import random
-import numpy as np
 import logging
+import tracemalloc
+import numpy as np
 
-# Configure Logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger("SwormSim")
+# Sampled structured logging; handlers are set up by configure_logging (below, before the global world)
+log = SampledLogger("SwormSim", rates=parse_rates(os.getenv("SWORM_LOG_SAMPLING", "")))
 
-class TickScheduler:
-    def __init__(self):
-        self.current_tick = 0
+# Citizen rules are module-level functions (not lambdas) so engines can be pickled into snapshots
+def _protest_condition(s) -> bool:
+    # Rule: trust < 0.3 AND unemployment > 0.5 -> protest (Action 1)
+    return s[0] < 0.3 and s[5] > 0.5
 
-    def tick(self):
-        self.current_tick += 1
-        return self.current_tick
+def _content_condition(s) -> bool:
+    return s[2] > 0.8
 
 class SimulationEngine:
-    def __init__(self):
-        self.scheduler = TickScheduler()
+    def __init__(self, async_learning: bool = False, publish_every: int = 10, warm_start_leaders: bool = True,
+                 prioritized_replay: bool = False, election_method: str = "plurality", election_challengers: int = 1,
+                 election_challenger_noise: Optional[bool] = None, llm_url: Optional[str] = None,
+                 influence_mode: str = "proximity", social_topology: str = "small_world",
+                 mean_field_cell_size: float = 10.0, scenario: str = "", num_states: int = 3,
+                 citizens_per_state: int = 50, population_path: Optional[str] = None,
+                 citizen_brain: str = "ann", tabular_bins: int = 3, tabular_shared: bool = True,
+                 leader_brain: str = "dqn", tick_budget: Optional[float] = None,
+                 phase_config: Optional[Dict[str, Dict]] = None, lod: bool = False, lod_region_size: Optional[float] = None,
+                 persist: bool = True, distribution_every: int = 10, trace_dir: Optional[str] = None,
+                 pretrained_dir: Optional[str] = None, memory_budgets: Optional[Dict[str, int]] = None,
+                 memory_check_every: int = 50):
+        self.scheduler = TickScheduler(budget=tick_budget)
+        # World version = epoch (per engine) + tick + mutations outside the tick (forced elections, focus...)
+        self.epoch = uuid.uuid4().hex[:8]
+        self.mutations = 0
         self.is_running = False
         self.nation: Nation = None
         self.agents: Dict[str, BaseAgent] = {}
-        self.election_service = ElectionService()
+        self.election_service = ElectionService(challenger_noise=election_challenger_noise)
         self.economy_service = EconomyService()
-        self.social_service = InfluenceService()
+        self.social_service = InfluenceService(mode=influence_mode, topology=social_topology, cell_size=mean_field_cell_size)
         self.supreme_service = SupremeLeaderService(self.election_service)
         self.llm_service = LLMFeedbackService()
-        self.last_election_results = []
+        # With an LLM endpoint configured, feedback goes through the async batching/caching pipeline
+        self.feedback_pipeline = FeedbackPipeline(HTTPFeedbackBackend(llm_url), self.llm_service) if llm_url else None
+        # News feed is a bounded ring buffer; every entry is also queued for the events table
+        self.event_log = EventLog(feed_size=20)
+        self.last_election_results = self.event_log.feed
+        # "plurality" or "ranked_choice"; more than one challenger makes a multi-candidate race
+        self.election_method = election_method
+        self.election_challengers = election_challengers
         self.agent_policies: Dict[str, DecisionPolicy] = {}
+        # Shared ANN brains for citizens, trained with one batched REINFORCE step per tick
+        self.citizen_learner = CitizenPolicyGradient(state_size=7, action_size=4, hidden_size=8)
+        # "ann" or "tabular": learning citizens use the shared ANNs or slots of one vectorized Q-table
+        self.citizen_brain = citizen_brain
+        self.citizen_q = VectorizedQLearner(n_actions=4, bins=tabular_bins, shared=tabular_shared)
+        # Actor-learner split: leader DQNs train on a background thread when enabled
+        self.async_learner = AsyncDQNLearner(publish_every=publish_every) if async_learning else None
+        if self.async_learner:
+            self.async_learner.start()
+        # Recycled (and optionally warm-started) brains for replacement leaders
+        self.leader_pool = LeaderBrainPool(state_size=7, action_size=4, warm_start=warm_start_leaders,
+                                           prioritized=prioritized_replay)
+        # "dqn" or "hybrid": hybrid leaders vote a pooled DQN against one shared, periodically refit ensemble
+        self.leader_brain = leader_brain
+        self.leader_ensemble = HybridEnsemble(state_size=7, action_size=4) if leader_brain == "hybrid" else None
+        # Level of detail: quiet rule-based citizens collapse into per-region statistical cohorts
+        self.lod = LODManager(region_size=lod_region_size or 200.0) if lod else None
         
         # Economic Feedback Variables
         self.inflation_rate = 0.02
         self.unemployment_rate = 0.05
         self.black_economy_scale = 0.01
         self.fuzzy_morality_service = FuzzyMoralityService()
+        self.fuzzy_emotion_service = FuzzyEmotionService()
+        # Per-state wealth/trust/happiness histograms (Gini, quantiles); full rows persisted every N ticks
+        self.distribution = DistributionTracker()
+        self.distribution_every = distribution_every
+        # Decision traces for offline pretraining (app.ml.pretrain), and brains pretrained from them
+        self.trace = DecisionTrace(TraceWriter(trace_dir)) if trace_dir else None
+        self.pretrained = load_pretrained(pretrained_dir) if pretrained_dir else {}
+        if "leader_dqn" in self.pretrained:
+            self.leader_pool.warm_weights = self.pretrained["leader_dqn"]
+        self.citizen_learner.initial_weights = self.pretrained.get("citizen_ann")
+        # Bytes per subsystem (GET /memory); with budgets (bytes), over-budget subsystems shrink every N ticks
+        self.memory = MemoryAccountant(memory_budgets)
+        self.memory_check_every = memory_check_every
+        self._register_memory()
+
+        # World setup: ScenarioGenerator preset name, size, or a saved population directory
+        self.scenario_name = scenario
+        self.num_states = num_states
+        self.citizens_per_state = citizens_per_state
+        self.population_path = population_path
         
-        # Create Tables with error handling
+        # Create Tables with error handling (skipped for in-memory engines, e.g. API sessions)
+        self.db_session = None
+        if persist:
+            self._init_db()
+
+        self.lod_region_size = lod_region_size
+
+        self._register_phases(phase_config)
+        self.initialize_world()
+
+    def _init_db(self):
         try:
-            print(f"DEBUG: Initializing Database Connection...")
             # Mask password in logs
             log_url = str(engine.url).split("@")[-1] if "@" in str(engine.url) else str(engine.url)
-            print(f"DEBUG: Connecting to: ...@{log_url}")
+            log.log("db", "Initializing database connection to ...@%s", log_url)
             
             Base.metadata.create_all(bind=engine)
             self.db_session = SessionLocal()
-            print("DEBUG: Database initialized and tables created successfully.")
+            log.log("db", "Database initialized and tables created")
         except Exception as e:
-            print(f"CRITICAL ERROR: Failed to initialize database: {e}")
+            log.error("db", "Failed to initialize database: %s", e)
             self.db_session = None # Graceful failure
-        
-        self.initialize_world()
 
-    def _create_policy(self, agent_type: AgentType, role: str = "") -> DecisionPolicy:
-        """Strategy based brain selection."""
+    def __getstate__(self):
+        """Snapshot state for pickling; the DB session is not carried over."""
+        if self.async_learner or self.feedback_pipeline or self.trace:
+            raise TypeError("Engines with a background learner, LLM pipeline or trace cannot be snapshotted")
+        state = self.__dict__.copy()
+        state["db_session"] = None
+        return state
+
+    def _create_policy(self, agent_type: AgentType, role: str = "", group: str = "") -> DecisionPolicy:
+        """Strategy based brain selection. `group` selects a shared citizen weight group."""
         # state_size: trust, wealth, happiness, budget, inflation, unemployment, inequality
         state_size = 7 
         action_size = 4 # Default actions
         
         if role == "supreme_leader":
-            return DQNPolicy(state_size, action_size, long_horizon=True)
+            return self._attach_learner(DQNPolicy(state_size, action_size, long_horizon=True))
         elif agent_type == AgentType.LEADER:
-            return DQNPolicy(state_size, action_size)
+            strategic = self._attach_learner(self.leader_pool.acquire())
+            if self.leader_ensemble:
+                return HybridPolicy(state_size, action_size, ensemble=self.leader_ensemble, strategic_layer=strategic)
+            return strategic
         elif role == "influencer":
             return ANNPolicy(state_size, action_size)
         elif agent_type == AgentType.CITIZEN:
             # Most citizens are rule-based
             if random.random() < 0.8:
-                # Rule: trust < 0.3 AND unemployment > 0.5 -> protest (Action 1)
-                rules = [
-                    {"condition": lambda s: s[0] < 0.3 and s[5] > 0.5, "action": 1},
-                    {"condition": lambda s: s[2] > 0.8, "action": 2}, # High happiness -> Maintain
-                ]
-                return RuleBasedPolicy(rules)
-            else:
-                return ANNPolicy(state_size, action_size, hidden_size=8)
+                return self._citizen_rule_policy()
+            return self._citizen_learner_policy(group)
         
         return RuleBasedPolicy([]) # Fallback
 
+    def _citizen_learner_policy(self, group: str = "") -> DecisionPolicy:
+        """Learning citizen brain: a vectorized Q-table slot, a shared group ANN, or an own ANN."""
+        if self.citizen_brain == "tabular":
+            return TabularQPolicy(self.citizen_q)
+        if group:
+            return self.citizen_learner.shared_policy(group)
+        policy = ANNPolicy(7, 4, hidden_size=8)
+        if "citizen_ann" in self.pretrained:
+            policy.model.load_state_dict(self.pretrained["citizen_ann"])
+        return policy
+
+    @staticmethod
+    def _citizen_rule_policy() -> RuleBasedPolicy:
+        rules = [
+            {"condition": _protest_condition, "action": 1},
+            {"condition": _content_condition, "action": 2}, # High happiness -> Maintain
+        ]
+        return RuleBasedPolicy(rules)
+
+    def _attach_learner(self, policy: DQNPolicy) -> DQNPolicy:
+        if self.async_learner:
+            self.async_learner.attach(policy)
+        return policy
+
+    def _retire_policy(self, agent_id: str):
+        """Drops an agent's brain, detaching it from the async learner and recycling leader brains."""
+        policy = self.agent_policies.pop(agent_id, None)
+        if isinstance(policy, HybridPolicy):
+            policy = policy.strategic_layer
+        if isinstance(policy, TabularQPolicy):
+            policy.release()
+        elif isinstance(policy, DQNPolicy):
+            if self.async_learner:
+                # Queued transitions (the terminal election reward) train before the pool harvests the brain
+                self.async_learner.flush(policy)
+                self.async_learner.detach(policy)
+            if not policy.long_horizon:
+                self.leader_pool.release(policy)
+
     def initialize_world(self):
+        # Population: loaded from disk (memory-mapped) or generated column-wise from the scenario
+        if self.population_path:
+            population = Population.load(self.population_path)
+        else:
+            population = initialize_population(self.num_states, self.citizens_per_state, self.scenario_name)
+        scenario = ScenarioGenerator.create_scenario(population.scenario or self.scenario_name)
+        self.inflation_rate = scenario.get("inflation", self.inflation_rate)
+        self.unemployment_rate = scenario.get("unemployment", self.unemployment_rate)
+
+        # Citizen roles, drawn for the whole population: ~5% influencers, 80% of the rest rule-based
+        n = len(population)
+        influencer = np.random.random(n) < 0.05
+        rule_based = ~influencer & (np.random.random(n) < 0.8)
+        individual = np.ones(n, dtype=bool)
+        if self.lod:
+            # Without an explicit size, LOD regions and cohorts scale with the population
+            if self.lod_region_size is None:
+                self.lod.fit(n / max(1, len(population.state_ids)), spatial.WORLD)
+            # Rule-based citizens start as cohorts built from the columns and materialize on demand
+            individual &= ~self.lod.collapse_population(population, rule_based)
+        rows = np.flatnonzero(individual)
+        citizens_by_state: Dict[str, List[Tuple[CitizenAgent, int]]] = {state_id: [] for state_id in population.state_ids}
+        for row, citizen in zip(rows.tolist(), population.to_agents(rows)):
+            citizens_by_state[citizen.state_id].append((citizen, row))
+        state_sizes = np.bincount(np.asarray(population.columns["state_idx"]), minlength=len(population.state_ids))
+
         # Create States
         states = []
-        for i in range(3):
-            state_id = str(uuid.uuid4())
+        for i, state_id in enumerate(population.state_ids):
             state = State(
                 id=state_id,
                 name=f"State {i+1}",
-                population=50  # Increased for social complexity
+                population=int(state_sizes[i])
             )
             states.append(state)
             
@@ -119,13 +271,14 @@ class SimulationEngine:
             self.agent_policies[leader_id] = self._create_policy(AgentType.LEADER)
             state.leader_id = leader_id
 
-            # Create Citizens with Synthetic Distribution
-            citizens = initialize_agents_with_dist(state_id, 50)
-            for citizen in citizens:
+            # Citizens with Synthetic Distribution
+            for citizen, row in citizens_by_state[state_id]:
                 self.agents[citizen.id] = citizen
-                # Randomly assign some as influencers
-                role = "influencer" if random.random() < 0.05 else "citizen"
-                self.agent_policies[citizen.id] = self._create_policy(AgentType.CITIZEN, role=role)
+                if influencer[row]:
+                    policy = self._create_policy(AgentType.CITIZEN, role="influencer")
+                else:
+                    policy = self._citizen_rule_policy() if rule_based[row] else self._citizen_learner_policy(state_id)
+                self.agent_policies[citizen.id] = policy
 
         # Create Nation
         self.nation = Nation(
@@ -148,7 +301,7 @@ class SimulationEngine:
         self.nation.supreme_leader_id = sl_id
 
         # Phase 9: Create Media Agents with Distribution
-        media_agents = initialize_media_with_dist(3)
+        media_agents = initialize_media_with_dist(3, bias_spread=scenario.get("media_bias_variance", 0.6))
         for media in media_agents:
             self.agents[media.id] = media
 
@@ -164,12 +317,159 @@ class SimulationEngine:
         )
         self.agents[wf_id] = world_agent
 
+    @property
+    def version(self) -> str:
+        """Changes whenever the world visible through get_state may have changed (keys response caches)."""
+        return f"{self.epoch}-{self.scheduler.current_tick}.{self.mutations}"
+
     def start(self):
         self.is_running = True
 
     def stop(self):
         self.is_running = False
 
+    def _register_phases(self, phase_config: Optional[Dict[str, Dict]] = None):
+        """Tick pipeline, in execution order. Optional phases may be thinned or deferred under a budget."""
+        register = self.scheduler.register
+        register("decisions", self._phase_decisions, priority=100)
+        register("morality", self._phase_morality, priority=10, essential=False)
+        register("economy", self._phase_economy, priority=90)
+        register("feedback", self._phase_feedback, period=5, priority=5, essential=False)
+        register("publish_weights", self._phase_publish_weights, priority=50)
+        register("elections", self._phase_elections, period=50, priority=100)
+        register("social", self._phase_social, priority=30, essential=False)
+        register("turnover", self._phase_turnover, priority=80)
+        register("media", self._phase_media, priority=20, essential=False, shardable=True)
+        register("world_event_end", self._phase_world_event_end, period=20, priority=60)
+        register("world_event_start", self._phase_world_event_start, period=40, priority=60)
+        register("world_event_effects", self._phase_world_event_effects, priority=60)
+        register("emotions", self._phase_emotions, priority=10, essential=False)
+        register("citizen_learning", self._phase_citizen_learning, priority=40)
+        register("sl_taxes", self._phase_sl_taxes, period=10, priority=70)
+        register("sl_firing", self._phase_sl_firing, period=25, priority=70)
+        if self.memory.budgets:
+            register("memory", self._phase_memory, period=self.memory_check_every, priority=5)
+        if self.lod:
+            register("lod_cohorts", self._phase_lod_cohorts, priority=60)
+            register("lod_collapse", self._phase_lod_collapse, period=10, priority=5, essential=False)
+        for name, options in (phase_config or {}).items():
+            self.scheduler.configure(name, **options)
+
+    def _register_memory(self):
+        register = self.memory.register
+        register("agents", self._memory_agents)
+        register("policies", self._memory_policies, self._shrink_policies)
+        register("replay_buffers", self._memory_replay, self._shrink_replay)
+        register("event_feed", self._memory_events, self._shrink_events)
+        register("db_session", self._memory_db, self._shrink_db)
+        register("lod_cohorts", self._memory_cohorts)
+
+    def _dqn_agents(self) -> List:
+        """DQN agents of acting leaders (and the supreme leader) plus idle pooled brains."""
+        policies = list(self.agent_policies.values()) + list(self.leader_pool.idle)
+        layers = [p.strategic_layer if isinstance(p, HybridPolicy) else p for p in policies]
+        return [p.agent for p in layers if isinstance(p, DQNPolicy)]
+
+    def _memory_agents(self) -> Dict:
+        return {"bytes": sampled_sizeof(list(self.agents.values())), "count": len(self.agents)}
+
+    def _memory_policies(self) -> Dict:
+        # Weights, optimizer state and tabular/ensemble learners; replay memories are their own subsystem
+        seen = {id(agent.memory) for agent in self._dqn_agents()} | {id(self.leader_pool.shared_experience)}
+        policies = list(self.agent_policies.values()) + list(self.leader_pool.idle)
+        size = sizeof([policies, self.citizen_learner.groups, self.citizen_q], seen)
+        return {"bytes": size, "count": len(policies), "idle_leader_brains": len(self.leader_pool.idle)}
+
+    def _shrink_policies(self, budget: int) -> str:
+        # Idle pooled brains first, then the Adam state of unshared citizen ANNs (rebuilt on their next step)
+        dropped = len(self.leader_pool.idle)
+        self.leader_pool.idle.clear()
+        if self._memory_policies()["bytes"] <= budget:
+            return f"dropped {dropped} idle leader brains"
+        shared = {id(model) for model, _ in self.citizen_learner.groups.values()}
+        reset = 0
+        for agent_id, policy in self.agent_policies.items():
+            if isinstance(policy, ANNPolicy) and id(policy.model) not in shared and policy.optimizer.state:
+                policy.optimizer.state.clear()
+                reset += 1
+        return f"dropped {dropped} idle leader brains, reset optimizer state of {reset} citizen ANNs"
+
+    def _replay_buffers(self) -> List:
+        return [agent.memory for agent in self._dqn_agents()] + [self.leader_pool.shared_experience]
+
+    def _memory_replay(self) -> Dict:
+        buffers = self._replay_buffers()
+        transitions = sum(len(b) for b in buffers)
+        sample = next((t for b in buffers for t in b), None)
+        # Transitions all have the same shape; prioritized buffers also preallocate slots and a sum-tree
+        overhead = sum(sys.getsizeof(b.data) + b.tree.tree.nbytes if hasattr(b, "tree") else sys.getsizeof(b)
+                       for b in buffers)
+        return {
+            "bytes": transitions * (sizeof(sample) if sample is not None else 0) + overhead,
+            "buffers": len(buffers),
+            "transitions": transitions,
+            "capacity": sum(getattr(b, "capacity", None) or b.maxlen for b in buffers)
+        }
+
+    def _shrink_replay(self, budget: int) -> str:
+        usage = self._memory_replay()
+        scale = budget / usage["bytes"] if usage["bytes"] else 1.0
+        resized = 0
+        for agent in self._dqn_agents():
+            capacity = getattr(agent.memory, "capacity", None) or agent.memory.maxlen
+            target = max(64, int(capacity * scale))
+            if target < capacity:
+                agent.resize_memory(target)
+                resized += 1
+        pool = self.leader_pool
+        shared = max(64, int(pool.shared_experience.maxlen * scale))
+        if shared < pool.shared_experience.maxlen:
+            pool.shared_experience = deque(pool.shared_experience, maxlen=shared)
+            pool.seed_size = min(pool.seed_size, shared)
+        return f"scaled {resized} replay memories and the shared experience by {scale:.2f}"
+
+    def _memory_events(self) -> Dict:
+        feed, pending = self.event_log.feed, self.event_log.pending
+        return {"bytes": sampled_sizeof(list(feed)) + sampled_sizeof(list(pending)),
+                "feed": len(feed), "pending": len(pending)}
+
+    def _shrink_events(self, budget: int) -> str:
+        pending = self.event_log.pending
+        if self.db_session:
+            self.flush_events()
+            return "flushed pending events"
+        keep = int(len(pending) * budget / max(1, self._memory_events()["bytes"]))
+        dropped = max(0, len(pending) - keep)
+        for _ in range(dropped):
+            pending.popleft()
+        return f"dropped {dropped} unpersisted events"
+
+    def _memory_db(self) -> Dict:
+        if not self.db_session:
+            return {"bytes": 0, "objects": 0}
+        objects = list(self.db_session.identity_map.values()) + list(self.db_session.new)
+        # Column values only; the instance state links back into the session
+        rows = [{k: v for k, v in vars(o).items() if k != "_sa_instance_state"} for o in objects]
+        return {"bytes": sampled_sizeof(rows), "objects": len(objects)}
+
+    def _shrink_db(self, budget: int) -> str:
+        try:
+            self.db_session.commit()
+            self.db_session.expunge_all()
+        except Exception as e:
+            log.error("db", "DB error while releasing the session identity map: %s", e)
+            self.db_session.rollback()
+        return "expunged the session identity map"
+
+    def _memory_cohorts(self) -> Dict:
+        cohorts = list(self.lod.cohorts.values()) if self.lod else []
+        return {"bytes": sizeof(cohorts), "cohorts": len(cohorts), "members": sum(c.count for c in cohorts)}
+
+    def _phase_memory(self, tick: int, ctx: Dict, shard: Shard):
+        for action in self.memory.enforce(tick):
+            log.log("memory", "Shrinking %s for the %s budget (%d bytes, target %d): %s", action["subsystem"], action["reason"],
+                    action["before"], action["target"], action["action"], level=logging.WARNING, **action)
+
     def advance(self):
         # Allow manual ticks even if stopped (for now)
         # if not self.is_running:
@@ -178,59 +478,126 @@ class SimulationEngine:
         tick = self.scheduler.tick()
         
         # 1. Calculate Global Economic Metrics (Feedback Loop)
-        all_citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN]
-        if all_citizens:
-            avg_wealth = sum(c.wealth for c in all_citizens) / len(all_citizens)
-            wealth_sq_diff = sum((c.wealth - avg_wealth)**2 for c in all_citizens)
-            inequality = (wealth_sq_diff / len(all_citizens))**0.5 / (avg_wealth + 0.1)
+        citizen_stats = self._citizen_stats()
+        if citizen_stats:
+            inequality = citizen_stats["inequality"]
             
             # Simple Feedback: High inequality -> inflation increases, unemployment increases
             self.inflation_rate = max(0.01, self.inflation_rate + (inequality * 0.001) - 0.0005)
             self.unemployment_rate = max(0.02, self.unemployment_rate + (self.inflation_rate * 0.1) - 0.001)
         else:
             inequality = 0.0
+
+        # 2..n Run every phase due this tick
+        self.scheduler.run(tick, {
+            "inequality": inequality,
+            "pressure": (self.inflation_rate + self.unemployment_rate) * 5.0
+        })
+
+        sl = self.agents.get(self.nation.supreme_leader_id)
+
+        # Calculate Global Metrics
+        citizen_stats = self._citizen_stats()
+        metrics = {
+            "avg_happiness": 0,
+            "avg_wealth": 0,
+            "avg_trust": 0,
+            "sl_budget": sl.total_budget if sl else 0
+        }
         
+        if citizen_stats:
+             metrics.update(citizen_stats)
+             metrics.update(self.distribution_metrics())
+             metrics["inflation"] = self.inflation_rate
+             metrics["unemployment"] = self.unemployment_rate
+
+        # ---------------------------------------------
+        # PERSIST DATA (Phase 6)
+        # ---------------------------------------------
+        if self.db_session:
+            try:
+                history_record = SimulationHistory(
+                    tick=tick,
+                    avg_happiness=metrics["avg_happiness"],
+                    avg_wealth=metrics["avg_wealth"],
+                    avg_trust=metrics["avg_trust"],
+                    sl_budget=metrics["sl_budget"]
+                )
+                self.db_session.add(history_record)
+                if citizen_stats and tick % self.distribution_every == 0:
+                    self.db_session.add_all(self.distribution.records(DistributionHistory, tick))
+                flushed = self.event_log.flush(self.db_session)
+                self.db_session.commit()
+                self.event_log.committed(flushed)
+            except Exception as e:
+                log.error("db", "DB error during save: %s", e, tick=tick)
+                self.db_session.rollback()
+        else:
+            log.log("db", "Skipping DB persistence (no active session)", level=logging.DEBUG, tick=tick)
+
+        return {
+            "tick": tick,
+            "nation": self.nation,
+            "agents": list(self.agents.values()),
+            "last_election_results": list(self.last_election_results),
+            "metrics": metrics
+        }
+
+    def _phase_decisions(self, tick: int, ctx: Dict, shard: Shard):
         # 2. Process Decisions for each agent
+        tabular_ids, tabular_slots, tabular_vecs = [], [], []
+        hybrid_ids, hybrid_vecs = [], []
         for agent_id, agent in self.agents.items():
             policy = self.agent_policies.get(agent_id)
             if not policy: continue
             
-            # Construct State Vector: [trust, wealth, happiness, budget, inflation, unemployment, inequality]
-            budget = getattr(agent, 'budget_allocated', 0.0) or getattr(agent, 'total_budget', 0.0)
-            state_vec = np.array([
-                agent.trust_score / 100.0,
-                min(1.0, getattr(agent, 'wealth', 0.0) / 1000.0),
-                getattr(agent, 'happiness', 50.0) / 100.0,
-                min(1.0, budget / 1000.0),
-                self.inflation_rate,
-                self.unemployment_rate,
-                min(1.0, inequality)
-            ])
+            state_vec = self._state_vector(agent, ctx["inequality"])
+
+            # Tabular citizens are decided together below
+            if isinstance(policy, TabularQPolicy):
+                tabular_ids.append(agent_id)
+                tabular_slots.append(policy.slot)
+                tabular_vecs.append(state_vec)
+                continue
+            if isinstance(policy, HybridPolicy) and policy.ensemble is self.leader_ensemble:
+                hybrid_ids.append(agent_id)
+                hybrid_vecs.append(state_vec)
+                continue
             
             # Decision
             action = policy.decide(state_vec)
-            
-            # Execute Action Effects (Stochasticity added)
-            if random.random() < agent.cognitive_bias:
-                 # Irrational action!
-                 action = random.randint(0, 3)
-            
-            # Store for learning
-            agent.last_action = action
-            agent.last_state_vec = state_vec 
-            
-            # 4. Fuzzy Moral Update
-            # Agents update their moral bias based on global conditions
-            # If trust is high, morality increases; if pressure (inflation/unemployment) is high, it decreases
-            pressure = (self.inflation_rate + self.unemployment_rate) * 5.0
-            agent.moral_resistance = self.fuzzy_morality_service.calculate_moral_resistance(
-                agent.greed, agent.trust_score, pressure
-            )
+            self._apply_decision(agent_id, agent, policy, state_vec, action, tick)
 
-            # Rich Log for Rule-based
-            if isinstance(policy, RuleBasedPolicy) and action != 0:
-                 logger.info(f"AGENT {agent_id[:4]} (RuleBased) decided to ACTION {action} at tick {tick} | Trust: {agent.trust_score:.2f}, Unemployment: {self.unemployment_rate:.2f}")
-        
+        if tabular_ids:
+            # One batched epsilon-greedy pass over every tabular citizen's Q-row
+            slots = np.array(tabular_slots)
+            rows = self.citizen_q.discretizer(np.stack(tabular_vecs))
+            actions = self.citizen_q.choose_actions(slots, rows)
+            self.citizen_q.record(tabular_ids, slots, rows, actions, self.agents)
+            for agent_id, state_vec, action in zip(tabular_ids, tabular_vecs, actions.tolist()):
+                self._apply_decision(agent_id, self.agents[agent_id], self.agent_policies[agent_id],
+                                     state_vec, action, tick)
+
+        if hybrid_ids:
+            # Hybrid leaders share one ensemble: one predict per model for all of them
+            policies = [self.agent_policies[agent_id] for agent_id in hybrid_ids]
+            actions = HybridPolicy.decide_batch(policies, np.stack(hybrid_vecs))
+            for agent_id, policy, state_vec, action in zip(hybrid_ids, policies, hybrid_vecs, actions.tolist()):
+                self._apply_decision(agent_id, self.agents[agent_id], policy, state_vec, action, tick)
+
+    def _phase_morality(self, tick: int, ctx: Dict, shard: Shard):
+        # 4. Fuzzy Moral Update (one compiled fuzzy pass over every deciding agent)
+        # Agents update their moral bias based on global conditions
+        # If trust is high, morality increases; if pressure (inflation/unemployment) is high, it decreases
+        deciding = shard.select([a for a_id, a in self.agents.items() if a_id in self.agent_policies])
+        if deciding:
+            resistance = self.fuzzy_morality_service.calculate_moral_resistance_batch(
+                [a.greed for a in deciding], [a.trust_score for a in deciding], ctx["pressure"]
+            ).tolist()
+            for agent, value in zip(deciding, resistance):
+                agent.moral_resistance = value
+
+    def _phase_economy(self, tick: int, ctx: Dict, shard: Shard):
         # 3. Economy Cycle
         # Get Supreme Leader
         sl = self.agents.get(self.nation.supreme_leader_id)
@@ -245,6 +612,14 @@ class SimulationEngine:
         if sl:
             self.economy_service.distribute_national_budget(sl, self.nation, state_leaders)
 
+        # Deliver LLM feedback that finished since the last tick
+        if self.feedback_pipeline:
+            states_by_id = {s.id: s for s in self.nation.states}
+            for (state_id, leader_id, is_propaganda), feedback in self.feedback_pipeline.poll():
+                leader = self.agents.get(leader_id)
+                if leader and state_id in states_by_id:
+                    self._publish_feedback(states_by_id[state_id], leader, feedback, is_propaganda)
+
         # Distribute State -> Citizens
         for state in self.nation.states:
             leader = self.agents.get(state.leader_id)
@@ -258,7 +633,8 @@ class SimulationEngine:
             
             # Execute economy and get reward
             reward = self.economy_service.process_state_economy(
-                leader, citizens, self.inflation_rate, self.unemployment_rate
+                leader, citizens, self.inflation_rate, self.unemployment_rate,
+                cohorts=self.lod.cohorts_for_state(state.id) if self.lod else ()
             )
             
             # Learn Step for Leader
@@ -266,151 +642,270 @@ class SimulationEngine:
             if leader_policy and hasattr(leader, 'last_state_vec'):
                 # For learning, we need to decide next state vec (simplified: current)
                 leader_policy.learn(leader.last_state_vec, leader.last_action, reward, leader.last_state_vec, False)
+                if self.trace and leader.last_state_vec is not None:
+                    self.trace.leader(tick, leader.last_state_vec, leader.last_action, reward,
+                                      self._state_vector(leader, ctx["inequality"]), False)
 
-            # Generate LLM Feedback (Phase 7)
-            if tick % 5 == 0:
-                 is_propaganda = (leader.last_action == 3)
-                 feedback = self.llm_service.generate_feedback({
-                     "leader_name": f"Leader {leader.id[:4]}",
-                     "state_name": state.name
-                 }, is_propaganda=is_propaganda)
-                 leader.recent_feedback = feedback
-                 
-                 # Also Add to last_election_results/news feed for visibility
-                 self.last_election_results.insert(0, {
-                     "outcome": "Social Feedback",
-                     "winner_name": "Citizens" if not is_propaganda else "State Media",
-                     "state_id": state.name,
-                     "reason": feedback
-                 })
-                 # Keep news feed short
-                 if len(self.last_election_results) > 10:
-                     self.last_election_results.pop()
-
-        # Trigger Election every 50 ticks
-        if tick % 50 == 0:
-            self.run_elections()
-
-        # Social Dynamics (Every tick)
-        self.social_service.propagate_influence(list(self.agents.values()))
-        
+    def _phase_feedback(self, tick: int, ctx: Dict, shard: Shard):
+        # Generate LLM Feedback (Phase 7)
+        for state in self.nation.states:
+            leader = self.agents.get(state.leader_id)
+            if not leader:
+                continue
+            is_propaganda = (leader.last_action == 3)
+            info = {
+                "leader_name": f"Leader {leader.id[:4]}",
+                "state_name": state.name
+            }
+            if self.feedback_pipeline:
+                # Non-blocking: cache hits return now, the rest arrive on a later tick
+                citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN and a.state_id == state.id]
+                sentiment = sum(c.happiness for c in citizens) / len(citizens) if citizens else 50.0
+                feedback = self.feedback_pipeline.request(
+                    (state.id, leader.id, is_propaganda), info, is_propaganda, sentiment
+                )
+            else:
+                feedback = self.llm_service.generate_feedback(info, is_propaganda=is_propaganda)
+            if feedback:
+                self._publish_feedback(state, leader, feedback, is_propaganda)
+
+    def _phase_publish_weights(self, tick: int, ctx: Dict, shard: Shard):
+        # Publish learner weights to the acting leader networks every K ticks
+        if self.async_learner:
+            self.async_learner.maybe_publish(tick)
+
+    def _phase_elections(self, tick: int, ctx: Dict, shard: Shard):
+        self.run_elections()
+
+    def _phase_turnover(self, tick: int, ctx: Dict, shard: Shard):
         # Generational Turnover (Age & Replace)
         self._process_generational_turnover()
 
-        # Phase 9: Media & World Events
-        self._process_media_narratives()
-        self._process_world_events(tick)
+    def _phase_social(self, tick: int, ctx: Dict, shard: Shard):
+        # Social Dynamics
+        self.social_service.propagate_influence(list(self.agents.values()))
+
+    def _phase_media(self, tick: int, ctx: Dict, shard: Shard):
+        # Phase 9: Media narratives (round-robin citizen subsets scale their impact by shard.weight)
+        self._process_media_narratives(shard)
+
+    def _phase_emotions(self, tick: int, ctx: Dict, shard: Shard):
+        # Citizen emotions: fear/hope follow trust, happiness and economic pressure
+        self.fuzzy_emotion_service.update(
+            shard.select([a for a in self.agents.values() if a.type == AgentType.CITIZEN]), ctx["pressure"],
+            steps=shard.weight
+        )
+
+    def _phase_citizen_learning(self, tick: int, ctx: Dict, shard: Shard):
+        # Citizen Learning: one batched REINFORCE update per shared network, one TD update for tabular brains
+        self.citizen_learner.update(self.agents)
+        self.citizen_q.update(self.agents, lambda a: self._state_vector(a, ctx["inequality"]))
+        if self.trace:
+            self.trace.end_tick(tick, self.agents, lambda a: self._state_vector(a, ctx["inequality"]))
 
-        # Supreme Leader Actions (Tax & Enforcement)
+    def _state_leaders(self) -> List[StateLeaderAgent]:
+        return [self.agents.get(s.leader_id) for s in self.nation.states if s.leader_id in self.agents]
+
+    def _phase_sl_taxes(self, tick: int, ctx: Dict, shard: Shard):
+        # Supreme Leader Actions: Collect Taxes
         sl = self.agents.get(self.nation.supreme_leader_id)
-        state_leaders = [
-            self.agents.get(s.leader_id) for s in self.nation.states 
-            if s.leader_id in self.agents
-        ]
-        
         if sl:
-            # 1. Collect Taxes (Every 10 ticks)
-            if tick % 10 == 0:
-                self.supreme_service.collect_taxes(sl, state_leaders)
-            
-            # 2. Evaluate & Fire (Every 25 ticks)
-            # Pass a dict of State Objects keyed by ID for easy access
-            state_dict = {s.id: s for s in self.nation.states}
-            if tick % 25 == 0:
-                fired_events = self.supreme_service.evaluate_leaders(state_dict, self.agents, tick)
-                # If anyone fired, add to news?
-                for event in fired_events:
-                     # Initialize policy for NEW leader
-                     new_leader_id = event.get("new_leader_id") # I need to update supreme.py to return this
-                     if new_leader_id and new_leader_id in self.agents:
-                         self.agent_policies[new_leader_id] = self._create_policy(AgentType.LEADER)
-                     
-                     # Old policy should be removed if still exists
-                     old_leader_id = event.get("old_leader")
-                     if old_leader_id in self.agent_policies:
-                         del self.agent_policies[old_leader_id]
-
-                     self.last_election_results.append({
-                         "outcome": "Leader Executed",
-                         "winner_name": "Appointed Leader",
-                         "state_id": "Unknown",
-                         "reason": event["reason"]
-                     })
+            self.supreme_service.collect_taxes(sl, self._state_leaders())
 
-        # Calculate Global Metrics
-        all_citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN]
-        metrics = {
-            "avg_happiness": 0,
-            "avg_wealth": 0,
-            "avg_trust": 0,
-            "sl_budget": sl.total_budget if sl else 0
+    def _phase_sl_firing(self, tick: int, ctx: Dict, shard: Shard):
+        # Supreme Leader Actions: Evaluate & Fire
+        if not self.agents.get(self.nation.supreme_leader_id):
+            return
+        # Pass a dict of State Objects keyed by ID for easy access
+        state_dict = {s.id: s for s in self.nation.states}
+        fired_events = self.supreme_service.evaluate_leaders(state_dict, self.agents, tick)
+        # If anyone fired, add to news?
+        for event in fired_events:
+             # Initialize policy for NEW leader
+             new_leader_id = event.get("new_leader_id") # I need to update supreme.py to return this
+             if new_leader_id and new_leader_id in self.agents:
+                 self.agent_policies[new_leader_id] = self._create_policy(AgentType.LEADER)
+             
+             # Old policy should be removed if still exists
+             self._retire_policy(event.get("old_leader"))
+
+             self._record_event("fired", {
+                 "outcome": "Leader Executed",
+                 "winner_name": "Appointed Leader",
+                 "state_id": "Unknown",
+                 "reason": event["reason"]
+             }, state_id=event.get("state_id"))
+        self.mutations += len(fired_events)
+
+    def _citizen_stats(self) -> Dict:
+        """Population averages and inequality over individual citizens plus LOD cohorts ({} if empty)."""
+        citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN]
+        values = np.array([[c.wealth, c.happiness, c.trust_score] for c in citizens], dtype=np.float64).reshape(-1, 3)
+        n, sums, sumsq = len(citizens), values.sum(axis=0), (values ** 2).sum(axis=0)
+        if self.lod:
+            cohort_n, cohort_sums, cohort_sumsq = self.lod.moments()
+            picks = [COL["wealth"], COL["happiness"], COL["trust_score"]]
+            n, sums, sumsq = n + cohort_n, sums + cohort_sums[picks], sumsq + cohort_sumsq[picks]
+        if not n:
+            return {}
+        means = sums / n
+        wealth_std = max(0.0, sumsq[0] / n - means[0] ** 2) ** 0.5
+        return {
+            "avg_wealth": float(means[0]),
+            "avg_happiness": float(means[1]),
+            "avg_trust": float(means[2]),
+            "inequality": float(wealth_std / (means[0] + 0.1))
         }
+
+    def distribution_metrics(self) -> Dict:
+        """National Gini and wealth quantiles; the per-state sketches are rebuilt at most once per world version."""
+        if self.distribution.version != self.version:
+            self.distribution.update(
+                self.version, self.scheduler.current_tick, [s.id for s in self.nation.states],
+                (a for a in self.agents.values() if a.type == AgentType.CITIZEN),
+                self.lod.cohorts.values() if self.lod else ()
+            )
+        return self.distribution.metrics()
+
+    def _state_vector(self, agent: BaseAgent, inequality: float) -> np.ndarray:
+        # Construct State Vector: [trust, wealth, happiness, budget, inflation, unemployment, inequality]
+        budget = getattr(agent, 'budget_allocated', 0.0) or getattr(agent, 'total_budget', 0.0)
+        return np.array([
+            agent.trust_score / 100.0,
+            min(1.0, getattr(agent, 'wealth', 0.0) / 1000.0),
+            getattr(agent, 'happiness', 50.0) / 100.0,
+            min(1.0, budget / 1000.0),
+            self.inflation_rate,
+            self.unemployment_rate,
+            min(1.0, inequality)
+        ])
+
+    def _apply_decision(self, agent_id: str, agent: BaseAgent, policy: DecisionPolicy, state_vec: np.ndarray,
+                        action: int, tick: int):
+        # Execute Action Effects (Stochasticity added)
+        if random.random() < agent.cognitive_bias:
+             # Irrational action!
+             action = random.randint(0, 3)
         
-        if all_citizens:
-             metrics["avg_happiness"] = sum(c.happiness for c in all_citizens) / len(all_citizens)
-             metrics["avg_wealth"] = sum(c.wealth for c in all_citizens) / len(all_citizens)
-             metrics["avg_trust"] = sum(c.trust_score for c in all_citizens) / len(all_citizens)
-             metrics["inflation"] = self.inflation_rate
-             metrics["unemployment"] = self.unemployment_rate
-             
-             # Calculate Inequality
-             avg_wealth = metrics["avg_wealth"]
-             wealth_sq_diff = sum((c.wealth - avg_wealth)**2 for c in all_citizens)
-             metrics["inequality"] = (wealth_sq_diff / len(all_citizens))**0.5 / (avg_wealth + 0.1)
+        # Store for learning
+        agent.last_action = action
+        agent.last_state_vec = state_vec 
 
-        # ---------------------------------------------
-        # PERSIST DATA (Phase 6)
-        # ---------------------------------------------
-        if self.db_session:
-            try:
-                history_record = SimulationHistory(
-                    tick=tick,
-                    avg_happiness=metrics["avg_happiness"],
-                    avg_wealth=metrics["avg_wealth"],
-                    avg_trust=metrics["avg_trust"],
-                    sl_budget=metrics["sl_budget"]
-                )
-                self.db_session.add(history_record)
-                self.db_session.commit()
-            except Exception as e:
-                print(f"DB Error during save: {e}")
-                self.db_session.rollback()
-        else:
-            print("DEBUG: Skipping DB persistence (no active session)")
+        # Queue ANN citizens for the batched policy-gradient step at the end of the tick
+        if agent.type == AgentType.CITIZEN and isinstance(policy, ANNPolicy):
+            self.citizen_learner.record(agent_id, policy, state_vec, action, agent)
+        # Every citizen decision (rule-based ones too) is a transition for offline pretraining
+        if self.trace and agent.type == AgentType.CITIZEN:
+            self.trace.observe_citizen(agent_id, state_vec, action, agent)
 
+        # Rich Log for Rule-based
+        if isinstance(policy, RuleBasedPolicy) and action != 0 and log.sampled("agent_action"):
+             log.event("agent_action", "AGENT %s (RuleBased) decided to ACTION %d at tick %d", agent_id[:4], action, tick,
+                       agent_id=agent_id, action=action, tick=tick, trust=agent.trust_score,
+                       unemployment=self.unemployment_rate)
+
+    def get_brain_snapshot(self) -> Dict:
+        """Summary of the learning brains: the citizen Q-table and every leader's DQN."""
+        leaders = {}
+        for agent_id, policy in self.agent_policies.items():
+            if isinstance(policy, HybridPolicy):
+                leaders[agent_id] = dict(policy.strategic_layer.agent.get_q_table_snapshot(),
+                                         type="Hybrid", ensemble_refits=policy.ensemble.refits)
+            elif isinstance(policy, DQNPolicy):
+                leaders[agent_id] = policy.agent.get_q_table_snapshot()
         return {
-            "tick": tick,
-            "nation": self.nation,
-            "agents": list(self.agents.values()),
-            "last_election_results": self.last_election_results,
-            "metrics": metrics
+            "citizen_brain": self.citizen_brain,
+            "pretrained": sorted(self.pretrained),
+            "traced_transitions": self.trace.writer.written if self.trace else None,
+            "tabular": self.citizen_q.snapshot(),
+            "leaders": leaders
         }
 
+    def _trace_terminal(self, leader: StateLeaderAgent, reward: float):
+        if self.trace:
+            self.trace.leader(self.scheduler.current_tick, leader.last_state_vec, leader.last_action, reward,
+                              leader.last_state_vec, True)
+
+    def close(self):
+        """Stops the background learner and LLM worker and flushes the decision trace (app shutdown)."""
+        if self.async_learner:
+            self.async_learner.stop()
+        if self.feedback_pipeline:
+            self.feedback_pipeline.close()
+        if self.trace:
+            self.trace.close()
+
+    def _record_event(self, event_type: str, entry: Dict, state_id: Optional[str] = None):
+        """Pushes an entry to the live news feed and queues it for the events table."""
+        self.event_log.record(self.scheduler.current_tick, event_type, entry, state_id=state_id)
+
+    def flush_events(self):
+        """Persists queued events outside of a tick (e.g. after a forced election)."""
+        if not self.db_session:
+            return
+        try:
+            flushed = self.event_log.flush(self.db_session)
+            self.db_session.commit()
+            self.event_log.committed(flushed)
+        except Exception as e:
+            log.error("db", "DB error during event flush: %s", e)
+            self.db_session.rollback()
+
+    def _publish_feedback(self, state: State, leader: StateLeaderAgent, feedback: str, is_propaganda: bool):
+        leader.recent_feedback = feedback
+
+        # Also Add to news feed for visibility
+        self._record_event("social_feedback", {
+            "outcome": "Social Feedback",
+            "winner_name": "Citizens" if not is_propaganda else "State Media",
+            "state_id": state.name,
+            "reason": feedback
+        }, state_id=state.id)
+
     def run_elections(self):
-        self.last_election_results = []
+        self.last_election_results.clear()
+
+        # Map every voter to its state once, then count all state races in one vectorized pass
+        state_index = {s.id: i for i, s in enumerate(self.nation.states)}
+        voter_state_idx = np.fromiter(
+            (state_index[a.state_id] for a in self.agents.values()
+             if a.type == AgentType.CITIZEN and a.state_id in state_index),
+            dtype=np.intp
+        )
+        if self.lod and self.lod.cohorts:
+            # Voting only depends on the voter's state, so cohorts vote by head count without materializing
+            cohorts = [c for c in self.lod.cohorts.values() if c.state_id in state_index]
+            voter_state_idx = np.concatenate([voter_state_idx, np.repeat(
+                [state_index[c.state_id] for c in cohorts], [c.count for c in cohorts]
+            ).astype(np.intp)])
+        leaders = {
+            s.id: self.agents[s.leader_id] for s in self.nation.states if s.leader_id in self.agents
+        }
+        results = self.election_service.conduct_national_election(
+            self.nation.states, leaders, voter_state_idx,
+            challengers=self.election_challengers, method=self.election_method
+        )
+
         for state in self.nation.states:
-            current_leader = self.agents.get(state.leader_id)
+            current_leader = leaders.get(state.id)
             if not current_leader:
                 continue
 
-            # Get citizens for this state
-            citizens = [
-                a for a in self.agents.values() 
-                if a.type == AgentType.CITIZEN and a.state_id == state.id
-            ]
-
-            winner_id, details = self.election_service.conduct_state_election(
-                state.id, current_leader, citizens
-            )
+            winner_id, details = results[state.id]
 
             if winner_id == "challenger":
+                # TERMINAL PUNISHMENT (before the brain is retired, so the pool inherits this experience)
+                policy = self.agent_policies.get(current_leader.id)
+                if policy and current_leader.last_state_vec is not None:
+                    policy.learn(current_leader.last_state_vec, current_leader.last_action, -100.0, current_leader.last_state_vec, True)
+                    self._trace_terminal(current_leader, -100.0)
+
                 # Replace Leader
                 new_leader = self.election_service.create_new_leader(state.id)
                 
                 # Remove old leader
                 del self.agents[current_leader.id]
-                if current_leader.id in self.agent_policies:
-                    del self.agent_policies[current_leader.id]
+                self._retire_policy(current_leader.id)
                 
                 # Add new leader
                 self.agents[new_leader.id] = new_leader
@@ -419,11 +914,6 @@ class SimulationEngine:
                 
                 details["outcome"] = "Incumbent Defeated"
                 details["winner_name"] = "New Leader"
-                
-                # TERMINAL PUNISHMENT
-                policy = self.agent_policies.get(current_leader.id)
-                if policy and hasattr(current_leader, 'last_state_vec'):
-                    policy.learn(current_leader.last_state_vec, current_leader.last_action, -100.0, current_leader.last_state_vec, True)
 
             else:
                 details["outcome"] = "Incumbent Re-elected"
@@ -431,10 +921,19 @@ class SimulationEngine:
 
                 # TERMINAL REWARD (Bonuses)
                 policy = self.agent_policies.get(current_leader.id)
-                if policy and hasattr(current_leader, 'last_state_vec'):
+                if policy and current_leader.last_state_vec is not None:
                     policy.learn(current_leader.last_state_vec, current_leader.last_action, +100.0, current_leader.last_state_vec, True)
+                    self._trace_terminal(current_leader, +100.0)
+                if isinstance(policy, HybridPolicy):
+                    policy = policy.strategic_layer
+                if isinstance(policy, DQNPolicy):
+                    # A re-elected brain (with its terminal reward trained) becomes the warm start
+                    if self.async_learner:
+                        self.async_learner.flush(policy)
+                    self.leader_pool.promote(policy)
             
-            self.last_election_results.append(details)
+            self._record_event("election", details, state_id=state.id)
+        self.mutations += 1
 
     def _process_generational_turnover(self):
         """Ages citizens and replaces those who reach their lifespan."""
@@ -472,30 +971,34 @@ class SimulationEngine:
                         ideology=[i + random.uniform(-0.05, 0.05) for i in agent.ideology]
                     )
                     new_citizens[child_id] = child
+                    self.social_service.replace_citizen(agent_id, child_id)
                     # Initialize policy for child
-                    self.agent_policies[child_id] = self._create_policy(AgentType.CITIZEN)
+                    self.agent_policies[child_id] = self._create_policy(AgentType.CITIZEN, group=agent.state_id)
                     
                     # Notify News (Every 10 deaths to avoid spam)
                     if len(dead_citizens) % 10 == 0:
-                        self.last_election_results.insert(0, {
+                        self._record_event("turnover", {
                             "outcome": "Generational Turnover",
                             "winner_name": "New Generation",
                             "state_id": agent.state_id[:10],
                             "reason": f"A new generation has inherited the future."
-                        })
+                        }, state_id=agent.state_id)
         
         # Remove dead, add new
         for d_id in dead_citizens:
             del self.agents[d_id]
-            if d_id in self.agent_policies:
-                del self.agent_policies[d_id]
+            self._retire_policy(d_id)
         
         self.agents.update(new_citizens)
 
-    def _process_media_narratives(self):
-        """Media agents influence trust in their proximity."""
+    def _process_media_narratives(self, shard: Optional[Shard] = None):
+        """Media agents influence trust in their proximity (only the shard's citizens, scaled by its weight)."""
+        shard = shard or Shard()
         media_agents = [a for a in self.agents.values() if a.type == AgentType.MEDIA]
-        citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN]
+        citizens = shard.select([a for a in self.agents.values() if a.type == AgentType.CITIZEN])
+
+        if self.social_service.mean_field:
+            return self._process_media_mean_field(media_agents, citizens, shard)
         
         for media in media_agents:
             # Algorithmic Amplification
@@ -506,9 +1009,11 @@ class SimulationEngine:
             
             # Narrative force based on ownership and bias
             # If owned by State, mostly positive bias
-            narrative_force = media.bias * media.credibility
+            narrative_force = media.bias * media.credibility * shard.weight
             if is_disinfo:
                 narrative_force *= -1.5 # Disinfo is more volatile
+            if shard.index == 0:
+                self._lod_media(media, narrative_force, effective_reach, is_disinfo)
             
             for citizen in citizens:
                 dist = ((citizen.x - media.x)**2 + (citizen.y - media.y)**2)**0.5
@@ -523,30 +1028,148 @@ class SimulationEngine:
                     
                     # Log narrative warfare
                     if is_disinfo and random.random() < 0.01:
-                        self.last_election_results.insert(0, {
+                        self._record_event("narrative_warfare", {
                             "outcome": "Narrative Warfare",
                             "winner_name": media.ownership,
                             "state_id": "Global",
                             "reason": f"Disinformation campaign detected by {media.id[:4]}"
                         })
 
-    def _process_world_events(self, tick: int):
-        """Randomly triggers global events that affect all agents."""
-        world_agent = next((a for a in self.agents.values() if a.type == AgentType.EXTERNAL), None)
-        if not world_agent:
+    def _process_media_mean_field(self, media_agents: List[MediaAgent], citizens: List[CitizenAgent], shard: Shard):
+        """Mean-field media: outlets are rasterised as disks of their reach and sampled per citizen cell."""
+        if not media_agents or not citizens:
+            return
+        grid = self.social_service.mean_field
+        x = np.fromiter((c.x for c in citizens), dtype=np.float64, count=len(citizens))
+        y = np.fromiter((c.y for c in citizens), dtype=np.float64, count=len(citizens))
+        forces, reaches = [], []
+        for media in media_agents:
+            is_disinfo = random.random() < media.disinformation_rate
+            narrative_force = media.bias * media.credibility * shard.weight
+            if is_disinfo:
+                narrative_force *= -1.5 # Disinfo is more volatile
+            forces.append(narrative_force)
+            reaches.append(media.reach * media.algorithmic_amplification)
+            if shard.index == 0:
+                self._lod_media(media, narrative_force, reaches[-1], is_disinfo)
+
+            # Log narrative warfare: 1% chance per reached citizen, estimated from the grid population
+            if is_disinfo:
+                reached = grid.disk_field([media.x], [media.y], [reaches[-1]], [1.0])
+                in_reach = int(grid.sample(reached, x, y).sum())
+                if random.random() < 1.0 - 0.99 ** in_reach:
+                    self._record_event("narrative_warfare", {
+                        "outcome": "Narrative Warfare",
+                        "winner_name": media.ownership,
+                        "state_id": "Global",
+                        "reason": f"Disinformation campaign detected by {media.id[:4]}"
+                    })
+
+        field = grid.disk_field(
+            [m.x for m in media_agents], [m.y for m in media_agents], reaches, forces
+        )
+        impact = grid.sample(field, x, y)
+        for citizen, force in zip(citizens, impact.tolist()):
+            if force:
+                # Education buffer: higher education = less influence from media
+                edu_buffer = 1.0 - (citizen.education * 0.5)
+                citizen.trust_score = max(0, min(100, citizen.trust_score + force * edu_buffer))
+
+    def _phase_lod_cohorts(self, tick: int, ctx: Dict, shard: Shard):
+        """Aggregate rules for cohorts: ageing/turnover, world events and emotions at the cohort mean."""
+        cohorts = list(self.lod.cohorts.values())
+        if not cohorts:
             return
+        for cohort in cohorts:
+            cohort.age(self.lod.rng)
+
+        world_agent = self._world_agent()
+        if world_agent and world_agent.active_event:
+            impact = world_agent.event_severity / 10.0
+            for cohort in cohorts:
+                cohort.shift(happiness=impact, wealth=impact)
+
+        # One compiled fuzzy pass over every cohort's mean trust/happiness
+        means = np.stack([c.mean for c in cohorts])
+        emotions = self.fuzzy_emotion_service
+        pressure = np.full(len(cohorts), min(1.0, max(0.0, ctx["pressure"])))
+        for name, system in (("fear", emotions.fear), ("hope", emotions.hope)):
+            target = system.compute(trust=means[:, COL["trust_score"]], happiness=means[:, COL["happiness"]], pressure=pressure)
+            for cohort, value in zip(cohorts, target.tolist()):
+                cohort.shift(**{name: emotions.rate * (value - cohort.mean_of(name))})
+
+    def _phase_lod_collapse(self, tick: int, ctx: Dict, shard: Shard):
+        """Collapses quiet rule-based citizens outside the focus into cohorts."""
+        candidates = [
+            a for a_id, a in self.agents.items()
+            if a.type == AgentType.CITIZEN and isinstance(self.agent_policies.get(a_id), RuleBasedPolicy)
+        ]
+        for key, group in self.lod.select_inactive(candidates, tick).items():
+            self.lod.collapse(key, group)
+            for citizen in group:
+                del self.agents[citizen.id]
+                self._retire_policy(citizen.id)
+
+    def _materialize(self, keys) -> int:
+        """Turns cohorts back into individual, rule-based citizens."""
+        citizens = self.lod.materialize(keys)
+        for citizen in citizens:
+            self.agents[citizen.id] = citizen
+            self.agent_policies[citizen.id] = self._citizen_rule_policy()
+        return len(citizens)
+
+    def focus_region(self, x0: float, y0: float, x1: float, y1: float) -> int:
+        """A client zoomed in: materialize cohorts there and keep the area individually simulated."""
+        if not self.lod:
+            return 0
+        self.lod.focus = (x0, y0, x1, y1)
+        self.mutations += 1
+        return self._materialize(self.lod.keys_in_rect(x0, y0, x1, y1))
 
-        # Check for event cooldown or duration
-        if world_agent.active_event and tick % 20 == 0:
+    def clear_focus(self):
+        if self.lod:
+            self.lod.focus = None
+            self.mutations += 1
+
+    def _lod_media(self, media: MediaAgent, narrative_force: float, reach: float, is_disinfo: bool):
+        """
+        Media on cohorts: campaigns materialize the regions they hit, regular coverage shifts mean trust.
+        Cohorts are not sharded, so this runs on the first shard of each cycle only, with the
+        shard-weighted force (one cycle's worth, like every individual citizen gets).
+        """
+        if not self.lod or not self.lod.cohorts:
+            return
+        hit = []
+        for key in self.lod.keys_in_reach(media.x, media.y, reach):
+            cohort = self.lod.cohorts[key]
+            cx, cy = self.lod.centroid(cohort)
+            if (cx - media.x) ** 2 + (cy - media.y) ** 2 < reach ** 2:
+                hit.append(key)
+                edu_buffer = 1.0 - (float(cohort.static["education"].mean()) * 0.5)
+                cohort.shift(trust_score=narrative_force * edu_buffer)
+        if is_disinfo:
+            # Campaign targets get individual detail back (after the average hit above)
+            self._materialize(hit)
+
+    def _world_agent(self) -> Optional[ExternalFactorAgent]:
+        return next((a for a in self.agents.values() if a.type == AgentType.EXTERNAL), None)
+
+    def _phase_world_event_end(self, tick: int, ctx: Dict, shard: Shard):
+        """Check for event cooldown or duration."""
+        world_agent = self._world_agent()
+        if world_agent and world_agent.active_event:
              world_agent.active_event = None # Event Ends
-             self.last_election_results.insert(0, {
+             self._record_event("world_event", {
                  "outcome": "Global Event Ended",
                  "winner_name": "Stability",
                  "state_id": "World",
                  "reason": "The global crisis/boom has stabilized."
              })
 
-        if not world_agent.active_event and tick % 40 == 0 and random.random() < 0.4:
+    def _phase_world_event_start(self, tick: int, ctx: Dict, shard: Shard):
+        """Randomly triggers global events that affect all agents."""
+        world_agent = self._world_agent()
+        if world_agent and not world_agent.active_event and random.random() < 0.4:
             events = [
                 ("Economic Recession", -10, "Happiness and wealth are declining globally."),
                 ("Technological Boom", 15, "Efficiency increases wealth for all."),
@@ -557,15 +1180,17 @@ class SimulationEngine:
             world_agent.active_event = evt_name
             world_agent.event_severity = severity
             
-            self.last_election_results.insert(0, {
+            self._record_event("world_event", {
                 "outcome": "Global Event",
                 "winner_name": evt_name,
                 "state_id": "World",
                 "reason": reason
             })
 
-        # Apply active event effects
-        if world_agent.active_event:
+    def _phase_world_event_effects(self, tick: int, ctx: Dict, shard: Shard):
+        """Apply active event effects."""
+        world_agent = self._world_agent()
+        if world_agent and world_agent.active_event:
             impact = world_agent.event_severity / 10.0
             for agent in self.agents.values():
                 if agent.type == AgentType.CITIZEN:
@@ -575,9 +1200,38 @@ class SimulationEngine:
                     else:
                         agent.wealth = max(0, agent.wealth + impact)
 
+    def citizen_columns(self) -> Tuple[Dict[str, np.ndarray], List[str]]:
+        """Positions and map fields of every citizen, individual and collapsed (LOD cohort members)."""
+        citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN]
+        rows = [(c.x, c.y, c.trust_score, c.wealth, c.happiness, c.ideology[0], c.ideology[1]) for c in citizens]
+        values = np.array(rows, dtype=np.float64).reshape(-1, 2 + len(spatial.FIELDS))
+        ids = [c.id for c in citizens]
+        if self.lod and self.lod.cohorts:
+            blocks = [values]
+            for cohort in self.lod.cohorts.values():
+                members = cohort.values()
+                blocks.append(np.column_stack([cohort.static["x"], cohort.static["y"]] +
+                                              [members[:, COL[name]] for name in spatial.FIELDS]))
+                ids.extend(cohort.ids)
+            values = np.concatenate(blocks)
+        columns = {"x": values[:, 0], "y": values[:, 1]}
+        columns.update({name: values[:, 2 + i] for i, name in enumerate(spatial.FIELDS)})
+        return columns, ids
+
+    def get_map(self, viewport=spatial.WORLD, cols: int = 16, rows: int = 16, max_agents: int = 500) -> Dict:
+        """Citizens binned over the viewport (or listed individually when sparse), plus the few non-citizen agents."""
+        columns, ids = self.citizen_columns()
+        result = spatial.aggregate(columns, viewport, cols, rows, max_agents=max_agents, ids=ids)
+        result["tick"] = self.scheduler.current_tick
+        result["landmarks"] = [
+            {"id": a.id, "type": a.type, "x": a.x, "y": a.y}
+            for a in self.agents.values() if a.type != AgentType.CITIZEN
+        ]
+        return result
+
     def get_state(self):
         # Calculate Global Metrics for consistency
-        all_citizens = [a for a in self.agents.values() if a.type == AgentType.CITIZEN]
+        citizen_stats = self._citizen_stats()
         sl = self.agents.get(self.nation.supreme_leader_id)
         metrics = {
             "avg_happiness": 0,
@@ -586,25 +1240,50 @@ class SimulationEngine:
             "sl_budget": sl.total_budget if sl else 0
         }
         
-        if all_citizens:
-             metrics["avg_happiness"] = sum(c.happiness for c in all_citizens) / len(all_citizens)
-             metrics["avg_wealth"] = sum(c.wealth for c in all_citizens) / len(all_citizens)
-             metrics["avg_trust"] = sum(c.trust_score for c in all_citizens) / len(all_citizens)
+        if citizen_stats:
+             metrics.update(citizen_stats)
+             metrics.update(self.distribution_metrics())
              metrics["inflation"] = self.inflation_rate
              metrics["unemployment"] = self.unemployment_rate
-             
-             # Calculate Inequality
-             avg_wealth = metrics["avg_wealth"]
-             wealth_sq_diff = sum((c.wealth - avg_wealth)**2 for c in all_citizens)
-             metrics["inequality"] = (wealth_sq_diff / len(all_citizens))**0.5 / (avg_wealth + 0.1)
 
         return {
             "tick": self.scheduler.current_tick,
             "nation": self.nation,
             "agents": list(self.agents.values()),
-            "last_election_results": self.last_election_results,
-            "metrics": metrics
+            "last_election_results": list(self.last_election_results),
+            "metrics": metrics,
+            "lod": self.lod.stats() if self.lod else None
         }
 
-# Global Instance
-simulation_instance = SimulationEngine()
+# Log I/O runs on a QueueListener thread; it has to be running before the world below starts logging
+configure_logging()
+# Allocation tracing for GET /api/simulation/memory (frames per traceback); started before the world is built
+if os.getenv("SWORM_TRACEMALLOC") and not tracemalloc.is_tracing():
+    tracemalloc.start(int(os.getenv("SWORM_TRACEMALLOC")))
+
+# Global Instance (read replicas serve a shared memory snapshot instead of running an engine)
+simulation_instance = None if os.getenv("SWORM_ROLE") == "replica" else SimulationEngine(
+    async_learning=os.getenv("SWORM_ASYNC_LEARNING", "0") == "1",
+    prioritized_replay=os.getenv("SWORM_PRIORITIZED_REPLAY", "0") == "1",
+    # "1"/"0" forces per-voter noise on challenger scores on/off; unset leaves it to the race size
+    election_challenger_noise=os.getenv("SWORM_ELECTION_CHALLENGER_NOISE", "1") == "1"
+    if os.getenv("SWORM_ELECTION_CHALLENGER_NOISE") else None,
+    llm_url=os.getenv("SWORM_LLM_URL"),
+    influence_mode=os.getenv("SWORM_INFLUENCE_MODE", "proximity"),
+    scenario=os.getenv("SWORM_SCENARIO", ""),
+    population_path=os.getenv("SWORM_POPULATION_PATH"),
+    num_states=int(os.getenv("SWORM_NUM_STATES", "3")),
+    citizens_per_state=int(os.getenv("SWORM_CITIZENS_PER_STATE", "50")),
+    citizen_brain=os.getenv("SWORM_CITIZEN_BRAIN", "ann"),
+    leader_brain=os.getenv("SWORM_LEADER_BRAIN", "dqn"),
+    # Per-tick seconds for optional phases, and JSON overrides like {"media": {"shards": 4}, "social": {"period": 2}}
+    tick_budget=float(os.environ["SWORM_TICK_BUDGET"]) if os.getenv("SWORM_TICK_BUDGET") else None,
+    phase_config=json.loads(os.getenv("SWORM_PHASE_CONFIG", "{}")),
+    lod=os.getenv("SWORM_LOD", "0") == "1",
+    distribution_every=int(os.getenv("SWORM_DISTRIBUTION_EVERY", "10")),
+    trace_dir=os.getenv("SWORM_TRACE_DIR"),
+    pretrained_dir=os.getenv("SWORM_PRETRAINED_DIR"),
+    # e.g. "replay_buffers=64,db_session=32,process=1024" (MB)
+    memory_budgets=parse_budgets(os.getenv("SWORM_MEMORY_BUDGETS", "")),
+    memory_check_every=int(os.getenv("SWORM_MEMORY_CHECK_EVERY", "50"))
+)
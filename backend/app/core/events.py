@@ -0,0 +1,42 @@
+import json
+from collections import deque
+from typing import Dict, Optional
+from app.db.models import SimulationEvent
+
+class EventLog:
+    """
+    Live news feed plus persistent event stream.
+    The feed is a bounded ring buffer (newest first, O(1) push, oldest entries fall off).
+    Every event is also buffered as a row for the `events` table and written in one
+    batch per tick by `flush`.
+    """
+    def __init__(self, feed_size: int = 20, max_pending: int = 10000):
+        self.feed = deque(maxlen=feed_size)
+        # Bounded too: without a DB session nothing is flushed, so the oldest rows are dropped
+        self.pending = deque(maxlen=max_pending)
+
+    def record(self, tick: int, event_type: str, entry: Dict, state_id: Optional[str] = None):
+        self.feed.appendleft(entry)
+        self.pending.append({
+            "tick": tick,
+            "event_type": event_type,
+            "state_id": state_id,
+            "outcome": entry.get("outcome"),
+            "details": json.dumps(entry, default=str)
+        })
+
+    def flush(self, db_session) -> int:
+        """
+        Bulk-inserts buffered rows and returns how many. The caller commits (together with the
+        tick's history row) and then calls `committed`; until then the rows stay buffered, so a
+        failed commit retries them on the next flush.
+        """
+        if not self.pending:
+            return 0
+        db_session.bulk_insert_mappings(SimulationEvent, list(self.pending))
+        return len(self.pending)
+
+    def committed(self, count: int):
+        """Drops the `count` oldest rows once the flush that wrote them is committed."""
+        for _ in range(min(count, len(self.pending))):
+            self.pending.popleft()
@@ -1,7 +1,66 @@
+from typing import Dict, List, Sequence, Tuple
 import numpy as np
 import skfuzzy as fuzzy
 from skfuzzy import control as ctrl
 
+# Variable -> term -> triangle (a, b, c), as passed to fuzzy.trimf
+Terms = Dict[str, Dict[str, Tuple[float, float, float]]]
+# ([(variable, term), ...], output term, "and" | "or")
+Rule = Tuple[List[Tuple[str, str]], str, str]
+
+def trimf(x: np.ndarray, abc: Sequence[float]) -> np.ndarray:
+    """Vectorized triangular membership (a == b or b == c give shoulders, as in fuzzy.trimf)."""
+    a, b, c = abc
+    left = np.ones_like(x) if b == a else (x - a) / (b - a)
+    right = np.ones_like(x) if c == b else (c - x) / (c - b)
+    return np.clip(np.minimum(left, right), 0.0, 1.0) * ((x >= a) & (x <= c))
+
+class CompiledFuzzySystem:
+    """
+    Mamdani inference compiled to NumPy for whole arrays of agents.
+    Membership is evaluated per term on the input arrays, rules fire with min (AND)
+    or max (OR), each output term is cut at its strongest firing, terms are
+    aggregated with max and defuzzified by the exact centroid of the piecewise-linear
+    result on a fine output universe. Rows where no rule fires get `default`.
+    """
+    def __init__(self, inputs: Terms, output_terms: Dict[str, Tuple[float, float, float]],
+                 output_range: Tuple[float, float], rules: List[Rule], resolution: int = 201,
+                 default: float = 0.5):
+        self.inputs = inputs
+        self.rules = rules
+        self.default = default
+        self.universe = np.linspace(output_range[0], output_range[1], resolution)
+        self.output_names = list(output_terms)
+        # (terms, resolution): output membership functions sampled once
+        self.output_mf = np.stack([trimf(self.universe, output_terms[t]) for t in self.output_names])
+        self.rule_outputs = np.array([self.output_names.index(out) for _, out, _ in rules])
+
+    def firing(self, values: Dict[str, np.ndarray]) -> np.ndarray:
+        """Strength of every output term, shape (n, terms)."""
+        memberships = {
+            (var, term): trimf(np.asarray(values[var], dtype=np.float64), abc)
+            for var, terms in self.inputs.items() for term, abc in terms.items()
+        }
+        n = len(next(iter(memberships.values())))
+        cuts = np.zeros((n, len(self.output_names)))
+        for (antecedents, _, op), out in zip(self.rules, self.rule_outputs):
+            degrees = np.stack([memberships[a] for a in antecedents])
+            strength = degrees.min(axis=0) if op == "and" else degrees.max(axis=0)
+            cuts[:, out] = np.maximum(cuts[:, out], strength)
+        return cuts
+
+    def compute(self, **values: np.ndarray) -> np.ndarray:
+        cuts = self.firing(values)
+        # (n, terms, resolution) -> (n, resolution)
+        aggregated = np.minimum(cuts[:, :, None], self.output_mf[None, :, :]).max(axis=1)
+
+        # Exact centroid of the piecewise-linear aggregate (trapezoid area and moment per segment)
+        u, y0, y1 = self.universe, aggregated[:, :-1], aggregated[:, 1:]
+        dx = np.diff(u)
+        area = ((y0 + y1) * dx / 2).sum(axis=1)
+        moment = (dx * (u[:-1] * (2 * y0 + y1) + u[1:] * (y0 + 2 * y1)) / 6).sum(axis=1)
+        return np.where(area > 0, moment / np.where(area > 0, area, 1.0), self.default)
+
 class FuzzyMoralityService:
     def __init__(self):
         # Antecedents (Inputs)
@@ -40,6 +99,23 @@ class FuzzyMoralityService:
         self.morality_ctrl = ctrl.ControlSystem([rule1, rule2, rule3, rule4])
         self.morality_sim = ctrl.ControlSystemSimulation(self.morality_ctrl)
 
+        # Same system compiled for batches
+        self.compiled = CompiledFuzzySystem(
+            inputs={
+                "greed": {"low": (0, 0, 0.5), "med": (0.2, 0.5, 0.8), "high": (0.5, 1, 1)},
+                "trust": {"low": (0, 0, 40), "med": (30, 50, 70), "high": (60, 100, 100)},
+                "pressure": {"low": (0, 0, 0.4), "high": (0.4, 1, 1)},
+            },
+            output_terms={"low": (0, 0, 0.4), "med": (0.3, 0.5, 0.7), "high": (0.6, 1, 1)},
+            output_range=(0, 1),
+            rules=[
+                ([("greed", "high"), ("trust", "low")], "low", "and"),
+                ([("greed", "low"), ("trust", "high")], "high", "and"),
+                ([("pressure", "high"), ("trust", "low")], "med", "and"),
+                ([("greed", "med")], "med", "and"),
+            ]
+        )
+
     def calculate_moral_resistance(self, greed_val: float, trust_val: float, pressure_val: float) -> float:
         """
         Returns a value between 0 and 1 indicating how much the agent resists 
@@ -55,7 +131,63 @@ class FuzzyMoralityService:
         except Exception:
             return 0.5 # Default middle ground
 
+    def calculate_moral_resistance_batch(self, greed: np.ndarray, trust: np.ndarray, pressure) -> np.ndarray:
+        """Vectorized `calculate_moral_resistance` for arrays of agents (pressure may be a scalar)."""
+        greed = np.asarray(greed, dtype=np.float64)
+        # scikit-fuzzy clips crisp inputs to the variable's universe
+        return self.compiled.compute(
+            greed=np.clip(greed, 0, 1),
+            trust=np.clip(trust, 0, 100),
+            pressure=np.clip(np.broadcast_to(pressure, greed.shape), 0, 1)
+        )
+
 class FuzzyEmotionService:
-    def __init__(self):
-        # Similar setup for scaling emotions
-        pass
+    """
+    Per-citizen fear and hope, driven every tick by compiled fuzzy systems.
+    Inputs are trust, happiness and economic pressure; each emotion moves a step
+    (`rate`) towards the fuzzy target, so moods build up and fade over several ticks.
+    """
+    def __init__(self, rate: float = 0.2):
+        self.rate = rate
+        inputs = {
+            "trust": {"low": (0, 0, 40), "med": (30, 50, 70), "high": (60, 100, 100)},
+            "happiness": {"low": (0, 0, 40), "med": (30, 50, 70), "high": (60, 100, 100)},
+            "pressure": {"low": (0, 0, 0.4), "high": (0.4, 1, 1)},
+        }
+        levels = {"low": (0, 0, 0.4), "med": (0.3, 0.5, 0.7), "high": (0.6, 1, 1)}
+        self.fear = CompiledFuzzySystem(inputs, levels, (0, 1), rules=[
+            ([("pressure", "high"), ("trust", "low")], "high", "and"),
+            ([("pressure", "high"), ("happiness", "low")], "high", "and"),
+            ([("trust", "med")], "med", "and"),
+            ([("trust", "high"), ("happiness", "high")], "low", "and"),
+            ([("pressure", "low")], "low", "and"),
+        ], default=0.0)
+        self.hope = CompiledFuzzySystem(inputs, levels, (0, 1), rules=[
+            ([("happiness", "high"), ("trust", "high")], "high", "and"),
+            ([("pressure", "low"), ("happiness", "med")], "med", "and"),
+            ([("trust", "med")], "med", "and"),
+            ([("happiness", "low")], "low", "and"),
+            ([("pressure", "high"), ("trust", "low")], "low", "and"),
+        ])
+
+    def update(self, citizens: List, pressure: float, steps: int = 1):
+        """
+        Moves every citizen's fear/hope towards its fuzzy target in one vectorized pass.
+        `steps` > 1 catches up several ticks at once (for citizens updated round-robin).
+        """
+        if not citizens:
+            return
+        trust = np.clip([c.trust_score for c in citizens], 0, 100)
+        happiness = np.clip([c.happiness for c in citizens], 0, 100)
+        pressure = np.full(len(citizens), min(1.0, max(0.0, pressure)))
+
+        fear_target = self.fear.compute(trust=trust, happiness=happiness, pressure=pressure)
+        hope_target = self.hope.compute(trust=trust, happiness=happiness, pressure=pressure)
+        fear = np.array([c.fear for c in citizens])
+        hope = np.array([c.hope for c in citizens])
+        rate = 1.0 - (1.0 - self.rate) ** steps
+        fear = (fear + rate * (fear_target - fear)).tolist()
+        hope = (hope + rate * (hope_target - hope)).tolist()
+        for citizen, f, h in zip(citizens, fear, hope):
+            citizen.fear = f
+            citizen.hope = h
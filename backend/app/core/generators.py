@@ -1,7 +1,8 @@
 import random
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.models.agents import CitizenAgent, StateLeaderAgent, MediaAgent, AgentType
+from app.core.population import Population
 import uuid
 
 class ScenarioGenerator:
@@ -38,30 +39,17 @@ class ScenarioGenerator:
         }
         return scenarios.get(name, {})
 
-def initialize_agents_with_dist(state_id: str, count: int) -> List[CitizenAgent]:
-    """Creates a synthetic distribution of citizens."""
-    education_dist = ScenarioGenerator.generate_distribution(count, "normal")
-    ideology_eco = ScenarioGenerator.generate_distribution(count, "normal")
-    ideology_soc = ScenarioGenerator.generate_distribution(count, "normal")
-    
-    citizens = []
-    for i in range(count):
-        citizens.append(CitizenAgent(
-            id=str(uuid.uuid4()),
-            state_id=state_id,
-            education=education_dist[i],
-            ideology=[ideology_eco[i] * 2 - 1, ideology_soc[i] * 2 - 1], # Scale to -1 to 1
-            honesty=random.random(),
-            greed=random.random(),
-            competence=random.random(),
-            happiness=random.uniform(40, 60),
-            wealth=random.uniform(5, 15),
-            x=random.random() * 800,
-            y=random.random() * 600
-        ))
-    return citizens
+def initialize_population(num_states: int, citizens_per_state: int, scenario_name: str = "",
+                          seed: Optional[int] = None) -> Population:
+    """Scenario-driven population for a whole nation: fresh state ids, arrays generated in one shot."""
+    state_ids = [str(uuid.uuid4()) for _ in range(num_states)]
+    return Population.generate(
+        state_ids, citizens_per_state,
+        scenario=ScenarioGenerator.create_scenario(scenario_name),
+        scenario_name=scenario_name, seed=seed
+    )
 
-def initialize_media_with_dist(count: int) -> List[MediaAgent]:
+def initialize_media_with_dist(count: int, bias_spread: float = 0.6) -> List[MediaAgent]:
     media_list = []
     for i in range(count):
         media_list.append(MediaAgent(
@@ -70,7 +58,7 @@ def initialize_media_with_dist(count: int) -> List[MediaAgent]:
             disinformation_rate=random.uniform(0.01, 0.2),
             algorithmic_amplification=random.uniform(1.0, 2.5),
             credibility=random.uniform(0.4, 0.8),
-            bias=random.uniform(-0.6, 0.6),
+            bias=random.uniform(-bias_spread, bias_spread),
             honesty=random.random(),
             greed=random.random(),
             competence=random.random(),
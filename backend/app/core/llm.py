@@ -1,4 +1,12 @@
 import random
+import json
+import queue
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
 
 class LLMFeedbackService:
     def __init__(self):
@@ -32,3 +40,153 @@ class LLMFeedbackService:
             msg = random.choice(self.complaint_templates)
             
         return msg.format(leader_name=leader_name, state_name=state_name)
+
+class FeedbackBackend(ABC):
+    """Pluggable text generator. Receives a batch of requests, returns one string per request."""
+    @abstractmethod
+    def generate_batch(self, requests: List[Dict]) -> List[str]:
+        pass
+
+class TemplateFeedbackBackend(FeedbackBackend):
+    def __init__(self, service: Optional[LLMFeedbackService] = None):
+        self.service = service or LLMFeedbackService()
+
+    def generate_batch(self, requests: List[Dict]) -> List[str]:
+        return [self.service.generate_feedback(r, is_propaganda=r.get("is_propaganda", False)) for r in requests]
+
+class HTTPFeedbackBackend(FeedbackBackend):
+    """
+    POSTs {"requests": [...]} as JSON to `url` and expects {"responses": [...]} back.
+    Any OpenAI-style gateway can be put behind a thin adapter speaking this shape.
+    """
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def generate_batch(self, requests: List[Dict]) -> List[str]:
+        body = json.dumps({"requests": requests}).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, method="POST",
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as response:
+            responses = json.loads(response.read().decode("utf-8"))["responses"]
+        if len(responses) != len(requests):
+            raise ValueError("Backend returned a different number of responses than requests")
+        return responses
+
+class FeedbackPipeline:
+    """
+    Non-blocking feedback generation.
+    The tick thread calls `request` (never blocks) and `poll` on later ticks to pick up
+    finished texts. A worker thread batches queued requests for the backend. Responses
+    are cached by (state, propaganda, sentiment bucket); failures and requests older
+    than `timeout` fall back to the templates.
+    """
+    def __init__(self, backend: FeedbackBackend, fallback: Optional[LLMFeedbackService] = None,
+                 batch_size: int = 8, batch_window: float = 0.05, timeout: float = 10.0,
+                 cache_size: int = 256, sentiment_buckets: int = 5):
+        self.backend = backend
+        self.fallback = fallback or LLMFeedbackService()
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.sentiment_buckets = sentiment_buckets
+
+        self.cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # cache key -> (request info, submitted_at, [tags waiting for it])
+        self.pending: Dict[tuple, Tuple[Dict, float, List]] = {}
+        self.completed: List[Tuple[Any, str]] = []
+        self.queue: "queue.Queue" = queue.Queue()
+        self.lock = threading.Lock()
+
+        self.stats = {"requests": 0, "cache_hits": 0, "batches": 0, "fallbacks": 0, "timeouts": 0}
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="llm-feedback", daemon=True)
+        self._thread.start()
+
+    def cache_key(self, info: Dict, is_propaganda: bool, sentiment: float) -> tuple:
+        # sentiment is average happiness on the 0-100 scale. The text names the leader, so a new
+        # leader (election, firing) must not be served its predecessor's feedback
+        bucket = min(self.sentiment_buckets - 1, int(sentiment / 100.0 * self.sentiment_buckets))
+        return (info.get("state_name"), info.get("leader_name"), is_propaganda, bucket)
+
+    def request(self, tag: Any, info: Dict, is_propaganda: bool, sentiment: float) -> Optional[str]:
+        """Returns cached text immediately, otherwise queues the request and returns None."""
+        key = self.cache_key(info, is_propaganda, sentiment)
+        with self.lock:
+            self.stats["requests"] += 1
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return self.cache[key]
+            if key in self.pending:
+                self.pending[key][2].append(tag)
+                return None
+            payload = dict(info, is_propaganda=is_propaganda, sentiment=sentiment)
+            self.pending[key] = (payload, time.monotonic(), [tag])
+        self.queue.put(key)
+        return None
+
+    def poll(self) -> List[Tuple[Any, str]]:
+        """Finished (tag, text) pairs since the last poll. Expired requests resolve to templates."""
+        now = time.monotonic()
+        with self.lock:
+            for key, (payload, submitted_at, _) in list(self.pending.items()):
+                if now - submitted_at > self.timeout:
+                    self.stats["timeouts"] += 1
+                    self._resolve(key, self._template(payload), cache=False)
+            done, self.completed = self.completed, []
+        return done
+
+    def close(self):
+        self._stop_event.set()
+        self._thread.join(1.0)
+
+    def _template(self, payload: Dict) -> str:
+        return self.fallback.generate_feedback(payload, is_propaganda=payload.get("is_propaganda", False))
+
+    def _resolve(self, key: tuple, text: str, cache: bool = True):
+        # Caller holds self.lock
+        entry = self.pending.pop(key, None)
+        if entry is None:
+            return
+        if cache:
+            self.cache[key] = text
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        self.completed.extend((tag, text) for tag in entry[2])
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                keys = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            # Gather a batch: whatever arrives within the batch window
+            deadline = time.monotonic() + self.batch_window
+            while len(keys) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    keys.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            with self.lock:
+                keys = [k for k in keys if k in self.pending]
+                payloads = [self.pending[k][0] for k in keys]
+            if not keys:
+                continue
+
+            try:
+                texts, cache = self.backend.generate_batch(payloads), True
+            except Exception:
+                texts, cache = [self._template(p) for p in payloads], False
+                with self.lock:
+                    self.stats["fallbacks"] += 1
+
+            with self.lock:
+                self.stats["batches"] += 1
+                for key, text in zip(keys, texts):
+                    self._resolve(key, text, cache=cache)
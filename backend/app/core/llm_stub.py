@@ -0,0 +1,72 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.core.llm import LLMFeedbackService
+
+class LocalLLMStub:
+    """
+    Local stand-in for a real LLM endpoint, speaking the HTTPFeedbackBackend protocol.
+    Answers from the templates after an optional artificial latency, so the async
+    pipeline can be exercised (and tested) without network access.
+
+        stub = LocalLLMStub(latency=1.5).start()
+        backend = HTTPFeedbackBackend(stub.url)
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.service = LLMFeedbackService()
+        self.batches_served = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/generate"
+
+    def start(self) -> "LocalLLMStub":
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                requests = json.loads(self.rfile.read(length) or b"{}").get("requests", [])
+                if stub.latency:
+                    time.sleep(stub.latency)
+                responses = [
+                    stub.service.generate_feedback(r, is_propaganda=r.get("is_propaganda", False))
+                    for r in requests
+                ]
+                stub.batches_served += 1
+                body = json.dumps({"responses": responses}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # Keep the simulation log clean
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+if __name__ == "__main__":
+    stub = LocalLLMStub(port=8765, latency=1.0).start()
+    print(f"LLM stub listening on {stub.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
@@ -0,0 +1,321 @@
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from app.models.agents import CitizenAgent
+
+# Fields a cohort evolves as moments (mean/std); members keep their standardized offsets (z-scores)
+DYNAMIC = ["wealth", "trust_score", "happiness", "ideology_economic", "ideology_social", "fear", "hope"]
+# Fields a cohort only stores per member
+STATIC = ["honesty", "greed", "competence", "education", "memory_decay", "cognitive_bias",
+          "faction_loyalty", "moral_resistance", "x", "y", "age", "lifespan"]
+BOUNDS = {
+    "wealth": (0.0, None), "trust_score": (0.0, 100.0), "happiness": (0.0, 100.0),
+    "ideology_economic": (-1.0, 1.0), "ideology_social": (-1.0, 1.0), "fear": (0.0, 1.0), "hope": (0.0, 1.0)
+}
+COL = {name: i for i, name in enumerate(DYNAMIC)}
+
+def _dynamic_values(citizen: CitizenAgent) -> List[float]:
+    return [citizen.wealth, citizen.trust_score, citizen.happiness,
+            citizen.ideology[0], citizen.ideology[1], citizen.fear, citizen.hope]
+
+class Cohort:
+    """
+    Low-activity citizens of one (state, region) collapsed into aggregate form.
+    The cohort advances its moment vector (mean, std per DYNAMIC field) with aggregate
+    rules; members are columnar records holding their static attributes and their
+    z-scores, so `materialize` can rebuild individuals consistent with the moments.
+    """
+    def __init__(self, state_id: str, region: Tuple[int, int], ids: List[str], factions: List[str],
+                 values: np.ndarray, static: Dict[str, np.ndarray]):
+        self.state_id = state_id
+        self.region = region
+        self.ids = ids
+        self.factions = factions
+        self.static = static
+        self.mean = values.mean(axis=0)
+        self.std = values.std(axis=0)
+        self.z = (values - self.mean) / np.where(self.std > 0, self.std, 1.0)
+
+    @classmethod
+    def from_citizens(cls, state_id: str, region: Tuple[int, int], citizens: List[CitizenAgent]) -> "Cohort":
+        values = np.array([_dynamic_values(c) for c in citizens], dtype=np.float64)
+        static = {name: np.array([getattr(c, name) for c in citizens], dtype=np.float64) for name in STATIC}
+        return cls(state_id, region, [c.id for c in citizens], [c.faction for c in citizens], values, static)
+
+    @property
+    def count(self) -> int:
+        return len(self.ids)
+
+    def mean_of(self, name: str) -> float:
+        return float(self.mean[COL[name]])
+
+    def values(self) -> np.ndarray:
+        """Current per-member values implied by the moments (n, len(DYNAMIC))."""
+        values = self.mean + self.z * self.std
+        for name, (lo, hi) in BOUNDS.items():
+            values[:, COL[name]] = np.clip(values[:, COL[name]], lo, hi)
+        return values
+
+    def absorb(self, citizens: List[CitizenAgent]):
+        """Merges more collapsed citizens and recomputes the moments."""
+        other = Cohort.from_citizens(self.state_id, self.region, citizens)
+        merged = Cohort(
+            self.state_id, self.region, self.ids + other.ids, self.factions + other.factions,
+            np.concatenate([self.values(), other.values()]),
+            {name: np.concatenate([self.static[name], other.static[name]]) for name in STATIC}
+        )
+        self.__dict__.update(merged.__dict__)
+
+    def _clip_mean(self):
+        """
+        Keeps means in bounds. Individuals pushed against a bound are clamped there, so the
+        spread shrinks to the room left; otherwise `values()` would clip a wide cohort at the
+        bound and drift its members away from the mean.
+        """
+        for name, (lo, hi) in BOUNDS.items():
+            i = COL[name]
+            self.mean[i] = np.clip(self.mean[i], lo, hi)
+            room = min(self.mean[i] - lo, np.inf if hi is None else hi - self.mean[i])
+            self.std[i] = min(self.std[i], room)
+
+    def shift(self, **deltas: float):
+        for name, delta in deltas.items():
+            self.mean[COL[name]] += delta
+        self._clip_mean()
+
+    def apply_economy(self, per_citizen: float, trust_change: float, happiness_modifier: float,
+                      unemployment: float, fair_share: float):
+        """Expected value of EconomyService's per-citizen rules over the cohort."""
+        hope = self.mean[COL["hope"]]
+        risk = hope * 1.0 - (1.0 - hope) * 0.5 # E[uniform(0, 2)] vs E[uniform(0, 1)] loss
+        wealth_factor = 1.0 - 0.2 * unemployment
+        self.mean[COL["wealth"]] = (self.mean[COL["wealth"]] + risk + per_citizen) * wealth_factor
+        self.std[COL["wealth"]] *= wealth_factor
+        happiness = (-2.0 if per_citizen < fair_share else 1.0) - 5.0 * unemployment + happiness_modifier
+        self.shift(trust_score=trust_change, happiness=happiness)
+
+    def age(self, rng: np.random.Generator) -> int:
+        """Ages members; those at their lifespan are replaced by a descendant. Returns the turnover."""
+        static = self.static
+        static["age"] += 1
+        dead = np.flatnonzero(static["age"] >= static["lifespan"])
+        if len(dead):
+            values = self.values()
+            values[dead, COL["wealth"]] *= 0.5 # Inherit 50% of wealth
+            values[dead, COL["happiness"]] = 50
+            for i in dead.tolist():
+                self.ids[i] = str(uuid.uuid4())
+            static["age"][dead] = 0
+            static["lifespan"][dead] = rng.integers(80, 121, len(dead))
+            self.__dict__.update(Cohort(self.state_id, self.region, self.ids, self.factions, values, static).__dict__)
+        return len(dead)
+
+    def materialize(self) -> List[CitizenAgent]:
+        values = self.values().tolist()
+        static = {name: column.tolist() for name, column in self.static.items()}
+        citizens = []
+        for i, agent_id in enumerate(self.ids):
+            row = values[i]
+            citizens.append(CitizenAgent(
+                id=agent_id,
+                state_id=self.state_id,
+                faction=self.factions[i],
+                wealth=row[COL["wealth"]],
+                trust_score=row[COL["trust_score"]],
+                happiness=row[COL["happiness"]],
+                ideology=[row[COL["ideology_economic"]], row[COL["ideology_social"]]],
+                fear=row[COL["fear"]],
+                hope=row[COL["hope"]],
+                **{name: (int(static[name][i]) if name in ("age", "lifespan") else static[name][i]) for name in STATIC}
+            ))
+        return citizens
+
+class LODManager:
+    """
+    Level-of-detail bookkeeping.
+    The world is split into square regions. Every collapse pass, citizens outside the
+    focused area whose wealth/trust/happiness (relative to their group) moved less than
+    `activity_threshold` per tick since the last pass are collapsed into one Cohort per
+    (state, region).
+    Cohorts are re-materialized on demand (focus on their region, media campaigns). At
+    startup, rule-based citizens are collapsed straight from the population columns.
+    Only quiet citizens of one state and region collapse together, so regions must be large
+    enough to hold `min_cohort` of them; `fit` derives both from the population.
+    """
+    def __init__(self, region_size: float = 200.0, activity_threshold: float = 1.0, min_cohort: int = 8,
+                 seed: Optional[int] = None):
+        self.region_size = region_size
+        self.activity_threshold = activity_threshold
+        self.min_cohort = min_cohort
+        self.rng = np.random.default_rng(seed)
+        self.cohorts: Dict[Tuple[str, Tuple[int, int]], Cohort] = {}
+        # Focus rectangle (x0, y0, x1, y1): regions touching it stay individually simulated
+        self.focus: Optional[Tuple[float, float, float, float]] = None
+        # Citizen ID -> (deviation from group mean of wealth/trust/happiness, tick)
+        self._snapshots: Dict[str, Tuple[List[float], int]] = {}
+
+        self.collapsed_total = 0
+        self.materialized_total = 0
+
+    def fit(self, citizens_per_state: float, world: Tuple[float, float, float, float], region_citizens: int = 48):
+        """
+        Scales regions to the population: about `region_citizens` citizens of a state per region
+        (only the quiet, rule-based share of them can collapse), never larger than the world.
+        Small states, which hold few quiet citizens even as a single region, get smaller cohorts.
+        """
+        x0, y0, x1, y1 = world
+        size = np.sqrt((x1 - x0) * (y1 - y0) * region_citizens / max(citizens_per_state, 1.0))
+        self.region_size = float(min(size, max(x1 - x0, y1 - y0)))
+        self.min_cohort = int(np.clip(citizens_per_state // 25, 2, self.min_cohort))
+
+    def region_of(self, x: float, y: float) -> Tuple[int, int]:
+        return int(x // self.region_size), int(y // self.region_size)
+
+    def region_bounds(self, region: Tuple[int, int]) -> Tuple[float, float, float, float]:
+        gx, gy = region
+        return (gx * self.region_size, gy * self.region_size,
+                (gx + 1) * self.region_size, (gy + 1) * self.region_size)
+
+    def in_focus(self, region: Tuple[int, int]) -> bool:
+        if self.focus is None:
+            return False
+        fx0, fy0, fx1, fy1 = self.focus
+        x0, y0, x1, y1 = self.region_bounds(region)
+        return x0 < fx1 and fx0 < x1 and y0 < fy1 and fy0 < y1
+
+    @property
+    def population(self) -> int:
+        return sum(c.count for c in self.cohorts.values())
+
+    def cohorts_for_state(self, state_id: str) -> List[Cohort]:
+        return [c for c in self.cohorts.values() if c.state_id == state_id]
+
+    def select_inactive(self, citizens: Iterable[CitizenAgent], tick: int) -> Dict[Tuple[str, Tuple[int, int]], List[CitizenAgent]]:
+        """
+        Groups citizens that were quiet since their last snapshot, by (state, region).
+        Activity is measured on each citizen's deviation from its group mean, so the drift
+        a cohort reproduces anyway (budget, trust swings) does not count as activity.
+        """
+        groups: Dict[Tuple[str, Tuple[int, int]], List[CitizenAgent]] = {}
+        for c in citizens:
+            groups.setdefault((c.state_id, self.region_of(c.x, c.y)), []).append(c)
+
+        snapshots, quiet = {}, {}
+        for key, group in groups.items():
+            values = np.array([[c.wealth, c.trust_score, c.happiness] for c in group])
+            deviations = (values - values.mean(axis=0)).tolist()
+            focused = self.in_focus(key[1])
+            for c, deviation in zip(group, deviations):
+                previous = self._snapshots.get(c.id)
+                snapshots[c.id] = (deviation, tick)
+                if previous is None or focused or tick == previous[1]:
+                    continue
+                activity = sum(abs(d - p) for d, p in zip(deviation, previous[0])) / (tick - previous[1])
+                if activity < self.activity_threshold:
+                    quiet.setdefault(key, []).append(c)
+        self._snapshots = snapshots
+        return {key: group for key, group in quiet.items()
+                if len(group) >= self.min_cohort or key in self.cohorts}
+
+    def collapse_population(self, population, candidates: np.ndarray) -> np.ndarray:
+        """
+        Collapses `candidates` (row mask) of a columnar Population straight into cohorts, without
+        building agents; (state, region) groups smaller than `min_cohort` are left out.
+        Fields the population does not store take the CitizenAgent defaults. Returns the collapsed rows.
+        """
+        columns = population.columns
+        rows = np.flatnonzero(candidates)
+        defaults = CitizenAgent.model_fields
+        column = lambda name: (np.asarray(columns[name][rows], dtype=np.float64) if name in columns
+                               else np.full(len(rows), defaults[name].default, dtype=np.float64))
+        ideology = np.asarray(columns["ideology"][rows], dtype=np.float64)
+        values = np.column_stack([column("wealth"), column("trust_score"), column("happiness"),
+                                  ideology[:, 0], ideology[:, 1], column("fear"), column("hope")])
+        static = {name: column(name) for name in STATIC}
+        ids = [f"c{i}" for i in np.asarray(columns["id"][rows]).tolist()]
+
+        # One integer per (state, region) so grouping is a 1-D sort
+        gx = (static["x"] // self.region_size).astype(np.int64)
+        gy = (static["y"] // self.region_size).astype(np.int64)
+        width, height = int(gx.max(initial=0)) + 1, int(gy.max(initial=0)) + 1
+        keys = (np.asarray(columns["state_idx"][rows], dtype=np.int64) * width + gx) * height + gy
+        groups, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse.reshape(-1), kind="stable")
+        starts = np.concatenate([[0], np.cumsum(counts)])
+        collapsed = np.zeros(len(candidates), dtype=bool)
+        for g, key in enumerate(groups.tolist()):
+            if counts[g] < self.min_cohort:
+                continue
+            members = order[starts[g]:starts[g + 1]]
+            state_idx, cell = divmod(key, width * height)
+            key = (population.state_ids[state_idx], divmod(cell, height))
+            self.cohorts[key] = Cohort(key[0], key[1], [ids[i] for i in members.tolist()], ["Neutral"] * len(members),
+                                       values[members], {name: v[members] for name, v in static.items()})
+            collapsed[rows[members]] = True
+            self.collapsed_total += len(members)
+        return collapsed
+
+    def collapse(self, key: Tuple[str, Tuple[int, int]], citizens: List[CitizenAgent]):
+        if key in self.cohorts:
+            self.cohorts[key].absorb(citizens)
+        else:
+            self.cohorts[key] = Cohort.from_citizens(key[0], key[1], citizens)
+        for c in citizens:
+            self._snapshots.pop(c.id, None)
+        self.collapsed_total += len(citizens)
+
+    def materialize(self, keys: Iterable[Tuple[str, Tuple[int, int]]]) -> List[CitizenAgent]:
+        citizens = []
+        for key in list(keys):
+            cohort = self.cohorts.pop(key, None)
+            if cohort:
+                citizens.extend(cohort.materialize())
+        self.materialized_total += len(citizens)
+        return citizens
+
+    def keys_in_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[Tuple[str, Tuple[int, int]]]:
+        keys = []
+        for key in self.cohorts:
+            rx0, ry0, rx1, ry1 = self.region_bounds(key[1])
+            if rx0 < x1 and x0 < rx1 and ry0 < y1 and y0 < ry1:
+                keys.append(key)
+        return keys
+
+    def keys_in_reach(self, x: float, y: float, reach: float) -> List[Tuple[str, Tuple[int, int]]]:
+        """Cohorts whose region intersects a disk (e.g. a media outlet's reach)."""
+        keys = []
+        for key in self.cohorts:
+            rx0, ry0, rx1, ry1 = self.region_bounds(key[1])
+            dx = max(rx0 - x, 0.0, x - rx1)
+            dy = max(ry0 - y, 0.0, y - ry1)
+            if dx * dx + dy * dy < reach * reach:
+                keys.append(key)
+        return keys
+
+    def centroid(self, cohort: Cohort) -> Tuple[float, float]:
+        return float(cohort.static["x"].mean()), float(cohort.static["y"].mean())
+
+    def moments(self) -> Tuple[int, np.ndarray, np.ndarray]:
+        """
+        Population count plus sums and sums of squares of DYNAMIC fields over all cohorts.
+        Taken over the clipped member values, so they match what materializing would give.
+        """
+        if not self.cohorts:
+            return 0, np.zeros(len(DYNAMIC)), np.zeros(len(DYNAMIC))
+        values = np.concatenate([c.values() for c in self.cohorts.values()])
+        return len(values), values.sum(axis=0), (values ** 2).sum(axis=0)
+
+    def stats(self) -> Dict:
+        return {
+            "cohorts": len(self.cohorts),
+            "collapsed_citizens": self.population,
+            "collapsed_total": self.collapsed_total,
+            "materialized_total": self.materialized_total,
+            "region_size": self.region_size,
+            "min_cohort": self.min_cohort,
+            "focus": self.focus,
+            "by_state": {
+                state_id: sum(c.count for c in self.cohorts_for_state(state_id))
+                for state_id in {c.state_id for c in self.cohorts.values()}
+            }
+        }
@@ -0,0 +1,124 @@
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+# Default per-category sampling rates; anything not listed is always logged
+DEFAULT_RATES = {"agent_action": 0.01}
+
+class StructuredFormatter(logging.Formatter):
+    """One JSON object per line: time, level, category, message and the event's fields."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "category": getattr(record, "category", None),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class SampledLogger:
+    """
+    Structured event logger with per-category sampling.
+    The sampling decision happens before anything is formatted; dropped events only
+    bump a counter. Messages use logging's lazy %-args, so formatting (and the JSON
+    encoding) runs on the QueueListener thread, not on the tick thread.
+
+        if log.sampled("agent_action"):
+            log.event("agent_action", "agent %s chose action %d", agent_id, action, tick=tick)
+    """
+    def __init__(self, name: str = "SwormSim", rates: Optional[Dict[str, float]] = None):
+        self.logger = logging.getLogger(name)
+        self.rates = dict(DEFAULT_RATES)
+        self.rates.update(rates or {})
+        self.emitted = Counter()
+        self.suppressed = Counter()
+
+    def sampled(self, category: str, level: int = logging.INFO) -> bool:
+        """True if an event of this category should be built and emitted now."""
+        rate = self.rates.get(category, 1.0)
+        if not self.logger.isEnabledFor(level) or (rate < 1.0 and random.random() >= rate):
+            self.suppressed[category] += 1
+            return False
+        return True
+
+    def event(self, category: str, msg: str, *args, level: int = logging.INFO, exc_info=None, **fields):
+        """Emits an already-sampled event (see `sampled`)."""
+        self.emitted[category] += 1
+        self.logger.log(level, msg, *args, exc_info=exc_info, extra={"category": category, "fields": fields})
+
+    def log(self, category: str, msg: str, *args, level: int = logging.INFO, **fields):
+        """Samples and emits in one call, for paths where building the arguments is cheap."""
+        if self.sampled(category, level):
+            self.event(category, msg, *args, level=level, **fields)
+
+    def error(self, category: str, msg: str, *args, **fields):
+        # Errors are never sampled away
+        self.event(category, msg, *args, level=logging.ERROR, **fields)
+
+    def stats(self) -> Dict:
+        return {
+            "rates": self.rates,
+            "emitted": dict(self.emitted),
+            "suppressed": dict(self.suppressed)
+        }
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues the record untouched, leaving all formatting to the listener."""
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_lock = threading.Lock()
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """"agent_action=0.01,db=1" -> {"agent_action": 0.01, "db": 1.0}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        category, _, rate = item.partition("=")
+        rates[category.strip()] = float(rate)
+    return rates
+
+def configure_logging(level: Optional[str] = None, structured: Optional[bool] = None,
+                      name: str = "SwormSim") -> logging.handlers.QueueListener:
+    """
+    Routes the simulation logger through a QueueHandler; a QueueListener thread does the
+    formatting and I/O. Safe to call more than once (the first call wins).
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+        level = level or os.getenv("SWORM_LOG_LEVEL", "INFO")
+        structured = structured if structured is not None else os.getenv("SWORM_LOG_FORMAT", "json") == "json"
+
+        sink = logging.StreamHandler()
+        sink.setFormatter(StructuredFormatter() if structured else
+                          logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        log_queue = queue.SimpleQueue()
+
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        logger.addHandler(LazyQueueHandler(log_queue))
+        logger.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=True)
+        _listener.start()
+        return _listener
+
+def shutdown_logging():
+    """Flushes queued records and stops the listener thread."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
@@ -0,0 +1,187 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import types
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+import torch
+
+MB = 1024 * 1024
+# Never walked into: code, classes and modules are shared by everything
+_OPAQUE = (type, types.ModuleType, types.FunctionType, types.MethodType, types.BuiltinFunctionType, types.CodeType)
+
+def sizeof(obj, seen: Optional[set] = None) -> int:
+    """
+    Deep size in bytes of containers, plain objects, NumPy arrays, Torch tensors, modules and
+    optimizers. Objects reachable twice (or already in `seen`) are counted once, and so is a
+    buffer shared by NumPy views.
+    """
+    seen = set() if seen is None else seen
+    total, stack = 0, [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _OPAQUE):
+            continue
+        seen.add(id(o))
+        if isinstance(o, np.ndarray):
+            # getsizeof includes the buffer of an owning array; a view's buffer belongs to its base
+            total += sys.getsizeof(o)
+            if o.base is not None:
+                stack.append(o.base)
+            continue
+        if isinstance(o, torch.Tensor):
+            total += sys.getsizeof(o) + o.element_size() * o.nelement()
+            continue
+        total += sys.getsizeof(o)
+        if isinstance(o, torch.nn.Module):
+            stack.extend(o.parameters())
+            stack.extend(o.buffers())
+        elif isinstance(o, torch.optim.Optimizer):
+            stack.extend(o.state.values())
+        elif isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset, deque)):
+            stack.extend(o)
+        elif not isinstance(o, (str, bytes, int, float, bool)):
+            if hasattr(o, "__dict__"):
+                stack.append(o.__dict__)
+            for slot in getattr(type(o), "__slots__", ()):
+                if hasattr(o, slot):
+                    stack.append(getattr(o, slot))
+    return total
+
+def sampled_sizeof(items: Iterable, sample: int = 64) -> int:
+    """Deep size of a homogeneous collection, extrapolated from an evenly spaced sample."""
+    items = items if isinstance(items, (list, tuple)) else list(items)
+    if not items:
+        return 0
+    step = max(1, len(items) // sample)
+    picked = items[::step]
+    return int(sum(sizeof(item) for item in picked) * len(items) / len(picked))
+
+def process_rss() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+def container_limit() -> Optional[int]:
+    """cgroup (v2, then v1) memory limit of the container, if any."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # v1 reports "no limit" as a huge number
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value)
+    return None
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """'replay_buffers=64,process=1024' (MB) -> bytes per subsystem."""
+    budgets = {}
+    for item in filter(None, spec.split(",")):
+        name, _, mb = item.partition("=")
+        budgets[name.strip()] = int(float(mb) * MB)
+    return budgets
+
+class Subsystem:
+    def __init__(self, name: str, measure: Callable[[], Dict], shrink: Optional[Callable[[int], str]] = None):
+        # measure() -> {"bytes": ..., other counts}; shrink(budget_bytes) -> description of what it freed
+        self.name = name
+        self.measure = measure
+        self.shrink = shrink
+
+class MemoryAccountant:
+    """
+    Bytes per registered subsystem, the process RSS and (when tracemalloc is tracing, see
+    SWORM_TRACEMALLOC) the top allocation sites. Budgets are per subsystem, plus "process"
+    for the RSS: `enforce` asks every subsystem over its budget to shrink, and on a process
+    overrun asks all shrinkable subsystems to give back the excess in proportion to their size.
+    """
+    def __init__(self, budgets: Optional[Dict[str, int]] = None, top: int = 10, snapshot_interval: float = 10.0):
+        self.budgets = budgets or {}
+        self.top = top
+        self.snapshot_interval = snapshot_interval
+        self.subsystems: Dict[str, Subsystem] = {}
+        self.enforcements = deque(maxlen=20)
+        self._snapshot = None
+        self._snapshot_time = 0.0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_snapshot"] = None
+        return state
+
+    def register(self, name: str, measure: Callable[[], Dict], shrink: Optional[Callable[[int], str]] = None):
+        self.subsystems[name] = Subsystem(name, measure, shrink)
+
+    def measure(self) -> Dict[str, Dict]:
+        return {name: subsystem.measure() for name, subsystem in self.subsystems.items()}
+
+    def allocations(self, top: bool = False) -> Optional[Dict]:
+        """
+        Traced totals, and with `top` the largest allocation sites by file. Snapshots walk every
+        live trace (seconds on a big world), so one is reused for snapshot_interval seconds.
+        """
+        if not tracemalloc.is_tracing():
+            return None
+        current, peak = tracemalloc.get_traced_memory()
+        result = {"traced": current, "peak": peak}
+        if top:
+            now = time.monotonic()
+            if self._snapshot is None or now - self._snapshot_time > self.snapshot_interval:
+                self._snapshot = tracemalloc.take_snapshot().statistics("filename")[:self.top]
+                self._snapshot_time = now
+            result["snapshot_age"] = now - self._snapshot_time
+            result["top"] = [
+                {"file": stat.traceback[0].filename, "bytes": stat.size, "blocks": stat.count}
+                for stat in self._snapshot
+            ]
+        return result
+
+    def report(self, allocations: bool = False) -> Dict:
+        subsystems = self.measure()
+        for name, usage in subsystems.items():
+            if name in self.budgets:
+                usage["budget"] = self.budgets[name]
+        return {
+            "subsystems": subsystems,
+            "accounted": sum(usage["bytes"] for usage in subsystems.values()),
+            "process": {"rss": process_rss(), "budget": self.budgets.get("process"), "container_limit": container_limit()},
+            "tracemalloc": self.allocations(top=allocations),
+            "enforcements": list(self.enforcements)
+        }
+
+    def enforce(self, tick: int = 0) -> List[Dict]:
+        actions = []
+        usage = self.measure()
+        for name, subsystem in self.subsystems.items():
+            budget = self.budgets.get(name)
+            if subsystem.shrink and budget is not None and usage[name]["bytes"] > budget:
+                actions.append(self._shrink(subsystem, usage[name]["bytes"], budget, tick))
+
+        rss, budget = process_rss(), self.budgets.get("process")
+        if rss is not None and budget is not None and rss > budget:
+            shrinkable = {name: usage[name]["bytes"] for name, s in self.subsystems.items() if s.shrink}
+            total = sum(shrinkable.values())
+            excess = rss - budget
+            for name, size in shrinkable.items():
+                if total and size:
+                    target = max(0, size - int(excess * size / total))
+                    actions.append(self._shrink(self.subsystems[name], size, target, tick, reason="process"))
+            gc.collect()
+        self.enforcements.extend(actions)
+        return actions
+
+    def _shrink(self, subsystem: Subsystem, size: int, target: int, tick: int, reason: str = "subsystem") -> Dict:
+        action = subsystem.shrink(target)
+        after = subsystem.measure()["bytes"]
+        return {"tick": tick, "subsystem": subsystem.name, "reason": reason, "before": size, "target": target,
+                "after": after, "action": action}
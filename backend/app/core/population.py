@@ -0,0 +1,137 @@
+import json
+import os
+from typing import Dict, List, Optional
+import numpy as np
+from app.models.agents import CitizenAgent
+
+# Column name -> dtype. `ideology` is (n, 2): [Economic, Social]
+COLUMNS = {
+    "id": np.int64,
+    "state_idx": np.int32,
+    "education": np.float32,
+    "ideology": np.float32,
+    "honesty": np.float32,
+    "greed": np.float32,
+    "competence": np.float32,
+    "happiness": np.float32,
+    "wealth": np.float32,
+    "trust_score": np.float32,
+    "hope": np.float32,
+    "lifespan": np.int32,
+    "x": np.float32,
+    "y": np.float32,
+}
+
+class Population:
+    """
+    Whole citizen population as columnar NumPy arrays.
+    Generated in one shot per column (no per-agent RNG calls), identified by compact
+    integer ids, and saved/loaded as .npy (memory-mapped on load) or Parquet files.
+    Agents are only materialised when the engine needs them (`to_agents`); with LOD, most
+    citizens go straight from the columns into cohorts (`LODManager.collapse_population`).
+    """
+    def __init__(self, columns: Dict[str, np.ndarray], state_ids: List[str], scenario: str = ""):
+        self.columns = columns
+        self.state_ids = list(state_ids)
+        self.scenario = scenario
+
+    def __len__(self):
+        return len(self.columns["id"])
+
+    @classmethod
+    def generate(cls, state_ids: List[str], citizens_per_state: int, scenario: Optional[Dict] = None,
+                 scenario_name: str = "", id_offset: int = 0, seed: Optional[int] = None,
+                 width: float = 800.0, height: float = 600.0) -> "Population":
+        scenario = scenario or {}
+        rng = np.random.default_rng(seed)
+        n = len(state_ids) * citizens_per_state
+
+        avg_wealth = scenario.get("avg_wealth", 10.0)
+        # Default ideology matches the normal(0.5, 0.2) draw scaled to [-1, 1]; polarization widens it
+        ideology_spread = scenario.get("ideology_variance", 0.4)
+        avg_trust = scenario.get("avg_trust")
+
+        columns = {
+            "id": np.arange(id_offset, id_offset + n, dtype=np.int64),
+            "state_idx": np.repeat(np.arange(len(state_ids), dtype=np.int32), citizens_per_state),
+            "education": np.clip(rng.normal(0.5, 0.2, n), 0, 1),
+            "ideology": np.clip(rng.normal(0.0, ideology_spread, (n, 2)), -1, 1),
+            "honesty": rng.random(n),
+            "greed": rng.random(n),
+            "competence": rng.random(n),
+            "happiness": rng.uniform(40, 60, n),
+            "wealth": rng.uniform(avg_wealth * 0.5, avg_wealth * 1.5, n),
+            "trust_score": np.full(n, 50.0) if avg_trust is None else np.clip(rng.normal(avg_trust, 10.0, n), 0, 100),
+            "hope": np.full(n, 0.5),
+            "lifespan": np.full(n, 100),
+            "x": rng.random(n) * width,
+            "y": rng.random(n) * height,
+        }
+        columns = {name: values.astype(COLUMNS[name]) for name, values in columns.items()}
+        return cls(columns, state_ids, scenario=scenario_name)
+
+    def to_agents(self, rows: Optional[np.ndarray] = None) -> List[CitizenAgent]:
+        """
+        Materialises CitizenAgents (all, or only `rows`) from plain Python lists (one bulk
+        `tolist` per column). Costs a validated pydantic object per citizen, so callers that
+        can keep citizens columnar (LOD cohorts) should pass only the rows they need.
+        """
+        c = self.columns if rows is None else {name: self.columns[name][rows] for name in COLUMNS}
+        columns = {name: c[name].tolist() for name in COLUMNS if name != "ideology"}
+        ideology = c["ideology"].tolist()
+        agents = []
+        for i in range(len(columns["id"])):
+            agents.append(CitizenAgent(
+                id=f"c{columns['id'][i]}",
+                state_id=self.state_ids[columns["state_idx"][i]],
+                education=columns["education"][i],
+                ideology=ideology[i],
+                honesty=columns["honesty"][i],
+                greed=columns["greed"][i],
+                competence=columns["competence"][i],
+                happiness=columns["happiness"][i],
+                wealth=columns["wealth"][i],
+                trust_score=columns["trust_score"][i],
+                hope=columns["hope"][i],
+                lifespan=columns["lifespan"][i],
+                x=columns["x"][i],
+                y=columns["y"][i]
+            ))
+        return agents
+
+    def save(self, path: str, fmt: str = "npy"):
+        """Writes one .npy file per column (or a single population.parquet) plus meta.json."""
+        os.makedirs(path, exist_ok=True)
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump({"state_ids": self.state_ids, "scenario": self.scenario, "format": fmt, "size": len(self)}, f)
+
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = {name: values for name, values in self.columns.items() if name != "ideology"}
+            table["ideology_economic"] = self.columns["ideology"][:, 0]
+            table["ideology_social"] = self.columns["ideology"][:, 1]
+            pq.write_table(pa.table(table), os.path.join(path, "population.parquet"))
+        else:
+            for name, values in self.columns.items():
+                np.save(os.path.join(path, f"{name}.npy"), values)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "Population":
+        """Loads a saved population; .npy columns are memory-mapped (read on access, not up front)."""
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+
+        if meta.get("format") == "parquet":
+            import pyarrow.parquet as pq
+            table = pq.read_table(os.path.join(path, "population.parquet"), memory_map=mmap)
+            columns = {name: table.column(name).to_numpy() for name in COLUMNS if name != "ideology"}
+            columns["ideology"] = np.column_stack([
+                table.column("ideology_economic").to_numpy(), table.column("ideology_social").to_numpy()
+            ])
+        else:
+            columns = {
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                for name in COLUMNS
+            }
+        return cls(columns, meta["state_ids"], scenario=meta.get("scenario", ""))
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+class ResponseCache:
+    """
+    Encoded responses keyed by (route, query shape), each tagged with the world version
+    it was built at. A lookup at the same version returns the cached bytes and ETag;
+    a newer version rebuilds and replaces the entry (old versions are never served).
+    Bounded LRU over query shapes.
+    """
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        # key -> (version, etag, body)
+        self.entries: "OrderedDict[Tuple, Tuple[str, str, bytes]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def etag(key: Tuple, version: str) -> str:
+        shape = hashlib.blake2b(repr(key).encode(), digest_size=6).hexdigest()
+        return f'"{version}-{shape}"'
+
+    def lookup(self, key: Tuple, version: str, if_none_match: Optional[str] = None) -> Optional[Tuple[str, Optional[bytes]]]:
+        """
+        (etag, body) for a cached entry at `version`, or (etag, None) if the client
+        already holds it (If-None-Match). None on a miss.
+        """
+        etag = self.etag(key, version)
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(",")):
+            with self.lock:
+                self.not_modified += 1
+            return etag, None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def store(self, key: Tuple, version: str, body: bytes) -> str:
+        etag = self.etag(key, version)
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = (version, etag, body)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return etag
+
+    def get(self, key: Tuple, version: str, build: Callable[[], Any], if_none_match: Optional[str] = None,
+            encode: Optional[Callable[[Any], bytes]] = None) -> Tuple[str, Optional[bytes]]:
+        """Cached (etag, body) for `key` at `version`, building and encoding (JSON by default) on a miss."""
+        cached = self.lookup(key, version, if_none_match)
+        if cached is not None:
+            return cached
+        built = build()
+        body = encode(built) if encode else json.dumps(built, separators=(",", ":")).encode()
+        return self.store(key, version, body), body
+
+    def trim(self, max_bytes: int) -> str:
+        """Evicts least recently used entries until the cached bodies fit in `max_bytes`."""
+        with self.lock:
+            size = sum(len(entry[2]) for entry in self.entries.values())
+            evicted = 0
+            while self.entries and size > max_bytes:
+                _, (_, _, body) = self.entries.popitem(last=False)
+                size -= len(body)
+                evicted += 1
+        return f"evicted {evicted} cached responses"
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "bytes": sum(len(entry[2]) for entry in self.entries.values())
+        }
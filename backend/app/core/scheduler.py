@@ -0,0 +1,146 @@
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+class Shard:
+    """
+    The slice of agents a round-robin phase handles on this run (`index` of `count`).
+    `weight` is how many ticks of updates each covered agent stands for (shards x period),
+    so rate-based dynamics can scale their step and keep the same average drift.
+    """
+    def __init__(self, index: int = 0, count: int = 1, weight: int = 1):
+        self.index = index
+        self.count = count
+        self.weight = weight
+
+    def select(self, items: Sequence) -> Sequence:
+        return items if self.count == 1 else items[self.index::self.count]
+
+class Phase:
+    """
+    One step of the tick pipeline.
+    Runs when (tick - offset) % period == 0. With `shards` > 1 each run only covers
+    1/shards of the agents, rotating round-robin; only phases registered `shardable`
+    (their function slices by the Shard it gets) accept that. Optional phases can be
+    deferred when the tick budget is spent; essential ones always run.
+    """
+    def __init__(self, name: str, fn: Callable, period: int = 1, offset: int = 0, priority: int = 0,
+                 cost: float = 0.0, shards: int = 1, essential: bool = True, shardable: bool = False):
+        self.name = name
+        self.fn = fn
+        self.period = period
+        self.offset = offset
+        self.priority = priority
+        self.shardable = shardable
+        self.shards = shards
+        self.essential = essential
+        if shards > 1 and not shardable:
+            raise ValueError(f"Phase {name} does not support shards")
+        self.enabled = True
+        # Estimated seconds per run; starts at the declared cost and follows measured time (EWMA)
+        self.cost = cost
+
+        self.runs = 0
+        self.deferred = 0
+        self.total_seconds = 0.0
+        self.last_tick = 0
+        self._pending = False
+        self._deferrals = 0 # consecutive
+
+    def due(self, tick: int) -> bool:
+        return self.enabled and (self._pending or (tick - self.offset) % self.period == 0)
+
+    def stats(self) -> Dict:
+        return {
+            "period": self.period,
+            "offset": self.offset,
+            "priority": self.priority,
+            "shards": self.shards,
+            "shardable": self.shardable,
+            "essential": self.essential,
+            "enabled": self.enabled,
+            "runs": self.runs,
+            "deferred": self.deferred,
+            "total_seconds": self.total_seconds,
+            "avg_seconds": self.total_seconds / self.runs if self.runs else 0.0,
+            "last_tick": self.last_tick
+        }
+
+class TickScheduler:
+    """
+    Multi-rate phase scheduler.
+    Phases register with a period, priority and cost; every tick the due phases run in
+    registration order. With a `budget` (seconds per tick), optional phases are admitted
+    by priority until the estimated cost is spent, and the rest are deferred to the next tick.
+    A phase deferred `max_deferrals` times in a row runs regardless, so nothing starves.
+    """
+    def __init__(self, budget: Optional[float] = None, cost_smoothing: float = 0.2, max_deferrals: int = 5):
+        self.current_tick = 0
+        self.budget = budget
+        self.max_deferrals = max_deferrals
+        self.cost_smoothing = cost_smoothing
+        self.phases: Dict[str, Phase] = {}
+
+    def register(self, name: str, fn: Callable, **options) -> Phase:
+        phase = Phase(name, fn, **options)
+        self.phases[name] = phase
+        return phase
+
+    def configure(self, name: str, **options) -> Phase:
+        """Changes a phase's period/offset/priority/shards/enabled/essential at runtime."""
+        phase = self.phases[name]
+        for key, value in options.items():
+            if value is None:
+                continue
+            if key not in ("period", "offset", "priority", "shards", "enabled", "essential"):
+                raise ValueError(f"Unknown phase option: {key}")
+            if key in ("period", "shards") and value < 1:
+                raise ValueError(f"{key} must be >= 1")
+            if key == "shards" and value > 1 and not phase.shardable:
+                raise ValueError(f"Phase {name} does not support shards")
+            setattr(phase, key, value)
+        return phase
+
+    def tick(self):
+        self.current_tick += 1
+        return self.current_tick
+
+    def _admitted(self, due: List[Phase]) -> List[Phase]:
+        if self.budget is None:
+            return due
+        forced = [p for p in due if p.essential or p._deferrals >= self.max_deferrals]
+        admitted = {p.name for p in forced}
+        spent = sum(p.cost for p in forced)
+        for phase in sorted((p for p in due if p.name not in admitted), key=lambda p: -p.priority):
+            if spent + phase.cost <= self.budget:
+                admitted.add(phase.name)
+                spent += phase.cost
+        return [p for p in due if p.name in admitted]
+
+    def run(self, tick: int, ctx: Dict):
+        due = [p for p in self.phases.values() if p.due(tick)]
+        admitted = self._admitted(due)
+        for phase in due:
+            if phase not in admitted:
+                phase._pending = True
+                phase._deferrals += 1
+                phase.deferred += 1
+
+        for phase in admitted:
+            shard = Shard(phase.runs % phase.shards, phase.shards, phase.shards * phase.period)
+            start = time.perf_counter()
+            phase.fn(tick, ctx, shard)
+            elapsed = time.perf_counter() - start
+
+            phase.cost += self.cost_smoothing * (elapsed - phase.cost) if phase.runs else elapsed - phase.cost
+            phase.total_seconds += elapsed
+            phase.runs += 1
+            phase.last_tick = tick
+            phase._pending = False
+            phase._deferrals = 0
+
+    def stats(self) -> Dict:
+        return {
+            "tick": self.current_tick,
+            "budget": self.budget,
+            "phases": {name: phase.stats() for name, phase in self.phases.items()}
+        }
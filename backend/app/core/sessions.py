@@ -0,0 +1,315 @@
+import gzip
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from app.core.engine import SimulationEngine, log
+
+_TRUE, _FALSE = {"1", "true", "yes", "on"}, {"0", "false", "no", "off"}
+
+def parse_bool(value: Any) -> bool:
+    """JSON booleans, 0/1 and "true"/"false"/"1"/"0"/"yes"/"no"/"on"/"off"; anything else is rejected."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in _TRUE | _FALSE:
+        return value.strip().lower() in _TRUE
+    raise ValueError(f"Expected a boolean, got {value!r}")
+
+# Engine options a client may set per session (name -> parser); everything else keeps the engine default
+SESSION_OPTIONS = {
+    "scenario": str,
+    "num_states": int,
+    "citizens_per_state": int,
+    "citizen_brain": str,
+    "leader_brain": str,
+    "election_method": str,
+    "election_challengers": int,
+    "election_challenger_noise": parse_bool,
+    "influence_mode": str,
+    "social_topology": str,
+    "prioritized_replay": parse_bool,
+    "warm_start_leaders": parse_bool,
+    "tick_budget": float,
+    "phase_config": dict,
+    "lod": parse_bool,
+    "lod_region_size": float,
+}
+
+class Session:
+    """One independent world: its engine (None while evicted), worker thread and usage counters."""
+    def __init__(self, session_id: str, config: Dict):
+        self.id = session_id
+        self.config = config
+        self.engine: Optional[SimulationEngine] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.lock = threading.RLock()
+        self.created = time.time()
+        self.last_used = self.created
+        self.cpu_seconds = 0.0
+        self.requests = 0
+        self.loads = 0
+        self.evictions = 0
+        self.snapshot_bytes = 0
+        self.agent_warnings = 0
+
+    @property
+    def resident(self) -> bool:
+        return self.engine is not None
+
+    def population(self) -> int:
+        engine = self.engine
+        return len(engine.agents) + (engine.lod.population if engine.lod else 0)
+
+    def stats(self) -> Dict:
+        engine = self.engine
+        return {
+            "id": self.id,
+            "config": self.config,
+            "resident": engine is not None,
+            "tick": engine.scheduler.current_tick if engine else None,
+            "agents": self.population() if engine else None,
+            "created": self.created,
+            "idle_seconds": time.time() - self.last_used,
+            "cpu_seconds": self.cpu_seconds,
+            "requests": self.requests,
+            "loads": self.loads,
+            "evictions": self.evictions,
+            "snapshot_bytes": self.snapshot_bytes,
+            "agent_warnings": self.agent_warnings
+        }
+
+class SessionManager:
+    """
+    Independent SimulationEngine instances keyed by session id.
+    Every session runs its calls on its own single-thread worker, so sessions tick in
+    parallel while each world only ever sees one call at a time. At most `max_resident`
+    engines stay in memory: the least recently used one is pickled to
+    `{snapshot_dir}/{id}.pkl.gz` and dropped, and a reaper thread does the same for
+    sessions idle longer than `idle_timeout`. The next call reloads the snapshot.
+    Budgets: `max_agents` caps the size a world may be created with (memory) and `cpu_budget`
+    caps the CPU seconds one request may spend ticking (multi-step ticks stop early).
+    `warn_agents` is only a warning threshold: worlds that grow past it (births) keep running,
+    and each tick request that ends above it is logged and counted in `agent_warnings`.
+    """
+    def __init__(self, max_sessions: int = 50, max_resident: int = 8, idle_timeout: float = 600.0,
+                 snapshot_dir: str = "sessions", max_agents: int = 5000, cpu_budget: float = 10.0,
+                 max_steps: int = 500, warn_agents: Optional[int] = None):
+        self.max_sessions = max_sessions
+        self.max_resident = max_resident
+        self.idle_timeout = idle_timeout
+        self.snapshot_dir = snapshot_dir
+        self.max_agents = max_agents
+        self.warn_agents = max_agents if warn_agents is None else warn_agents
+        self.cpu_budget = cpu_budget
+        self.max_steps = max_steps
+        # Least recently used first
+        self.sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+    # --- Lifecycle -------------------------------------------------------
+
+    def validate(self, config: Dict) -> Dict:
+        unknown = set(config) - set(SESSION_OPTIONS)
+        if unknown:
+            raise ValueError(f"Unknown session options: {sorted(unknown)}")
+        config = {name: SESSION_OPTIONS[name](value) for name, value in config.items()}
+        size = config.get("num_states", 3) * config.get("citizens_per_state", 50)
+        if size > self.max_agents:
+            raise ValueError(f"Session needs {size} citizens; the per-session limit is {self.max_agents}")
+        return config
+
+    def create(self, config: Optional[Dict] = None) -> Future:
+        """Registers a session and builds its world on the session's worker."""
+        config = self.validate(config or {})
+        with self._lock:
+            if len(self.sessions) >= self.max_sessions:
+                raise ValueError(f"Session limit reached ({self.max_sessions})")
+            session = Session(uuid.uuid4().hex[:12], config)
+            self.sessions[session.id] = session
+        self._start_reaper()
+        return self.submit(session.id, lambda engine: session.stats())
+
+    def get(self, session_id: str) -> Session:
+        with self._lock:
+            session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def delete(self, session_id: str):
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+        if session is None:
+            raise KeyError(session_id)
+        if session.executor:
+            session.executor.shutdown(wait=False)
+        with session.lock:
+            session.engine = None
+            if os.path.exists(self._path(session_id)):
+                os.remove(self._path(session_id))
+
+    def list(self) -> List[Dict]:
+        with self._lock:
+            sessions = list(self.sessions.values())
+        return [s.stats() for s in sessions]
+
+    def shutdown(self):
+        self._stop.set()
+        with self._lock:
+            executors = [s.executor for s in self.sessions.values() if s.executor]
+        for executor in executors:
+            executor.shutdown(wait=False)
+
+    # --- Calls -----------------------------------------------------------
+
+    def submit(self, session_id: str, fn: Callable[[SimulationEngine], Any]) -> Future:
+        """Runs `fn(engine)` on the session's worker, loading the engine first if it was evicted."""
+        session = self.get(session_id)
+        with self._lock:
+            self.sessions.move_to_end(session_id)
+            if session.executor is None:
+                session.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"session-{session_id}")
+            executor = session.executor
+        return executor.submit(self._call, session, fn)
+
+    def _call(self, session: Session, fn: Callable[[SimulationEngine], Any]):
+        start = time.thread_time()
+        try:
+            with session.lock:
+                loaded = self._ensure_loaded(session)
+                session.last_used = time.time()
+                session.requests += 1
+                result = fn(session.engine)
+        finally:
+            session.cpu_seconds += time.thread_time() - start
+        if loaded:
+            self._enforce_resident()
+        return result
+
+    def tick(self, session_id: str, steps: int = 1, encode: Callable[[Dict], Any] = dict) -> Future:
+        """
+        Advances up to `steps` ticks, stopping early once the request's CPU budget is spent.
+        `encode` runs on the worker too, so the result is serialized before the world moves on.
+        """
+        if not 1 <= steps <= self.max_steps:
+            raise ValueError(f"steps must be between 1 and {self.max_steps}")
+        session = self.get(session_id)
+
+        def run(engine: SimulationEngine) -> Dict:
+            start = time.thread_time()
+            state, done = None, 0
+            while done < steps:
+                state = engine.advance()
+                done += 1
+                if time.thread_time() - start > self.cpu_budget:
+                    break
+            population = session.population()
+            if population > self.warn_agents:
+                session.agent_warnings += 1
+                log.log("sessions", "Session %s has %d agents (warning threshold %d)", session.id, population,
+                        self.warn_agents, level=logging.WARNING, session=session.id)
+            return encode({"steps": done, "truncated": done < steps, "state": state})
+        return self.submit(session_id, run)
+
+    # --- Residency -------------------------------------------------------
+
+    def _path(self, session_id: str) -> str:
+        return os.path.join(self.snapshot_dir, f"{session_id}.pkl.gz")
+
+    def _ensure_loaded(self, session: Session) -> bool:
+        if session.engine is not None:
+            return False
+        path = self._path(session.id)
+        if os.path.exists(path):
+            with gzip.open(path, "rb") as f:
+                session.engine = pickle.load(f)
+            os.remove(path)
+            log.log("sessions", "Reloaded session %s", session.id, session=session.id)
+        else:
+            session.engine = SimulationEngine(persist=False, **session.config)
+        session.loads += 1
+        return True
+
+    def evict(self, session: Session) -> bool:
+        """Snapshots a resident session to disk and drops its engine. Busy sessions are skipped."""
+        if not session.lock.acquire(blocking=False):
+            return False
+        try:
+            if session.engine is None:
+                return False
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            path = self._path(session.id)
+            data = pickle.dumps(session.engine, protocol=pickle.HIGHEST_PROTOCOL)
+            with gzip.open(path + ".tmp", "wb", compresslevel=3) as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+            session.snapshot_bytes = os.path.getsize(path)
+            session.engine = None
+            session.evictions += 1
+        finally:
+            session.lock.release()
+        with self._lock:
+            executor, session.executor = session.executor, None
+        if executor:
+            executor.shutdown(wait=False)
+        log.log("sessions", "Evicted session %s (%d bytes)", session.id, session.snapshot_bytes, session=session.id)
+        return True
+
+    def _enforce_resident(self):
+        with self._lock:
+            resident = [s for s in self.sessions.values() if s.resident]
+        for session in resident[:max(0, len(resident) - self.max_resident)]:
+            self.evict(session)
+
+    def evict_idle(self) -> int:
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            idle = [s for s in self.sessions.values() if s.resident and s.last_used < cutoff]
+        return sum(self.evict(s) for s in idle)
+
+    def _start_reaper(self):
+        with self._lock:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap, name="session-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap(self):
+        while not self._stop.wait(max(1.0, self.idle_timeout / 4)):
+            try:
+                self.evict_idle()
+            except Exception as e:
+                log.error("sessions", "Idle eviction failed: %s", e)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            sessions = list(self.sessions.values())
+        return {
+            "sessions": len(sessions),
+            "resident": sum(s.resident for s in sessions),
+            "max_sessions": self.max_sessions,
+            "max_resident": self.max_resident,
+            "idle_timeout": self.idle_timeout,
+            "max_agents": self.max_agents,
+            "warn_agents": self.warn_agents,
+            "cpu_budget": self.cpu_budget
+        }
+
+session_manager = SessionManager(
+    max_sessions=int(os.getenv("SWORM_MAX_SESSIONS", "50")),
+    max_resident=int(os.getenv("SWORM_MAX_RESIDENT_SESSIONS", "8")),
+    idle_timeout=float(os.getenv("SWORM_SESSION_IDLE_TIMEOUT", "600")),
+    snapshot_dir=os.getenv("SWORM_SESSION_DIR", "sessions"),
+    max_agents=int(os.getenv("SWORM_SESSION_MAX_AGENTS", "5000")),
+    warn_agents=int(os.environ["SWORM_SESSION_WARN_AGENTS"]) if os.getenv("SWORM_SESSION_WARN_AGENTS") else None,
+    cpu_budget=float(os.getenv("SWORM_SESSION_CPU_BUDGET", "10"))
+)
@@ -0,0 +1,137 @@
+import json
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, Optional, TypeVar
+import numpy as np
+
+T = TypeVar("T")
+
+# Citizen columns published every tick (float32, one contiguous array each)
+COLUMNS = ["x", "y", "wealth", "trust_score", "happiness", "fear", "hope",
+           "ideology_economic", "ideology_social", "state_idx"]
+
+MAGIC = b"SWRM"
+# magic, layout, seq, meta offset/length, body offset/length, columns offset, rows
+HEADER = struct.Struct("<4sIQQQQQQQ")
+SEQ_OFFSET = 8
+DATA_OFFSET = 128
+
+class SnapshotUnavailable(RuntimeError):
+    pass
+
+class SnapshotWriter:
+    """
+    Publishes the authoritative world into a named shared memory segment.
+    Layout: a fixed header guarded by a seqlock counter, then a JSON meta block
+    (version, tick, state ids, column offsets), the encoded /state body and the
+    citizen columns. The writer makes the counter odd, writes, then makes it even
+    again; readers retry whenever they saw an odd or changed counter.
+    """
+    def __init__(self, name: str = "sworm_world", size: int = 64 * 1024 * 1024):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left over from a previous engine process: take it over
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = name
+        self.seq = 0
+        self.publishes = 0
+        self.skipped = 0
+        self.shm.buf[:DATA_OFFSET] = bytes(DATA_OFFSET)
+
+    def publish(self, version: str, tick: int, body: bytes, state_ids, citizens) -> bool:
+        """Writes one snapshot; returns False (and keeps the previous one) if it doesn't fit."""
+        n = len(citizens)
+        state_index = {state_id: i for i, state_id in enumerate(state_ids)}
+        columns = np.empty((len(COLUMNS), n), dtype=np.float32)
+        columns.T[:] = [
+            (c.x, c.y, c.wealth, c.trust_score, c.happiness, c.fear, c.hope,
+             c.ideology[0], c.ideology[1], state_index.get(c.state_id, -1))
+            for c in citizens
+        ] if n else np.empty((0, len(COLUMNS)))
+
+        meta = json.dumps({
+            "version": version, "tick": tick, "state_ids": list(state_ids),
+            "columns": COLUMNS, "rows": n, "published_at": time.time()
+        }).encode()
+        meta_off = DATA_OFFSET
+        body_off = meta_off + len(meta)
+        columns_off = (body_off + len(body) + 7) // 8 * 8
+        end = columns_off + columns.nbytes
+        if end > self.shm.size:
+            self.skipped += 1
+            return False
+
+        buf = self.shm.buf
+        self.seq += 1 # odd: write in progress
+        struct.pack_into("<Q", buf, SEQ_OFFSET, self.seq)
+        buf[meta_off:body_off] = meta
+        buf[body_off:body_off + len(body)] = body
+        buf[columns_off:end] = columns.tobytes()
+        HEADER.pack_into(buf, 0, MAGIC, 1, self.seq, meta_off, len(meta), body_off, len(body), columns_off, n)
+        self.seq += 1 # even: consistent (written last, on its own)
+        struct.pack_into("<Q", buf, SEQ_OFFSET, self.seq)
+        self.publishes += 1
+        return True
+
+    def close(self, unlink: bool = True):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+class SnapshotReader:
+    """
+    Read side of the seqlock. `read(fn)` calls fn(meta, body, columns) on views straight
+    into the segment (no copy) and retries if the writer published meanwhile, so fn must
+    return data it computed, not the views themselves.
+    """
+    def __init__(self, name: str = "sworm_world", max_retries: int = 100):
+        self.name = name
+        self.max_retries = max_retries
+        self.shm: Optional[shared_memory.SharedMemory] = None
+        self.retries = 0
+        self.reads = 0
+
+    def _attach(self) -> shared_memory.SharedMemory:
+        if self.shm is None:
+            try:
+                self.shm = shared_memory.SharedMemory(name=self.name)
+            except FileNotFoundError:
+                raise SnapshotUnavailable(f"No shared world segment '{self.name}' (is the engine process running?)")
+            # Readers must not unlink the writer's segment when they exit
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        return self.shm
+
+    def read(self, fn: Callable[[Dict, memoryview, Dict[str, np.ndarray]], T]) -> T:
+        buf = self._attach().buf
+        for _ in range(self.max_retries):
+            magic, _, seq, meta_off, meta_len, body_off, body_len, columns_off, rows = HEADER.unpack_from(buf, 0)
+            if magic != MAGIC:
+                raise SnapshotUnavailable("The engine has not published a snapshot yet")
+            if seq % 2:
+                self.retries += 1
+                time.sleep(0)
+                continue
+            try:
+                meta = json.loads(bytes(buf[meta_off:meta_off + meta_len]))
+                block = np.frombuffer(buf, dtype=np.float32, count=len(COLUMNS) * rows, offset=columns_off)
+                result = fn(meta, buf[body_off:body_off + body_len], dict(zip(COLUMNS, block.reshape(len(COLUMNS), rows))))
+                del block
+            except ValueError:
+                # Torn header/meta from a concurrent publish; anything else is a real error
+                if struct.unpack_from("<Q", buf, SEQ_OFFSET)[0] == seq:
+                    raise
+                self.retries += 1
+                continue
+            if struct.unpack_from("<Q", buf, SEQ_OFFSET)[0] == seq:
+                self.reads += 1
+                return result
+            self.retries += 1
+        raise SnapshotUnavailable("Snapshot kept changing while being read")
+
+    def version(self) -> str:
+        return self.read(lambda meta, body, columns: meta["version"])
+
+    def stats(self) -> Dict:
+        return {"segment": self.name, "reads": self.reads, "retries": self.retries}
@@ -0,0 +1,172 @@
+import json
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from app.core.lod import COL
+
+class Histogram:
+    """
+    Fixed-bin histogram that also keeps the sum of values per bin and the observed range.
+    Histograms over the same edges merge by addition (states -> nation), and quantiles
+    and the Gini coefficient are read off the bins without sorting anything.
+    """
+    def __init__(self, edges: np.ndarray, counts: Optional[np.ndarray] = None, sums: Optional[np.ndarray] = None,
+                 lo: float = np.inf, hi: float = -np.inf):
+        self.edges = edges
+        self.counts = np.zeros(len(edges) - 1) if counts is None else counts
+        self.sums = np.zeros(len(edges) - 1) if sums is None else sums
+        self.lo = lo
+        self.hi = hi
+
+    @staticmethod
+    def bin_index(edges: np.ndarray, values: np.ndarray) -> np.ndarray:
+        # Out-of-range values land in the first/last bin
+        return np.clip(np.searchsorted(edges, values, side="right") - 1, 0, len(edges) - 2)
+
+    @classmethod
+    def grouped(cls, edges: np.ndarray, values: np.ndarray, groups: np.ndarray, n_groups: int) -> List["Histogram"]:
+        """One histogram per group in a single bincount pass over all values."""
+        bins = len(edges) - 1
+        flat = groups * bins + cls.bin_index(edges, values)
+        counts = np.bincount(flat, minlength=n_groups * bins).reshape(n_groups, bins)
+        sums = np.bincount(flat, weights=values, minlength=n_groups * bins).reshape(n_groups, bins)
+        lo = np.full(n_groups, np.inf)
+        hi = np.full(n_groups, -np.inf)
+        np.minimum.at(lo, groups, values)
+        np.maximum.at(hi, groups, values)
+        return [cls(edges, counts[g].astype(np.float64), sums[g], float(lo[g]), float(hi[g])) for g in range(n_groups)]
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        return Histogram(self.edges, self.counts + other.counts, self.sums + other.sums,
+                         min(self.lo, other.lo), max(self.hi, other.hi))
+
+    @property
+    def count(self) -> int:
+        return int(self.counts.sum())
+
+    def mean(self) -> float:
+        n = self.counts.sum()
+        return float(self.sums.sum() / n) if n else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Linear interpolation inside the bin holding the q-th value, clamped to the observed range."""
+        n = self.counts.sum()
+        if not n:
+            return 0.0
+        cumulative = np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, q * n, side="left"))
+        i = min(i, len(self.counts) - 1)
+        before = cumulative[i] - self.counts[i]
+        fraction = (q * n - before) / self.counts[i] if self.counts[i] else 0.0
+        left, right = max(self.edges[i], self.lo), min(self.edges[i + 1], self.hi)
+        return float(left + fraction * max(0.0, right - left))
+
+    def gini(self) -> float:
+        """Gini from the binned Lorenz curve (values within a bin counted as equal)."""
+        n, total = self.counts.sum(), self.sums.sum()
+        if not n or total <= 0:
+            return 0.0
+        population = self.counts / n
+        lorenz = np.cumsum(self.sums) / total
+        previous = np.concatenate([[0.0], lorenz[:-1]])
+        return float(max(0.0, 1.0 - (population * (lorenz + previous)).sum()))
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "gini": self.gini(),
+            "p10": self.quantile(0.1),
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9)
+        }
+
+    def to_dict(self) -> Dict:
+        return dict(self.summary(), counts=self.counts.astype(int).tolist())
+
+# Metric -> bin edges. Wealth is unbounded and skewed: one zero bin, then log-spaced bins
+EDGES = {
+    "wealth": np.concatenate([[0.0], np.geomspace(0.01, 1e7, 361)]),
+    "trust_score": np.linspace(0.0, 100.0, 21),
+    "happiness": np.linspace(0.0, 100.0, 21),
+}
+
+class DistributionTracker:
+    """
+    Per-state histograms of wealth, trust and happiness, rebuilt in one vectorized pass
+    per update (individual citizens plus the members of LOD cohorts) and merged into
+    national ones.
+    """
+    def __init__(self, edges: Optional[Dict[str, np.ndarray]] = None):
+        self.edges = edges or EDGES
+        self.version: Optional[str] = None
+        self.tick = 0
+        self.by_state: Dict[str, Dict[str, Histogram]] = {}
+        self.national: Dict[str, Histogram] = {}
+
+    def update(self, version: str, tick: int, state_ids: Sequence[str], citizens: Iterable,
+               cohorts: Iterable = ()):
+        state_index = {state_id: i for i, state_id in enumerate(state_ids)}
+        citizens = [c for c in citizens if c.state_id in state_index]
+        columns = {
+            "wealth": [c.wealth for c in citizens],
+            "trust_score": [c.trust_score for c in citizens],
+            "happiness": [c.happiness for c in citizens]
+        }
+        groups = [state_index[c.state_id] for c in citizens]
+        for cohort in cohorts:
+            if cohort.state_id not in state_index:
+                continue
+            values = cohort.values()
+            for name in columns:
+                columns[name].extend(values[:, COL[name]].tolist())
+            groups.extend([state_index[cohort.state_id]] * cohort.count)
+
+        groups = np.asarray(groups, dtype=np.intp)
+        self.by_state = {state_id: {} for state_id in state_ids}
+        self.national = {}
+        for name, edges in self.edges.items():
+            histograms = Histogram.grouped(edges, np.asarray(columns[name], dtype=np.float64), groups, len(state_ids))
+            national = Histogram(edges)
+            for state_id, histogram in zip(state_ids, histograms):
+                self.by_state[state_id][name] = histogram
+                national = national.merge(histogram)
+            self.national[name] = national
+        self.version = version
+        self.tick = tick
+
+    def metrics(self) -> Dict:
+        """National headline figures for the tick metrics."""
+        wealth = self.national.get("wealth")
+        if wealth is None or not wealth.count:
+            return {}
+        return {
+            "gini": wealth.gini(),
+            "wealth_p10": wealth.quantile(0.1),
+            "wealth_median": wealth.quantile(0.5),
+            "wealth_p90": wealth.quantile(0.9)
+        }
+
+    def to_dict(self, state_id: Optional[str] = None) -> Dict:
+        scopes = {state_id: self.by_state[state_id]} if state_id else dict(self.by_state, national=self.national)
+        return {
+            "tick": self.tick,
+            "edges": {name: edges.tolist() for name, edges in self.edges.items()},
+            "distributions": {
+                scope: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for scope, histograms in scopes.items()
+            }
+        }
+
+    def records(self, model, tick: int) -> List:
+        """One row per (scope, metric); national rows have no state_id."""
+        rows = []
+        scopes = [(None, self.national)] + list(self.by_state.items())
+        for state_id, histograms in scopes:
+            for name, histogram in histograms.items():
+                summary = histogram.summary()
+                rows.append(model(
+                    tick=tick, state_id=state_id, metric=name, count=summary["count"], mean=summary["mean"],
+                    gini=summary["gini"], p10=summary["p10"], p50=summary["p50"], p90=summary["p90"],
+                    histogram=json.dumps(histogram.counts.astype(int).tolist())
+                ))
+        return rows
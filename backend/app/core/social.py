@@ -1,11 +1,27 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import math
 import numpy as np
 from app.models.agents import CitizenAgent, AgentType
+from app.core.social_graph import SocialNetwork
+from app.core.mean_field import MeanFieldGrid, error_report
 
 class InfluenceService:
-    def __init__(self):
-        pass
+    def __init__(self, mode: str = "proximity", topology: str = "small_world", mean_degree: int = 6,
+                 rewire_prob: float = 0.1, reweight_every: int = 10, cell_size: float = 10.0):
+        # "proximity": pairwise radius model; "network": sparse social graph (CSR) propagation;
+        # "mean_field": approximate grid diffusion for massive populations
+        self.mode = mode
+        self.influence_radius = 60.0
+        self.mean_field = MeanFieldGrid(cell_size=cell_size) if mode == "mean_field" else None
+        self.reweight_every = reweight_every
+        self.network = SocialNetwork(topology=topology, mean_degree=mean_degree, rewire_prob=rewire_prob) if mode == "network" else None
+        self._steps_since_reweight = 0
+
+    def replace_citizen(self, old_id: str, new_id: str):
+        """Turnover hook: the descendant inherits (and partly rewires) the parent's social ties."""
+        if self.network:
+            self.network.replace_node(old_id, new_id)
+            self._steps_since_reweight = self.reweight_every # weights must follow the rewiring
 
     def propagate_influence(self, all_agents: List[CitizenAgent]):
         """
@@ -15,7 +31,12 @@ class InfluenceService:
         - Ideological similarity (Echo chambers)
         """
         citizens = [a for a in all_agents if a.type == AgentType.CITIZEN]
-        influence_radius = 60.0 
+        if self.network:
+            return self._propagate_network(citizens)
+        if self.mean_field:
+            return self._propagate_mean_field(citizens)
+
+        influence_radius = self.influence_radius
         base_learning_rate = 0.1
 
         for i, agent_a in enumerate(citizens):
@@ -52,3 +73,95 @@ class InfluenceService:
                     # Confirmation Bias (Memory Decay)
                     # Past influences decay unless reinforced
                     agent_b.trust_score *= (1.0 - agent_b.memory_decay * 0.1)
+
+    def _propagate_network(self, citizens: List[CitizenAgent], base_learning_rate: float = 0.1):
+        """
+        Network mode: every citizen moves toward the weighted average of its graph neighbours.
+        Double-buffered (all updates read the previous tick's values), so the result does not
+        depend on iteration order; the heavy work is two sparse matrix-vector products.
+        """
+        if not citizens:
+            return
+        network = self.network
+        by_id = {c.id: c for c in citizens}
+        if set(network.index) != by_id.keys():
+            network.build(list(by_id.keys()))
+            self._steps_since_reweight = self.reweight_every
+        ordered = [by_id[cid] for cid in network.node_ids]
+
+        trust = np.fromiter((c.trust_score for c in ordered), dtype=np.float64, count=len(ordered))
+        ideology = np.array([c.ideology for c in ordered], dtype=np.float64)
+        education = np.clip(np.fromiter((c.education for c in ordered), dtype=np.float64, count=len(ordered)), 0.0, None)
+        memory_decay = np.fromiter((c.memory_decay for c in ordered), dtype=np.float64, count=len(ordered))
+
+        if self._steps_since_reweight >= self.reweight_every or network.weights is None:
+            network.refresh(ideology, education)
+            self._steps_since_reweight = 0
+        self._steps_since_reweight += 1
+
+        # Education effect: educated citizens are harder to sway
+        susceptibility = np.clip(base_learning_rate / (education + 0.1), 0.0, 0.5)
+
+        neighbour_trust = network.weights @ trust
+        has_neighbours = np.diff(network.weights.indptr) > 0
+        new_trust = np.where(has_neighbours, trust + susceptibility * (neighbour_trust - trust), trust)
+        # Confirmation Bias (Memory Decay)
+        new_trust = np.clip(new_trust * (1.0 - memory_decay * 0.1), 0, 100)
+
+        # Ideology converges only toward aligned peers
+        aligned = network.aligned_weights
+        has_aligned = (np.bincount(
+            np.repeat(np.arange(network.size), np.diff(aligned.indptr)),
+            weights=aligned.data, minlength=network.size
+        ) > 0)[:, None]
+        neighbour_ideology = aligned @ ideology
+        new_ideology = np.where(
+            has_aligned, ideology + 0.5 * susceptibility[:, None] * (neighbour_ideology - ideology), ideology
+        )
+        new_ideology = np.clip(new_ideology, -1.0, 1.0)
+
+        for citizen, t, ideo in zip(ordered, new_trust.tolist(), new_ideology.tolist()):
+            citizen.trust_score = t
+            citizen.ideology = ideo
+
+    def _citizen_arrays(self, citizens: List[CitizenAgent]):
+        n = len(citizens)
+        x = np.fromiter((c.x for c in citizens), dtype=np.float64, count=n)
+        y = np.fromiter((c.y for c in citizens), dtype=np.float64, count=n)
+        # Columns: trust, ideology (economic), ideology (social)
+        values = np.array([[c.trust_score, *c.ideology[:2]] for c in citizens], dtype=np.float64).reshape(n, 3)
+        return x, y, values
+
+    def _propagate_mean_field(self, citizens: List[CitizenAgent], base_learning_rate: float = 0.1):
+        """
+        Mean-field mode: citizens move toward the grid-diffused average of everyone within
+        `influence_radius`. The echo-chamber weighting is dropped (all neighbours count
+        equally) in exchange for an O(N + G log G) tick.
+        """
+        if not citizens:
+            return
+        x, y, values = self._citizen_arrays(citizens)
+        means, neighbours = self.mean_field.neighbour_mean(x, y, values, self.influence_radius)
+
+        education = np.clip(np.fromiter((c.education for c in citizens), dtype=np.float64, count=len(citizens)), 0.0, None)
+        memory_decay = np.fromiter((c.memory_decay for c in citizens), dtype=np.float64, count=len(citizens))
+        susceptibility = np.where(neighbours > 0, np.clip(base_learning_rate / (education + 0.1), 0.0, 0.5), 0.0)
+
+        new_trust = values[:, 0] + susceptibility * (means[:, 0] - values[:, 0])
+        new_trust = np.clip(new_trust * (1.0 - memory_decay * 0.1), 0, 100)
+        new_ideology = np.clip(values[:, 1:] + 0.5 * susceptibility[:, None] * (means[:, 1:] - values[:, 1:]), -1.0, 1.0)
+
+        for citizen, t, ideo in zip(citizens, new_trust.tolist(), new_ideology.tolist()):
+            citizen.trust_score = t
+            citizen.ideology = ideo
+
+    def mean_field_error(self, all_agents: List[CitizenAgent], cell_size: Optional[float] = None) -> Dict:
+        """
+        Accuracy of the grid approximation against the exact radius neighbourhood for the
+        current population (trust and ideology neighbour means), plus timings of both.
+        """
+        citizens = [a for a in all_agents if a.type == AgentType.CITIZEN]
+        grid = MeanFieldGrid(cell_size=cell_size) if cell_size else (self.mean_field or MeanFieldGrid())
+        x, y, values = self._citizen_arrays(citizens)
+        return error_report(grid, x, y, values, self.influence_radius,
+                            labels=["trust", "ideology_economic", "ideology_social"])
@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional
+import numpy as np
+import scipy.sparse as sp
+
+class SocialNetwork:
+    """
+    Explicit citizen social graph stored as a SciPy CSR adjacency.
+    Topologies: "small_world" (Watts-Strogatz ring + rewiring) or "scale_free"
+    (Chung-Lu graph with power-law expected degrees). Both are generated with
+    array operations. Edge weights come from ideological similarity and the
+    education of the influencing neighbour, and are row-normalised so one
+    matrix-vector product gives every citizen's neighbourhood average.
+    """
+    def __init__(self, topology: str = "small_world", mean_degree: int = 6, rewire_prob: float = 0.1,
+                 power_law_exponent: float = 2.5, seed: Optional[int] = None):
+        self.topology = topology
+        self.mean_degree = mean_degree
+        self.rewire_prob = rewire_prob
+        self.power_law_exponent = power_law_exponent
+        self.rng = np.random.default_rng(seed)
+
+        self.node_ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        # Undirected edge list; the CSR matrices are rebuilt from it when dirty
+        self.edges_u = np.empty(0, dtype=np.int64)
+        self.edges_v = np.empty(0, dtype=np.int64)
+        self.adjacency: Optional[sp.csr_matrix] = None
+        self.weights: Optional[sp.csr_matrix] = None # all neighbours, row-normalised
+        self.aligned_weights: Optional[sp.csr_matrix] = None # ideologically aligned neighbours only
+        self.replaced_nodes: List[int] = []
+        self.dirty = True
+
+    @property
+    def size(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def edge_count(self) -> int:
+        return 0 if self.adjacency is None else self.adjacency.nnz
+
+    def build(self, citizen_ids: List[str]):
+        self.node_ids = list(citizen_ids)
+        self.index = {cid: i for i, cid in enumerate(self.node_ids)}
+        n = len(self.node_ids)
+        if self.topology == "scale_free":
+            self.edges_u, self.edges_v = self._scale_free(n)
+        else:
+            self.edges_u, self.edges_v = self._small_world(n)
+        self.replaced_nodes = []
+        self.dirty = True
+
+    def _small_world(self, n: int):
+        if n < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        half = max(1, min(self.mean_degree // 2, (n - 1) // 2))
+        u = np.tile(np.arange(n), half)
+        v = (u + np.repeat(np.arange(1, half + 1), n)) % n
+        rewire = self.rng.random(len(v)) < self.rewire_prob
+        v[rewire] = self.rng.integers(0, n, rewire.sum())
+        return u, v
+
+    def _scale_free(self, n: int):
+        if n < 2:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        # Chung-Lu: endpoint probability proportional to a power-law expected degree
+        expected = (np.arange(1, n + 1)) ** (-1.0 / (self.power_law_exponent - 1.0))
+        p = expected / expected.sum()
+        m = n * self.mean_degree // 2
+        return self.rng.choice(n, m, p=p), self.rng.choice(n, m, p=p)
+
+    def replace_node(self, old_id: str, new_id: str):
+        """A descendant takes over its parent's slot; its ties are partly rewired on the next refresh."""
+        i = self.index.pop(old_id, None)
+        if i is None:
+            return
+        self.node_ids[i] = new_id
+        self.index[new_id] = i
+        self.replaced_nodes.append(i)
+
+    def _rewire_replaced(self):
+        if not self.replaced_nodes or self.size < 2:
+            self.replaced_nodes = []
+            return
+        nodes = np.array(self.replaced_nodes)
+        self.replaced_nodes = []
+        # Edges touching a new-born node swap their far endpoint with rewire_prob
+        touch_u = np.isin(self.edges_u, nodes)
+        touch_v = np.isin(self.edges_v, nodes)
+        rewire = (touch_u | touch_v) & (self.rng.random(len(self.edges_u)) < self.rewire_prob)
+        new_ends = self.rng.integers(0, self.size, rewire.sum())
+        far_is_v = touch_u[rewire]
+        idx = np.flatnonzero(rewire)
+        self.edges_v[idx[far_is_v]] = new_ends[far_is_v]
+        self.edges_u[idx[~far_is_v]] = new_ends[~far_is_v]
+        self.dirty = True
+
+    def _rebuild_adjacency(self):
+        n = self.size
+        keep = self.edges_u != self.edges_v # no self-loops
+        u, v = self.edges_u[keep], self.edges_v[keep]
+        rows = np.concatenate([u, v])
+        cols = np.concatenate([v, u])
+        adjacency = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(n, n))
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1.0
+        self.adjacency = adjacency
+        self.dirty = False
+
+    def refresh(self, ideology: np.ndarray, education: np.ndarray):
+        """Applies pending rewiring and recomputes edge weights from current ideology/education."""
+        self._rewire_replaced()
+        if self.dirty or self.adjacency is None:
+            self._rebuild_adjacency()
+
+        adjacency = self.adjacency
+        rows = np.repeat(np.arange(self.size), np.diff(adjacency.indptr))
+        cols = adjacency.indices
+
+        education = np.clip(education, 0.0, None)
+        norms = np.linalg.norm(ideology, axis=1)
+        sim = np.einsum("ij,ij->i", ideology[rows], ideology[cols]) / (norms[rows] * norms[cols] + 0.001)
+
+        # Echo chamber: aligned peers weigh by similarity, others at a flat 0.5; educated peers are more influential
+        influence = np.where(sim > 0, sim, 0.5) * (education[cols] + 0.01)
+        aligned = np.where(sim > 0, sim * (education[cols] + 0.01), 0.0)
+
+        self.weights = self._row_normalised(rows, influence)
+        self.aligned_weights = self._row_normalised(rows, aligned)
+
+    def _row_normalised(self, rows: np.ndarray, data: np.ndarray) -> sp.csr_matrix:
+        row_sums = np.bincount(rows, weights=data, minlength=self.size)
+        safe = np.where(row_sums > 0, row_sums, 1.0)
+        normalised = (data / safe[rows]).astype(np.float32)
+        return sp.csr_matrix((normalised, self.adjacency.indices, self.adjacency.indptr), shape=self.adjacency.shape)
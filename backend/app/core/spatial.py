@@ -0,0 +1,53 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+WORLD = (0.0, 0.0, 800.0, 600.0)
+# Per-cell means returned by the map endpoint
+FIELDS = ["trust_score", "wealth", "happiness", "ideology_economic", "ideology_social"]
+
+def grid_shape(viewport: Tuple[float, float, float, float], level: Optional[int] = None,
+               cols: Optional[int] = None, rows: Optional[int] = None) -> Tuple[int, int]:
+    """Explicit cols/rows, or a quadtree level (2^level x 2^level cells over the viewport)."""
+    if cols and rows:
+        return cols, rows
+    side = 2 ** (level if level is not None else 4)
+    return cols or side, rows or side
+
+def aggregate(columns: Dict[str, np.ndarray], viewport: Tuple[float, float, float, float], cols: int, rows: int,
+              max_agents: int = 500, ids: Optional[List[str]] = None) -> Dict:
+    """
+    Bins citizens inside the viewport into a cols x rows grid (one bincount per field) and
+    returns the non-empty cells column-wise. When the viewport holds at most `max_agents`
+    citizens, the individual citizens are returned instead (mode "agents").
+    """
+    x0, y0, x1, y1 = viewport
+    x, y = columns["x"], columns["y"]
+    inside = np.flatnonzero((x >= x0) & (x < x1) & (y >= y0) & (y < y1))
+
+    result = {"viewport": [x0, y0, x1, y1], "total": int(len(inside))}
+    if len(inside) <= max_agents:
+        agents = {"x": x[inside].tolist(), "y": y[inside].tolist()}
+        agents.update({name: columns[name][inside].tolist() for name in FIELDS})
+        if ids is not None:
+            agents["id"] = [ids[i] for i in inside.tolist()]
+        result.update(mode="agents", agents=agents)
+        return result
+
+    cx = np.clip(((x[inside] - x0) * (cols / (x1 - x0))).astype(np.intp), 0, cols - 1)
+    cy = np.clip(((y[inside] - y0) * (rows / (y1 - y0))).astype(np.intp), 0, rows - 1)
+    flat = cy * cols + cx
+    counts = np.bincount(flat, minlength=cols * rows)
+    occupied = np.flatnonzero(counts)
+    n = counts[occupied]
+
+    cells = {
+        "col": (occupied % cols).tolist(),
+        "row": (occupied // cols).tolist(),
+        "count": n.tolist()
+    }
+    for name in FIELDS:
+        sums = np.bincount(flat, weights=columns[name][inside], minlength=cols * rows)
+        cells[name] = (sums[occupied] / n).tolist()
+    result.update(mode="grid", cols=cols, rows=rows,
+                  cell_size=[(x1 - x0) / cols, (y1 - y0) / rows], cells=cells)
+    return result
@@ -60,6 +60,7 @@ class SupremeLeaderService:
                 fired_events.append({
                     "tick": current_tick,
                     "type": "fired",
+                    "state_id": state_id,
                     "old_leader": leader_id,
                     "new_leader_id": new_leader.id,
                     "reason": ", ".join(reasons)
@@ -0,0 +1,158 @@
+import json
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import typing
+import numpy as np
+from app.models.agents import (
+    BaseAgent, CitizenAgent, StateLeaderAgent, SupremeLeaderAgent, MediaAgent, ExternalFactorAgent
+)
+from app.core.lod import COL
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+# ?format= values -> response media type
+FORMATS = {"json": JSON, "arrow": ARROW, "msgpack": MSGPACK}
+# Accept media types -> format
+ACCEPTED = {JSON: "json", ARROW: "arrow", MSGPACK: "msgpack", "application/x-msgpack": "msgpack",
+            "application/vnd.msgpack": "msgpack"}
+
+def _kind(annotation) -> Optional[str]:
+    if annotation in (float, int):
+        return annotation.__name__
+    if annotation is str or (isinstance(annotation, type) and issubclass(annotation, Enum)):
+        return "str"
+    if str in typing.get_args(annotation):
+        return "str"
+    return None
+
+def _agent_fields() -> Dict[str, str]:
+    """Column name -> "float"/"int"/"str" over every agent type; ideology is split like in population files."""
+    fields = {}
+    for model in (BaseAgent, CitizenAgent, StateLeaderAgent, SupremeLeaderAgent, MediaAgent, ExternalFactorAgent):
+        for name, info in model.model_fields.items():
+            if info.exclude or name in fields:
+                continue
+            if name == "ideology":
+                fields["ideology_economic"] = fields["ideology_social"] = "float"
+            elif _kind(info.annotation):
+                fields[name] = _kind(info.annotation)
+    return fields
+
+AGENT_FIELDS = _agent_fields()
+
+def negotiate(accept: Optional[str], fmt: Optional[str] = None) -> str:
+    """`?format=` wins; otherwise the supported Accept type with the highest q (first on ties); JSON by default."""
+    if fmt:
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format: {fmt} (choose from {', '.join(FORMATS)})")
+        return fmt
+    best, best_q = "json", 0.0
+    for part in (accept or "").split(","):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media in ACCEPTED and q > best_q:
+            best, best_q = ACCEPTED[media], q
+    return best
+
+def projection(fields: Optional[str]) -> Optional[List[str]]:
+    """'wealth,trust_score' -> agent columns to return ("ideology" selects both axes); None keeps all."""
+    if not fields:
+        return None
+    names = []
+    for name in filter(None, (f.strip() for f in fields.split(","))):
+        expanded = ["ideology_economic", "ideology_social"] if name == "ideology" else [name]
+        unknown = [n for n in expanded if n not in AGENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown agent field: {name}")
+        names.extend(expanded)
+    return names
+
+def agent_columns(agents: Sequence[BaseAgent], cohorts: Iterable = (), fields: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """
+    Agents as one array (numbers) or list (strings) per field, `id` always first. Individual agents
+    are read field by field; LOD cohort members are columnar already and are appended as array
+    slices (`collapsed` marks them). Fields an agent type lacks are NaN or null.
+    """
+    names = ["id"] + [name for name in AGENT_FIELDS if name != "id" and (fields is None or name in fields)]
+    records = [vars(agent) for agent in agents]
+    cohorts = [(cohort, cohort.values()) for cohort in cohorts]
+    columns = {}
+    for name in names:
+        kind = AGENT_FIELDS[name]
+        if name in ("ideology_economic", "ideology_social"):
+            axis = 0 if name == "ideology_economic" else 1
+            individual = [record["ideology"][axis] for record in records]
+        else:
+            individual = [record.get(name) for record in records]
+        members = [_cohort_column(cohort, values, name, kind) for cohort, values in cohorts]
+        if kind == "str":
+            columns[name] = individual + [value for column in members for value in column]
+            continue
+        column = np.concatenate([np.array([np.nan if v is None else v for v in individual], dtype=np.float64)] + members)
+        columns[name] = column.astype(np.int64) if kind == "int" and not np.isnan(column).any() else column
+    columns["collapsed"] = np.concatenate([np.zeros(len(records), dtype=bool)] +
+                                          [np.ones(cohort.count, dtype=bool) for cohort, _ in cohorts])
+    return columns
+
+def _cohort_column(cohort, values: np.ndarray, name: str, kind: str):
+    if name in COL:
+        return values[:, COL[name]]
+    if name in cohort.static:
+        return cohort.static[name].astype(np.float64)
+    fixed = {"id": cohort.ids, "faction": cohort.factions, "state_id": [cohort.state_id] * cohort.count,
+             "type": ["citizen"] * cohort.count}
+    if name in fixed:
+        return fixed[name]
+    return [None] * cohort.count if kind == "str" else np.full(cohort.count, np.nan)
+
+def row_columns(rows: Sequence, model) -> Dict[str, Any]:
+    """ORM rows as columns; integer/float columns without nulls become arrays."""
+    columns = {}
+    for column in model.__table__.columns:
+        values = [getattr(row, column.key) for row in rows]
+        kind = column.type.python_type
+        if kind in (int, float) and None not in values:
+            columns[column.key] = np.array(values, dtype=np.int64 if kind is int else np.float64)
+        else:
+            columns[column.key] = values
+    return columns
+
+def encode(fmt: str, name: str, columns: Dict[str, Any], meta: Dict) -> bytes:
+    """Columnar body: the `name` table plus `meta` (the JSON-able rest of the response)."""
+    return (to_arrow if fmt == "arrow" else to_msgpack)(name, columns, meta)
+
+def to_arrow(name: str, columns: Dict[str, Any], meta: Dict) -> bytes:
+    """Arrow IPC stream of one record batch; `meta` is JSON under the schema metadata key "meta"."""
+    import pyarrow as pa
+    table = pa.table(columns).replace_schema_metadata({
+        "table": name, "meta": json.dumps(meta, separators=(",", ":"))
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def to_msgpack(name: str, columns: Dict[str, Any], meta: Dict) -> bytes:
+    """
+    MessagePack map of `meta` plus {name: {"columns", "dtypes", "length"}}. Numeric columns are raw
+    little-endian buffers (np.frombuffer / typed arrays on the client), strings are arrays.
+    """
+    import msgpack
+    packed, dtypes = {}, {}
+    for key, values in columns.items():
+        if isinstance(values, np.ndarray):
+            values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+            packed[key] = values.tobytes()
+            dtypes[key] = values.dtype.str
+        else:
+            packed[key] = values
+    length = len(next(iter(columns.values()))) if columns else 0
+    return msgpack.packb(dict(meta, **{name: {"columns": packed, "dtypes": dtypes, "length": length}}),
+                         use_bin_type=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float
+from sqlalchemy import Column, Integer, Float, String, Text, Index
 from .database import Base
 
 class SimulationHistory(Base):
@@ -10,3 +10,37 @@ class SimulationHistory(Base):
     avg_wealth = Column(Float)
     avg_trust = Column(Float)
     sl_budget = Column(Float)
+
+class SimulationEvent(Base):
+    """Tick-indexed log of discrete events (elections, firings, turnover, narratives, world events)."""
+    __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_type_tick", "event_type", "tick"),
+        Index("ix_events_state_tick", "state_id", "tick"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tick = Column(Integer, index=True)
+    event_type = Column(String(32))
+    state_id = Column(String(64), nullable=True)
+    outcome = Column(String(64))
+    details = Column(Text) # JSON encoded news entry
+
+class DistributionHistory(Base):
+    """Per-tick distribution summaries (and histogram counts) per state and metric; state_id NULL = national."""
+    __tablename__ = "distribution_history"
+    __table_args__ = (
+        Index("ix_distribution_metric_state_tick", "metric", "state_id", "tick"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tick = Column(Integer, index=True)
+    state_id = Column(String(64), nullable=True)
+    metric = Column(String(32))
+    count = Column(Integer)
+    mean = Column(Float)
+    gini = Column(Float)
+    p10 = Column(Float)
+    p50 = Column(Float)
+    p90 = Column(Float)
+    histogram = Column(Text) # JSON bin counts; edges come from the DistributionTracker config
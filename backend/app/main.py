@@ -1,9 +1,32 @@
+import os
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import simulation
+from app.core.logs import configure_logging, shutdown_logging
+from app.core.sessions import session_manager
+
+# "standalone" (default): this process runs the engine and serves it (SWORM_SHM_PUBLISH=1 also
+# publishes it to shared memory); "replica": read-only worker serving that shared snapshot
+ROLE = os.getenv("SWORM_ROLE", "standalone")
+if ROLE == "replica":
+    from app.api import replica
+else:
+    from app.api import simulation, sessions
+
+# Log I/O runs on a QueueListener thread. The engine module already started it before building
+# the global world (along with SWORM_TRACEMALLOC tracing); this covers replicas, and is a no-op otherwise
+configure_logging()
 
 app = FastAPI(title="Sworm System API")
 
+@app.on_event("shutdown")
+async def flush_logs():
+    session_manager.shutdown()
+    if ROLE != "replica":
+        simulation.simulation_instance.close()
+        if simulation.publisher:
+            simulation.publisher.close()
+    shutdown_logging()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -13,7 +36,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
+if ROLE == "replica":
+    app.include_router(replica.router, prefix="/api/simulation", tags=["simulation"])
+else:
+    app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
+    # Sessions live in this process's memory, so they are not served by replicas
+    app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,125 @@
+import copy
+import queue
+import threading
+from typing import Dict
+
+class AsyncDQNLearner:
+    """
+    Actor-learner split for DQN leaders.
+    The tick thread only acts (on a frozen copy of the network) and submits transitions.
+    A background thread drains them into each policy's replay memory and runs the
+    gradient steps. Trained weights are copied to the acting networks every
+    `publish_every` ticks, so tick latency no longer depends on training cost.
+    """
+    def __init__(self, publish_every: int = 10, updates_per_transition: int = 1,
+                 train_when_idle: bool = False, idle_interval: float = 0.05):
+        self.publish_every = publish_every
+        self.updates_per_transition = updates_per_transition
+        # With spare cores the learner can keep replaying between ticks
+        self.train_when_idle = train_when_idle
+        self.idle_interval = idle_interval
+
+        self.transitions: "queue.Queue" = queue.Queue()
+        self.policies: Dict[int, object] = {}
+        self.lock = threading.Lock()
+        # Policy id -> transitions submitted but not yet trained (or dropped), for `flush`
+        self.outstanding: Dict[int, int] = {}
+        self.drained = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        self.learn_steps = 0
+        self.publishes = 0
+
+    def attach(self, policy):
+        """Puts a DQNPolicy into async mode with its own acting copy of the network."""
+        with self.lock:
+            policy.learner = self
+            policy.acting_model = copy.deepcopy(policy.agent.model)
+            self.policies[id(policy)] = policy
+
+    def detach(self, policy):
+        with self.lock:
+            self.policies.pop(id(policy), None)
+            policy.learner = None
+            policy.acting_model = None
+
+    def submit(self, policy, transition):
+        with self.drained:
+            self.outstanding[id(policy)] = self.outstanding.get(id(policy), 0) + 1
+        self.transitions.put((policy, transition))
+
+    def flush(self, policy, timeout: float = 5.0) -> bool:
+        """
+        Blocks until every transition submitted for `policy` has been trained, e.g. so a
+        terminal election reward reaches the network before the brain is retired. Without
+        a running learner thread the queue is drained on the caller's thread.
+        """
+        if not (self._thread and self._thread.is_alive()):
+            self._drain()
+        with self.drained:
+            return self.drained.wait_for(lambda: not self.outstanding.get(id(policy)), timeout)
+
+    def _drain(self):
+        while True:
+            try:
+                self._train(*self.transitions.get_nowait())
+            except queue.Empty:
+                return
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="dqn-learner", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def publish(self):
+        """Copies the latest learner weights into every acting network."""
+        with self.lock:
+            for policy in self.policies.values():
+                policy.acting_model.load_state_dict(policy.agent.model.state_dict())
+            self.publishes += 1
+
+    def maybe_publish(self, tick: int):
+        if self.publish_every > 0 and tick % self.publish_every == 0:
+            self.publish()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                policy, transition = self.transitions.get(timeout=self.idle_interval)
+            except queue.Empty:
+                if self.train_when_idle:
+                    self._train_all()
+                continue
+
+            self._train(policy, transition)
+
+    def _train(self, policy, transition):
+        with self.lock:
+            # Transitions of policies retired in the meantime are dropped
+            if id(policy) in self.policies:
+                policy.agent.remember(*transition)
+                for _ in range(self.updates_per_transition):
+                    policy.agent.learn()
+                    self.learn_steps += 1
+        with self.drained:
+            remaining = self.outstanding.get(id(policy), 0) - 1
+            if remaining > 0:
+                self.outstanding[id(policy)] = remaining
+            else:
+                self.outstanding.pop(id(policy), None)
+            self.drained.notify_all()
+
+    def _train_all(self):
+        with self.lock:
+            for policy in self.policies.values():
+                policy.agent.learn()
+                self.learn_steps += 1
@@ -0,0 +1,77 @@
+import contextlib
+import copy
+from collections import deque
+from typing import List
+from app.ml.brain_stack import DQNPolicy
+
+class LeaderBrainPool:
+    """
+    Recycles DQN brains of retired state leaders.
+    Fired or defeated leaders hand their policy back; replacements reuse the same
+    QNetwork/Adam/replay objects instead of allocating new ones. Optionally the
+    replacement starts from warm weights (the last re-elected leader) and a replay
+    memory seeded with experience collected from past leaders.
+    """
+    def __init__(self, state_size: int, action_size: int, max_idle: int = 8, warm_start: bool = True,
+                 warm_epsilon: float = 0.2, shared_experience_size: int = 2000, seed_size: int = 500,
+                 prioritized: bool = False):
+        self.state_size = state_size
+        self.action_size = action_size
+        self.prioritized = prioritized
+        self.max_idle = max_idle
+        self.warm_start = warm_start
+        self.warm_epsilon = warm_epsilon
+        self.seed_size = seed_size
+
+        self.idle: List[DQNPolicy] = []
+        self.shared_experience = deque(maxlen=shared_experience_size)
+        self.warm_weights = None
+
+        self.created = 0
+        self.recycled = 0
+
+    def acquire(self) -> DQNPolicy:
+        if self.idle:
+            policy = self.idle.pop()
+            self.recycled += 1
+        else:
+            policy = DQNPolicy(self.state_size, self.action_size, prioritized=self.prioritized)
+            self.created += 1
+        self._reset(policy)
+        return policy
+
+    def release(self, policy: DQNPolicy):
+        """Harvests a retired leader's experience and keeps its objects for reuse."""
+        self.shared_experience.extend(policy.agent.memory)
+        if len(self.idle) < self.max_idle:
+            self.idle.append(policy)
+
+    def promote(self, policy: DQNPolicy):
+        """Marks a policy's current weights as the warm start (e.g. after re-election)."""
+        # An async learner may be stepping the same network on its thread
+        with policy.learner.lock if policy.learner else contextlib.nullcontext():
+            self.warm_weights = copy.deepcopy(policy.agent.model.state_dict())
+
+    def prefill(self, count: int):
+        """Pre-allocates brains so later replacements cost no allocation."""
+        while len(self.idle) < min(count, self.max_idle):
+            self.idle.append(DQNPolicy(self.state_size, self.action_size, prioritized=self.prioritized))
+            self.created += 1
+
+    def _reset(self, policy: DQNPolicy):
+        agent = policy.agent
+        agent.memory.clear()
+        agent.optimizer.state.clear()
+
+        if self.warm_start and self.warm_weights is not None:
+            agent.model.load_state_dict(self.warm_weights)
+            agent.epsilon = max(agent.epsilon_min, self.warm_epsilon)
+        else:
+            # Cold start: fresh weights in-place, full exploration
+            for layer in agent.model.children():
+                layer.reset_parameters()
+            agent.epsilon = 1.0
+
+        if self.warm_start and self.shared_experience:
+            seed = list(self.shared_experience)[-self.seed_size:]
+            agent.memory.extend(seed)
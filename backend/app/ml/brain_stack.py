@@ -4,12 +4,15 @@ import torch
 import torch.nn as nn
 import torch.optim as optim
 import random
+import threading
+from collections import deque
 from typing import List, Dict, Any, Optional
 from sklearn.svm import SVC
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.tree import DecisionTreeClassifier
 from app.ml.dqn import DQNAgent
+from app.ml.learner import VectorizedQLearner
 
 class DecisionPolicy(ABC):
     @abstractmethod
@@ -36,14 +39,16 @@ class RuleBasedPolicy(DecisionPolicy):
         pass # Rule-based doesn't learn in this simple form
 
 class ANNPolicy(DecisionPolicy):
-    def __init__(self, state_size: int, action_size: int, hidden_size: int = 16):
-        self.model = nn.Sequential(
+    def __init__(self, state_size: int, action_size: int, hidden_size: int = 16,
+                 model: Optional[nn.Module] = None, optimizer: Optional[optim.Optimizer] = None):
+        # A model/optimizer pair may be passed in so that many agents share one weight group
+        self.model = model if model is not None else nn.Sequential(
             nn.Linear(state_size, hidden_size),
             nn.ReLU(),
             nn.Linear(hidden_size, action_size),
             nn.Softmax(dim=-1)
         )
-        self.optimizer = optim.Adam(self.model.parameters(), lr=0.01)
+        self.optimizer = optimizer if optimizer is not None else optim.Adam(self.model.parameters(), lr=0.01)
 
     def decide(self, state: np.ndarray) -> int:
         state_tensor = torch.FloatTensor(state)
@@ -60,40 +65,162 @@ class ANNPolicy(DecisionPolicy):
         loss.backward()
         self.optimizer.step()
 
+class TabularQPolicy(DecisionPolicy):
+    """
+    Cheap learning brain: one slot (Q-table) in a shared VectorizedQLearner.
+    The engine normally decides and learns for all tabular agents in one batch;
+    `decide`/`learn` are the single-agent fallbacks.
+    """
+    def __init__(self, learner: VectorizedQLearner):
+        self.learner = learner
+        self.slot = learner.allocate()
+
+    def decide(self, state: np.ndarray) -> int:
+        rows = self.learner.discretizer(state)
+        return int(self.learner.choose_actions(np.array([self.slot]), rows)[0])
+
+    def learn(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
+        d = self.learner.discretizer
+        self.learner.learn(np.array([self.slot]), d(state), np.array([action]), np.array([reward]),
+                           d(next_state), np.array([done]))
+
+    def release(self):
+        self.learner.release(self.slot)
+
 class DQNPolicy(DecisionPolicy):
-    def __init__(self, state_size: int, action_size: int, long_horizon: bool = False):
-        self.agent = DQNAgent(state_size, action_size)
+    def __init__(self, state_size: int, action_size: int, long_horizon: bool = False, prioritized: bool = False):
+        self.agent = DQNAgent(state_size, action_size, prioritized=prioritized)
         self.long_horizon = long_horizon
+        # Set by AsyncDQNLearner.attach: training then happens off the tick thread
+        self.learner = None
+        self.acting_model = None
 
     def decide(self, state: np.ndarray) -> int:
-        return self.agent.choose_action(state)
+        return self.agent.choose_action(state, model=self.acting_model)
 
     def learn(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
         if self.long_horizon:
             # Long horizon reward might consolidate multiple steps or increase gamma
             reward *= 1.5 
+        if self.learner is not None:
+            self.learner.submit(self, (state, action, reward, next_state, done))
+            return
         self.agent.remember(state, action, reward, next_state, done)
         self.agent.learn()
 
-class HybridPolicy(DecisionPolicy):
-    def __init__(self, state_size: int, action_size: int):
-        self.strategic_layer = DQNPolicy(state_size, action_size)
-        
-        # Scikit-learn models for specific behaviors
-        self.perception_layer = RandomForestClassifier(n_estimators=10)
-        self.decision_layer = DecisionTreeClassifier()
-        self.social_layer = KNeighborsClassifier(n_neighbors=3)
-        
-        # New: Fuzzy Logic Morality Layer
-        from app.core.fuzzy import FuzzyMoralityService
-        self.morality_evaluator = FuzzyMoralityService()
+class HybridEnsemble:
+    """
+    The scikit-learn layers of HybridPolicy, shareable between many agents.
+    `decide_batch` runs ONE predict per model for all rows. Learning keeps a bounded
+    window of experience and periodically refits fresh models on the actions that beat
+    the window's mean reward; refits run on a background thread and are swapped in whole.
+    """
+    def __init__(self, state_size: int, action_size: int, window: int = 500, refit_every: int = 50,
+                 min_samples: int = 10, background: bool = True):
+        self.state_size = state_size
+        self.action_size = action_size
+        self.window = deque(maxlen=window)
+        self.refit_every = refit_every
+        self.min_samples = min_samples
+        self.background = background
+        self.lock = threading.Lock()
+        self._since_refit = 0
+        self._refit_thread: Optional[threading.Thread] = None
+        self.refits = 0
 
         # Mock training data to initialize models
         X = np.random.rand(10, state_size)
         y = np.random.randint(0, action_size, 10)
-        self.perception_layer.fit(X, y)
-        self.decision_layer.fit(X, y)
-        self.social_layer.fit(X, y)
+        self.models = self._fit(X, y)
+
+        # New: Fuzzy Logic Morality Layer (greed and pressure are fixed, so resistance is a lookup on trust)
+        from app.core.fuzzy import FuzzyMoralityService
+        self.morality_evaluator = FuzzyMoralityService()
+        self._resistance_by_trust: Optional[np.ndarray] = None
+
+    def __getstate__(self):
+        # Snapshots wait for an in-flight refit and drop the lock/thread handles
+        if self._refit_thread is not None:
+            self._refit_thread.join()
+        state = self.__dict__.copy()
+        state["lock"] = None
+        state["_refit_thread"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _fit(X: np.ndarray, y: np.ndarray):
+        # Scikit-learn models for specific behaviors: (perception, decision, social)
+        perception = RandomForestClassifier(n_estimators=10).fit(X, y)
+        decision = DecisionTreeClassifier().fit(X, y)
+        social = KNeighborsClassifier(n_neighbors=min(3, len(X))).fit(X, y)
+        return perception, decision, social
+
+    def resistance(self, trust: np.ndarray) -> np.ndarray:
+        if self._resistance_by_trust is None:
+            self._resistance_by_trust = np.array([
+                self.morality_evaluator.calculate_moral_resistance(0.7, t, 0.5) for t in range(101)
+            ])
+        return self._resistance_by_trust[np.clip(np.rint(trust * 100), 0, 100).astype(np.intp)]
+
+    def decide_batch(self, states: np.ndarray, strategic_actions: np.ndarray) -> np.ndarray:
+        states = np.atleast_2d(states)
+        with self.lock:
+            models = self.models
+        votes = np.stack([strategic_actions] + [m.predict(states) for m in models], axis=1).astype(np.intp)
+
+        # Simple Voting; ties go to the earliest voter (strategic layer first), as Counter.most_common did.
+        # Each bonus exceeds the sum of the later ones and all of them stay below one vote
+        tally = np.zeros((len(states), self.action_size))
+        for voter, bonus in enumerate((0.4, 0.2, 0.1, 0.05)):
+            np.add.at(tally, (np.arange(len(states)), votes[:, voter]), 1.0 + bonus)
+        actions = tally.argmax(axis=1)
+
+        # Fuzzy Morality Constraint: 'Steal' (action 1 in economy.py) reverts to 'Maintain' under high resistance
+        steal = actions == 1
+        if steal.any():
+            guilty = self.resistance(states[steal, 0]) > 0.6
+            actions[np.flatnonzero(steal)[guilty]] = 0
+        return actions
+
+    def observe(self, state: np.ndarray, action: int, reward: float):
+        self.window.append((state, action, reward))
+        self._since_refit += 1
+        if self._since_refit >= self.refit_every and len(self.window) >= self.min_samples:
+            self._since_refit = 0
+            self.refit()
+
+    def refit(self):
+        if self._refit_thread is not None and self._refit_thread.is_alive():
+            return # One refit at a time; the next trigger catches up
+        samples = list(self.window)
+        if self.background:
+            self._refit_thread = threading.Thread(target=self._refit, args=(samples,), name="hybrid-refit", daemon=True)
+            self._refit_thread.start()
+        else:
+            self._refit(samples)
+
+    def _refit(self, samples: List):
+        rewards = np.array([r for _, _, r in samples])
+        good = [(s, a) for s, a, r in samples if r >= rewards.mean()]
+        if len(good) < self.min_samples:
+            return
+        X = np.stack([s for s, _ in good])
+        y = np.array([a for _, a in good])
+        models = self._fit(X, y)
+        with self.lock:
+            self.models = models
+            self.refits += 1
+
+class HybridPolicy(DecisionPolicy):
+    def __init__(self, state_size: int, action_size: int, ensemble: Optional[HybridEnsemble] = None,
+                 strategic_layer: Optional["DQNPolicy"] = None):
+        # Passing a shared ensemble (and a pooled DQN) lets many leaders decide in one batch
+        self.strategic_layer = strategic_layer if strategic_layer is not None else DQNPolicy(state_size, action_size)
+        self.ensemble = ensemble if ensemble is not None else HybridEnsemble(state_size, action_size)
 
     def decide(self, state: np.ndarray) -> int:
         """
@@ -101,45 +228,15 @@ class HybridPolicy(DecisionPolicy):
         Strategic Layer (DQN) has high weight for leaders.
         Perception/Social layers modify the 'raw' strategic choice.
         """
-        # 1. Get strategic action
-        strat_action = self.strategic_layer.decide(state)
-        
-        # 2. Get ensemble opinion
-        ensemble_actions = [
-            self.perception_layer.predict(state.reshape(1, -1))[0],
-            self.decision_layer.predict(state.reshape(1, -1))[0],
-            self.social_layer.predict(state.reshape(1, -1))[0]
-        ]
-        
-        # 3. Simple Voting
-        from collections import Counter
-        all_actions = [strat_action] + ensemble_actions
-        final_action = Counter(all_actions).most_common(1)[0][0]
-        
-        # 4. Fuzzy Morality Constraint
-        # Input: trust (state[0]), greed (assumed constant for policy or from state)
-        # For simplicity, we assume some state dims represent these or we pass them
-        # Let's say we check if the action is 'extreme' (e.g., Steal = 1)
-        if final_action == 1: # Action 1 is 'Steal' in economy.py
-            # Calculate resistance based on current state trust and a mock greed
-            resistance = self.morality_evaluator.calculate_moral_resistance(0.7, state[0]*100, 0.5)
-            if resistance > 0.6:
-                return 0 # Revert to 'Maintain' (Action 0) due to guilt/resistance
-        
-        return final_action
+        return int(self.decide_batch([self], state.reshape(1, -1))[0])
+
+    @staticmethod
+    def decide_batch(policies: List["HybridPolicy"], states: np.ndarray) -> np.ndarray:
+        """Decides for several hybrid agents sharing one ensemble (one predict per model)."""
+        strategic = np.array([p.strategic_layer.decide(s) for p, s in zip(policies, states)])
+        return policies[0].ensemble.decide_batch(states, strategic)
 
     def learn(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
-        # Strategic layer learns continuously
-        self.strategic.remember(state, action, reward, next_state, done)
-        self.strategic.learn()
-        
-        # Other layers might retrain periodically (e.g., every 100 steps)
-        # For this prototype, we'll keep them static or update with small probability
-        if random.random() < 0.05:
-             # Online update (very simplified)
-             X = state.reshape(1, -1)
-             y = np.array([action])
-             
-             # Scikit-learn doesn't support easy 'partial_fit' for all models
-             # This is a placeholder for real online learning
-             pass
+        # Strategic layer learns continuously; the ensemble refits on its experience window
+        self.strategic_layer.learn(state, action, reward, next_state, done)
+        self.ensemble.observe(state, action, reward)
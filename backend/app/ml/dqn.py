@@ -4,6 +4,7 @@ import torch.optim as optim
 import numpy as np
 import random
 from collections import deque
+from app.ml.replay import PrioritizedReplayBuffer
 
 class QNetwork(nn.Module):
     def __init__(self, state_size, action_size):
@@ -18,10 +19,12 @@ class QNetwork(nn.Module):
         return self.fc3(x)
 
 class DQNAgent:
-    def __init__(self, state_size, action_size, learning_rate=0.001, gamma=0.95, epsilon=1.0, epsilon_decay=0.995, epsilon_min=0.01):
+    def __init__(self, state_size, action_size, learning_rate=0.001, gamma=0.95, epsilon=1.0, epsilon_decay=0.995, epsilon_min=0.01, prioritized=False):
         self.state_size = state_size
         self.action_size = action_size
-        self.memory = deque(maxlen=2000)
+        # Prioritized replay favours high TD-error transitions such as the rare terminal election rewards
+        self.prioritized = prioritized
+        self.memory = PrioritizedReplayBuffer(capacity=2000) if prioritized else deque(maxlen=2000)
         self.gamma = gamma
         self.epsilon = epsilon
         self.epsilon_decay = epsilon_decay
@@ -31,47 +34,63 @@ class DQNAgent:
         self.optimizer = optim.Adam(self.model.parameters(), lr=learning_rate)
         self.criterion = nn.MSELoss()
 
+    def resize_memory(self, capacity: int):
+        """Replaces the replay memory with one of `capacity`, keeping the newest transitions."""
+        if self.prioritized:
+            memory = PrioritizedReplayBuffer(capacity=capacity, alpha=self.memory.alpha, beta=self.memory.beta,
+                                             beta_increment=self.memory.beta_increment, epsilon=self.memory.epsilon)
+        else:
+            memory = deque(maxlen=capacity)
+        memory.extend(list(self.memory)[-capacity:])
+        self.memory = memory
+
     def remember(self, state, action, reward, next_state, done):
         self.memory.append((state, action, reward, next_state, done))
 
-    def choose_action(self, state):
+    def choose_action(self, state, model=None):
+        """`model` overrides the network used for acting (e.g. a published copy)."""
         if np.random.rand() <= self.epsilon:
             return random.randrange(self.action_size)
         
         state_tensor = torch.FloatTensor(state).unsqueeze(0)
         with torch.no_grad():
-            action_values = self.model(state_tensor)
+            action_values = (model if model is not None else self.model)(state_tensor)
         return torch.argmax(action_values).item()
 
     def learn(self, batch_size=32):
         if len(self.memory) < batch_size:
             return
 
-        minibatch = random.sample(self.memory, batch_size)
-        for state, action, reward, next_state, done in minibatch:
-            target = reward
-            if not done:
-                next_state_tensor = torch.FloatTensor(next_state).unsqueeze(0)
-                target = reward + self.gamma * torch.max(self.model(next_state_tensor)).item()
-            
-            state_tensor = torch.FloatTensor(state).unsqueeze(0)
-            target_f = self.model(state_tensor)
-            
-            # Create a copy of the output and update the action taken
-            with torch.no_grad():
-                target_actual = target_f.clone()
-                target_actual[0][action] = target
-            
-            # Gradient descent
-            self.optimizer.zero_grad()
-            output = self.model(state_tensor)
-            loss = self.criterion(output, target_actual)
-            loss.backward()
-            self.optimizer.step()
+        if self.prioritized:
+            minibatch, leaves, weights = self.memory.sample(batch_size)
+        else:
+            minibatch = random.sample(self.memory, batch_size)
+            leaves, weights = None, np.ones(batch_size, dtype=np.float32)
+
+        states = torch.FloatTensor(np.array([t[0] for t in minibatch]))
+        actions = torch.LongTensor([t[1] for t in minibatch])
+        rewards = torch.FloatTensor([t[2] for t in minibatch])
+        next_states = torch.FloatTensor(np.array([t[3] for t in minibatch]))
+        dones = torch.FloatTensor([float(t[4]) for t in minibatch])
+
+        # One batched gradient step on the whole minibatch
+        with torch.no_grad():
+            targets = rewards + self.gamma * self.model(next_states).max(1)[0] * (1.0 - dones)
+        predicted = self.model(states).gather(1, actions.unsqueeze(1)).squeeze(1)
+        td_errors = targets - predicted
+
+        # Importance-sampling weights correct the bias introduced by prioritized sampling
+        loss = (torch.from_numpy(weights) * td_errors.pow(2)).mean()
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+        if self.prioritized:
+            self.memory.update_priorities(leaves, td_errors.detach().numpy())
 
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
     def get_q_table_snapshot(self):
         """Mock for dashboard if needed, though DQN isn't a table."""
-        return {"type": "DQN", "epsilon": self.epsilon, "memory_size": len(self.memory)}
+        return {"type": "DQN", "epsilon": self.epsilon, "memory_size": len(self.memory), "prioritized": self.prioritized}
@@ -1,6 +1,8 @@
 import random
 import json
 import os
+import numpy as np
+from typing import Callable, Dict, List, Tuple
 
 class QLearningAgent:
     def __init__(self, actions=[0, 1, 2, 3], learning_rate=0.1, discount_factor=0.9, epsilon=0.1):
@@ -83,3 +85,152 @@ class QLearningAgent:
                     # Convert keys back if needed (JSON loads keys as strings)
             except Exception as e:
                 print(f"Failed to load model: {e}")
+
+# Upper bounds of the 7-dim engine state vector:
+# [trust, wealth, happiness, budget, inflation, unemployment, inequality]
+STATE_HIGH = np.array([1.0, 1.0, 1.0, 1.0, 0.3, 0.3, 1.0])
+
+class StateDiscretizer:
+    """Maps continuous state vectors to integer table rows (uniform bins per dimension)."""
+    def __init__(self, bins: int = 3, low: np.ndarray = None, high: np.ndarray = None):
+        self.bins = bins
+        self.low = np.zeros(len(STATE_HIGH)) if low is None else np.asarray(low, dtype=float)
+        self.high = STATE_HIGH if high is None else np.asarray(high, dtype=float)
+        self.dims = len(self.high)
+        self.n_states = bins ** self.dims
+        self._place = bins ** np.arange(self.dims)
+
+    def __call__(self, states: np.ndarray) -> np.ndarray:
+        states = np.atleast_2d(states)
+        scaled = (states - self.low) / (self.high - self.low)
+        digits = np.clip((scaled * self.bins).astype(np.intp), 0, self.bins - 1)
+        return digits @ self._place
+
+class VectorizedQLearner:
+    """
+    Tabular Q-learning for many agents at once.
+    Q-values live in one dense array (tables x states x actions): one table per agent
+    slot, or a single table shared by everyone. Action selection and TD updates are
+    batched over all agents; the table is persisted as .npy.
+    """
+    def __init__(self, n_actions: int = 4, bins: int = 3, shared: bool = True, capacity: int = 64,
+                 learning_rate: float = 0.1, discount_factor: float = 0.9, epsilon: float = 0.1,
+                 wealth_scale: float = 10.0, happiness_scale: float = 10.0):
+        self.discretizer = StateDiscretizer(bins)
+        self.n_actions = n_actions
+        self.shared = shared
+        self.learning_rate = learning_rate
+        self.discount_factor = discount_factor
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng()
+
+        tables = 1 if shared else capacity
+        self.q = np.zeros((tables, self.discretizer.n_states, n_actions), dtype=np.float32)
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.capacity = capacity
+        self.updates = 0
+
+        # Same reward shaping as the citizen policy gradient: change in wealth/happiness over a tick
+        self.wealth_scale = wealth_scale
+        self.happiness_scale = happiness_scale
+        # Agent ID -> (slot, state row, action, wealth_before, happiness_before)
+        self.pending: Dict[str, Tuple[int, int, int, float, float]] = {}
+
+    def allocate(self) -> int:
+        if not self.free_slots:
+            self._grow()
+        return self.free_slots.pop()
+
+    def release(self, slot: int):
+        if not self.shared:
+            self.q[slot] = 0.0 # The next owner starts from scratch
+        self.free_slots.append(slot)
+
+    def _grow(self):
+        old = self.capacity
+        self.capacity *= 2
+        self.free_slots.extend(range(self.capacity - 1, old - 1, -1))
+        if not self.shared:
+            self.q = np.concatenate([self.q, np.zeros_like(self.q)])
+
+    def _tables(self, slots: np.ndarray) -> np.ndarray:
+        return np.zeros_like(slots) if self.shared else slots
+
+    def choose_actions(self, slots: np.ndarray, states: np.ndarray) -> np.ndarray:
+        """Batched epsilon-greedy. `states` are discretized rows (see `discretizer`)."""
+        slots = np.asarray(slots, dtype=np.intp)
+        q = self.q[self._tables(slots), states]
+        # Random tie-break among equal Q-values (unexplored rows are all zero)
+        greedy = (q + self.rng.random(q.shape) * 1e-6).argmax(axis=1)
+        explore = self.rng.random(len(slots)) < self.epsilon
+        return np.where(explore, self.rng.integers(0, self.n_actions, len(slots)), greedy)
+
+    def learn(self, slots: np.ndarray, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+              next_states: np.ndarray, dones: np.ndarray = None):
+        """
+        One batched TD(0) update. Agents hitting the same (table, state, action) cell share one
+        step of the averaged TD error, so a crowded shared table moves at the learning rate
+        instead of n times it.
+        """
+        tables = self._tables(np.asarray(slots, dtype=np.intp))
+        dones = np.zeros(len(tables), dtype=bool) if dones is None else np.asarray(dones, dtype=bool)
+        max_next = self.q[tables, next_states].max(axis=1)
+        target = rewards + self.discount_factor * max_next * (~dones)
+        td_error = target - self.q[tables, states, actions]
+        cells = np.ravel_multi_index((tables, states, actions), self.q.shape)
+        unique, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+        mean_td = np.bincount(inverse, weights=td_error, minlength=len(unique)) / counts
+        self.q.reshape(-1)[unique] += (self.learning_rate * mean_td).astype(np.float32)
+        self.updates += len(tables)
+
+    def record(self, agent_ids: List[str], slots: np.ndarray, states: np.ndarray, actions: np.ndarray, agents: Dict):
+        for agent_id, slot, row, action in zip(agent_ids, slots.tolist(), states.tolist(), actions.tolist()):
+            agent = agents[agent_id]
+            self.pending[agent_id] = (slot, row, action, getattr(agent, 'wealth', 0.0), getattr(agent, 'happiness', 50.0))
+
+    def update(self, agents: Dict, state_fn: Callable) -> int:
+        """
+        One batched TD update for everything recorded this tick. `state_fn(agent)` builds
+        the end-of-tick state vector; agents that left the simulation are dropped.
+        """
+        alive = [(agents[agent_id], record) for agent_id, record in self.pending.items() if agent_id in agents]
+        self.pending = {}
+        if not alive:
+            return 0
+
+        slots, states, actions, wealth, happiness = (np.array(col) for col in zip(*(r for _, r in alive)))
+        rewards = (
+            (np.array([getattr(a, 'wealth', 0.0) for a, _ in alive]) - wealth) / self.wealth_scale
+            + (np.array([getattr(a, 'happiness', 50.0) for a, _ in alive]) - happiness) / self.happiness_scale
+        )
+        next_states = self.discretizer(np.stack([state_fn(a) for a, _ in alive]))
+        self.learn(slots, states, actions, rewards, next_states)
+        return len(alive)
+
+    def snapshot(self) -> dict:
+        visited = np.count_nonzero(self.q.any(axis=2))
+        return {
+            "type": "TabularQ",
+            "shared": self.shared,
+            "agents": self.capacity - len(self.free_slots),
+            "states": self.discretizer.n_states,
+            "visited_states": int(visited),
+            "mean_max_q": float(self.q.max(axis=2).mean()),
+            "epsilon": self.epsilon,
+            "updates": self.updates
+        }
+
+    def save(self, filepath: str = "q_table.npy"):
+        np.save(filepath, self.q)
+
+    def load(self, filepath: str = "q_table.npy"):
+        if os.path.exists(filepath):
+            q = np.load(filepath)
+            if q.shape[1:] == self.q.shape[1:]:
+                if not self.shared and len(q) < self.capacity:
+                    # Every slot needs a table: slots beyond the saved ones start from scratch
+                    q = np.concatenate([q, np.zeros((self.capacity - len(q),) + q.shape[1:], dtype=q.dtype)])
+                self.q = q.astype(np.float32)
+                if not self.shared and len(q) > self.capacity:
+                    self.free_slots.extend(range(len(q) - 1, self.capacity - 1, -1))
+                    self.capacity = len(q)
@@ -0,0 +1,86 @@
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from typing import Dict, List, Optional, Tuple
+from app.ml.brain_stack import ANNPolicy
+
+class CitizenPolicyGradient:
+    """
+    Batched REINFORCE for ANN-driven citizens.
+    During a tick the engine records (state, action) for every ANN citizen together
+    with a snapshot of its wealth/happiness. At the end of the tick the change in
+    those values becomes the reward and each weight group gets ONE policy-gradient step.
+    """
+    def __init__(self, state_size: int, action_size: int, hidden_size: int = 8, lr: float = 0.01,
+                 wealth_scale: float = 10.0, happiness_scale: float = 10.0):
+        self.state_size = state_size
+        self.action_size = action_size
+        self.hidden_size = hidden_size
+        self.lr = lr
+        self.wealth_scale = wealth_scale
+        self.happiness_scale = happiness_scale
+        # Weight group name -> (model, optimizer) shared by all policies in that group
+        self.groups: Dict[str, Tuple[nn.Module, optim.Optimizer]] = {}
+        # Agent ID -> (policy, state, action, wealth_before, happiness_before)
+        self.pending: Dict[str, Tuple[ANNPolicy, np.ndarray, int, float, float]] = {}
+        self.updates_applied = 0
+        # Pretrained state_dict every new weight group starts from (see app.ml.pretrain)
+        self.initial_weights: Optional[Dict] = None
+
+    def shared_policy(self, group: str) -> ANNPolicy:
+        """Returns a policy bound to the shared network of a weight group."""
+        if group not in self.groups:
+            model = ANNPolicy(self.state_size, self.action_size, hidden_size=self.hidden_size).model
+            if self.initial_weights is not None:
+                model.load_state_dict(self.initial_weights)
+            self.groups[group] = (model, optim.Adam(model.parameters(), lr=self.lr))
+        model, optimizer = self.groups[group]
+        return ANNPolicy(self.state_size, self.action_size, model=model, optimizer=optimizer)
+
+    def record(self, agent_id: str, policy: ANNPolicy, state: np.ndarray, action: int, agent):
+        self.pending[agent_id] = (
+            policy, state, action,
+            getattr(agent, 'wealth', 0.0), getattr(agent, 'happiness', 50.0)
+        )
+
+    def compute_reward(self, agent, wealth_before: float, happiness_before: float) -> float:
+        wealth_delta = getattr(agent, 'wealth', 0.0) - wealth_before
+        happiness_delta = getattr(agent, 'happiness', 50.0) - happiness_before
+        return wealth_delta / self.wealth_scale + happiness_delta / self.happiness_scale
+
+    def update(self, agents: Dict) -> int:
+        """
+        Applies one batched update per distinct network for everything recorded this tick.
+        Agents that left the simulation (turnover) are dropped. Returns the number of updates.
+        """
+        batches: Dict[int, List] = {}
+        for agent_id, (policy, state, action, wealth_before, happiness_before) in self.pending.items():
+            agent = agents.get(agent_id)
+            if agent is None:
+                continue
+            reward = self.compute_reward(agent, wealth_before, happiness_before)
+            batches.setdefault(id(policy.model), []).append((policy, state, action, reward))
+        self.pending = {}
+
+        updates = 0
+        for records in batches.values():
+            policy = records[0][0]
+            states = torch.as_tensor(np.stack([r[1] for r in records]), dtype=torch.float32)
+            actions = torch.as_tensor([r[2] for r in records], dtype=torch.long)
+            rewards = torch.as_tensor([r[3] for r in records], dtype=torch.float32)
+
+            # Batch mean as baseline (variance reduction); a lone sample keeps its raw reward
+            advantages = rewards - rewards.mean() if len(records) > 1 else rewards
+
+            probs = policy.model(states)
+            log_probs = torch.log(probs.gather(1, actions.unsqueeze(1)).squeeze(1).clamp_min(1e-8))
+            loss = -(log_probs * advantages).mean()
+
+            policy.optimizer.zero_grad()
+            loss.backward()
+            policy.optimizer.step()
+            updates += 1
+
+        self.updates_applied += updates
+        return updates
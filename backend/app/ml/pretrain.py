@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+import numpy as np
+import torch
+import torch.nn as nn
+from app.ml.dqn import QNetwork
+from app.ml.traces import TraceReader, STATE_SIZE
+
+ACTION_SIZE = 4
+# Brain name -> (trace kind, trainer). Leaders are DQNs, learning citizens are shared softmax ANNs
+BRAINS = {
+    "leader_dqn": "leader",
+    "citizen_ann": "citizen",
+}
+
+def _tensors(data: np.ndarray) -> Dict[str, torch.Tensor]:
+    # Fields of the packed record dtype are strided views; torch needs contiguous columns
+    return {
+        "state": torch.from_numpy(np.ascontiguousarray(data["state"])),
+        "action": torch.from_numpy(data["action"].astype(np.int64)),
+        "reward": torch.from_numpy(data["reward"].astype(np.float32)),
+        "next_state": torch.from_numpy(np.ascontiguousarray(data["next_state"])),
+        "done": torch.from_numpy(data["done"].astype(np.float32)),
+    }
+
+def _minibatches(columns: Dict[str, torch.Tensor], batch_size: int, generator: torch.Generator):
+    order = torch.randperm(len(columns["action"]), generator=generator)
+    for start in range(0, len(order), batch_size):
+        index = order[start:start + batch_size]
+        yield {name: column[index] for name, column in columns.items()}
+
+def train_dqn(data: np.ndarray, epochs: int = 10, batch_size: int = 1024, gamma: float = 0.95,
+              lr: float = 0.001, target_every: int = 50, seed: int = 0) -> Dict:
+    """Offline fitted Q-iteration over logged leader transitions, with a periodically synced target network."""
+    torch.manual_seed(seed)
+    generator = torch.Generator().manual_seed(seed)
+    columns = _tensors(data)
+    model, target = QNetwork(STATE_SIZE, ACTION_SIZE), QNetwork(STATE_SIZE, ACTION_SIZE)
+    target.load_state_dict(model.state_dict())
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    steps, loss = 0, None
+    for _ in range(epochs):
+        for batch in _minibatches(columns, batch_size, generator):
+            with torch.no_grad():
+                targets = batch["reward"] + gamma * target(batch["next_state"]).max(1)[0] * (1.0 - batch["done"])
+            predicted = model(batch["state"]).gather(1, batch["action"].unsqueeze(1)).squeeze(1)
+            loss = nn.functional.smooth_l1_loss(predicted, targets)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            steps += 1
+            if steps % target_every == 0:
+                target.load_state_dict(model.state_dict())
+    return {"state_dict": model.state_dict(), "steps": steps, "loss": loss.item() if loss is not None else None}
+
+def train_ann(data: np.ndarray, epochs: int = 10, batch_size: int = 1024, hidden_size: int = 8,
+              lr: float = 0.01, temperature: float = 1.0, seed: int = 0) -> Dict:
+    """
+    Advantage-weighted behaviour cloning for the citizens' softmax ANN: logged actions are
+    imitated in proportion to exp(advantage / temperature), so better-than-average choices win.
+    """
+    from app.ml.brain_stack import ANNPolicy
+    torch.manual_seed(seed)
+    generator = torch.Generator().manual_seed(seed)
+    columns = _tensors(data)
+    model = ANNPolicy(STATE_SIZE, ACTION_SIZE, hidden_size=hidden_size).model
+    optimizer = torch.optim.Adam(model.parameters(), lr=lr)
+    rewards = columns["reward"]
+    advantages = (rewards - rewards.mean()) / (rewards.std() + 1e-8)
+    columns["weight"] = torch.exp(advantages / temperature).clamp_max(20.0)
+    steps, loss = 0, None
+    for _ in range(epochs):
+        for batch in _minibatches(columns, batch_size, generator):
+            probs = model(batch["state"]).gather(1, batch["action"].unsqueeze(1)).squeeze(1).clamp_min(1e-8)
+            loss = -(batch["weight"] * torch.log(probs)).mean()
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            steps += 1
+    return {"state_dict": model.state_dict(), "steps": steps, "loss": loss.item() if loss is not None else None}
+
+def _train(brain: str, trace_dir: str, out_dir: str, options: Dict) -> Dict:
+    # One brain per worker process; keep each worker's torch to a single thread
+    torch.set_num_threads(1)
+    data = TraceReader(trace_dir).load(BRAINS[brain])
+    if not len(data):
+        return {"brain": brain, "rows": 0}
+    result = (train_dqn if brain.endswith("_dqn") else train_ann)(data, **options)
+    torch.save(result.pop("state_dict"), os.path.join(out_dir, f"{brain}.pt"))
+    return dict(result, brain=brain, rows=len(data))
+
+def pretrain(trace_dir: str, out_dir: str = "brains", epochs: int = 10, batch_size: int = 1024,
+             workers: Optional[int] = None) -> Dict:
+    """Trains every brain kind found in the traces in parallel and writes `{out_dir}/*.pt` plus manifest.json."""
+    os.makedirs(out_dir, exist_ok=True)
+    options = {"epochs": epochs, "batch_size": batch_size}
+    with ProcessPoolExecutor(max_workers=workers or len(BRAINS)) as pool:
+        futures = [pool.submit(_train, brain, trace_dir, out_dir, options) for brain in BRAINS]
+        results = [f.result() for f in futures]
+    manifest = {r["brain"]: r for r in results if r["rows"]}
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump({"traces": os.path.abspath(trace_dir), "brains": manifest}, f, indent=2)
+    return manifest
+
+def load_pretrained(directory: str) -> Dict[str, Dict]:
+    """Brain name -> state_dict for every brain listed in `{directory}/manifest.json`."""
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    return {
+        brain: torch.load(os.path.join(directory, f"{brain}.pt"))
+        for brain in manifest["brains"] if brain in BRAINS
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pretrain agent brains from recorded decision traces.")
+    parser.add_argument("traces", help="Trace directory written with SWORM_TRACE_DIR")
+    parser.add_argument("--out", default="brains", help="Output directory (load with SWORM_PRETRAINED_DIR)")
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    for brain, result in pretrain(args.traces, args.out, args.epochs, args.batch_size, args.workers).items():
+        print(f"{brain}: {result['rows']} transitions, {result['steps']} steps, final loss {result['loss']:.4f}")
@@ -0,0 +1,110 @@
+import numpy as np
+from typing import List, Tuple
+
+class SumTree:
+    """
+    Array-backed binary sum-tree. Leaves hold priorities, inner nodes hold the sum
+    of their children, so sampling by prefix sum and priority updates are O(log n).
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.tree = np.zeros(2 * capacity - 1, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return self.tree[0]
+
+    def update(self, leaf: int, priority: float):
+        idx = leaf + self.capacity - 1
+        change = priority - self.tree[idx]
+        self.tree[idx] = priority
+        while idx > 0:
+            idx = (idx - 1) // 2
+            self.tree[idx] += change
+
+    def find(self, value: float) -> int:
+        """Returns the leaf whose cumulative priority range contains `value`."""
+        idx = 0
+        while idx < self.capacity - 1:
+            left = 2 * idx + 1
+            if value <= self.tree[left] or self.tree[left + 1] == 0:
+                idx = left
+            else:
+                value -= self.tree[left]
+                idx = left + 1
+        return idx - (self.capacity - 1)
+
+    def get(self, leaf: int) -> float:
+        return self.tree[leaf + self.capacity - 1]
+
+    def clear(self):
+        self.tree.fill(0.0)
+
+class PrioritizedReplayBuffer:
+    """
+    Proportional prioritized experience replay (Schaul et al.).
+    Drop-in for the DQN `deque` memory: supports append/extend/len/iter/clear,
+    plus `sample` returning importance-sampling weights and `update_priorities`.
+    """
+    def __init__(self, capacity: int = 2000, alpha: float = 0.6, beta: float = 0.4,
+                 beta_increment: float = 0.001, epsilon: float = 0.01):
+        self.capacity = capacity
+        self.alpha = alpha
+        self.beta = beta
+        self.beta_increment = beta_increment
+        self.epsilon = epsilon
+
+        self.tree = SumTree(capacity)
+        self.data: List = [None] * capacity
+        self.write = 0
+        self.size = 0
+        self.max_priority = 1.0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        # Oldest to newest, like a deque
+        start = self.write if self.size == self.capacity else 0
+        for i in range(self.size):
+            yield self.data[(start + i) % self.capacity]
+
+    def append(self, transition):
+        # New experience gets the highest priority seen so it is replayed at least once
+        self.data[self.write] = transition
+        self.tree.update(self.write, self.max_priority ** self.alpha)
+        self.write = (self.write + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def extend(self, transitions):
+        for transition in transitions:
+            self.append(transition)
+
+    def clear(self):
+        self.tree.clear()
+        self.data = [None] * self.capacity
+        self.write = 0
+        self.size = 0
+        self.max_priority = 1.0
+
+    def sample(self, batch_size: int) -> Tuple[List, np.ndarray, np.ndarray]:
+        """Stratified sampling over the priority mass. Returns (batch, leaves, is_weights)."""
+        total = self.tree.total
+        segment = total / batch_size
+        values = (np.arange(batch_size) + np.random.rand(batch_size)) * segment
+        leaves = np.array([min(self.tree.find(v), self.size - 1) for v in values])
+
+        priorities = np.array([self.tree.get(leaf) for leaf in leaves])
+        probs = priorities / total
+        self.beta = min(1.0, self.beta + self.beta_increment)
+        weights = (self.size * probs) ** (-self.beta)
+        weights /= weights.max()
+
+        batch = [self.data[leaf] for leaf in leaves]
+        return batch, leaves, weights.astype(np.float32)
+
+    def update_priorities(self, leaves: np.ndarray, td_errors: np.ndarray):
+        priorities = np.abs(td_errors) + self.epsilon
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        for leaf, priority in zip(leaves, priorities):
+            self.tree.update(int(leaf), float(priority) ** self.alpha)
@@ -0,0 +1,142 @@
+import json
+import os
+from typing import Dict, Iterator, Optional
+import numpy as np
+
+STATE_SIZE = 7
+# Agent kinds stored in the `kind` column
+KINDS = {"citizen": 0, "leader": 1}
+
+TRANSITION = np.dtype([
+    ("kind", np.uint8),
+    ("tick", np.int32),
+    ("state", np.float32, (STATE_SIZE,)),
+    ("action", np.uint8),
+    ("reward", np.float32),
+    ("next_state", np.float32, (STATE_SIZE,)),
+    ("done", np.bool_),
+])
+
+class TraceWriter:
+    """
+    Appends decision transitions to fixed-size, memory-mapped .npy chunks
+    (`chunk-00000.npy`, ...). `index.json` records how many rows of each chunk are
+    valid, so readers can memory-map finished chunks while the writer is still going.
+    """
+    def __init__(self, directory: str, chunk_size: int = 65536):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+        self.index = _read_index(directory)
+        self.chunk: Optional[np.memmap] = None
+        self.rows = 0
+        self.written = 0
+
+    def _open_chunk(self):
+        name = f"chunk-{len(self.index['chunks']):05d}.npy"
+        self.chunk = np.lib.format.open_memmap(os.path.join(self.directory, name), mode="w+",
+                                               dtype=TRANSITION, shape=(self.chunk_size,))
+        self.index["chunks"].append({"file": name, "rows": 0})
+        self.rows = 0
+
+    def append(self, kind: str, tick: int, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray,
+               next_states: np.ndarray, dones: np.ndarray):
+        """Appends a batch of transitions of one agent kind."""
+        n, start = len(actions), 0
+        while start < n:
+            if self.chunk is None or self.rows == self.chunk_size:
+                self.flush()
+                self._open_chunk()
+            take = min(n - start, self.chunk_size - self.rows)
+            block = self.chunk[self.rows:self.rows + take]
+            block["kind"] = KINDS[kind]
+            block["tick"] = tick
+            block["state"] = states[start:start + take]
+            block["action"] = actions[start:start + take]
+            block["reward"] = rewards[start:start + take]
+            block["next_state"] = next_states[start:start + take]
+            block["done"] = dones[start:start + take]
+            self.rows += take
+            self.written += take
+            start += take
+
+    def flush(self):
+        if self.chunk is None:
+            return
+        self.chunk.flush()
+        self.index["chunks"][-1]["rows"] = self.rows
+        tmp = os.path.join(self.directory, "index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, os.path.join(self.directory, "index.json"))
+
+    def close(self):
+        self.flush()
+        self.chunk = None
+
+def _read_index(directory: str) -> Dict:
+    path = os.path.join(directory, "index.json")
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+    return {"version": 1, "state_size": STATE_SIZE, "kinds": KINDS, "chunks": []}
+
+class TraceReader:
+    """Memory-maps the valid rows of every chunk in a trace directory."""
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.index = _read_index(directory)
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        for chunk in self.index["chunks"]:
+            if chunk["rows"]:
+                yield np.load(os.path.join(self.directory, chunk["file"]), mmap_mode="r")[:chunk["rows"]]
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self.index["chunks"])
+
+    def load(self, kind: str) -> np.ndarray:
+        """All transitions of one kind, copied into memory."""
+        code = KINDS[kind]
+        parts = [chunk[chunk["kind"] == code] for chunk in self.chunks()]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=TRANSITION)
+
+class DecisionTrace:
+    """
+    Engine-side recorder. Leader transitions are written as their rewards arrive;
+    citizen decisions are held until the end of the tick, when the change in wealth
+    and happiness becomes the reward (the same signal the citizen learners use).
+    """
+    def __init__(self, writer: TraceWriter, wealth_scale: float = 10.0, happiness_scale: float = 10.0,
+                 flush_every: int = 50):
+        self.writer = writer
+        self.flush_every = flush_every
+        self.wealth_scale = wealth_scale
+        self.happiness_scale = happiness_scale
+        # Agent ID -> (state, action, wealth_before, happiness_before)
+        self.pending: Dict[str, tuple] = {}
+
+    def observe_citizen(self, agent_id: str, state: np.ndarray, action: int, agent):
+        self.pending[agent_id] = (state, action, agent.wealth, agent.happiness)
+
+    def leader(self, tick: int, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
+        self.writer.append("leader", tick, np.asarray([state]), np.asarray([action]), np.asarray([reward]),
+                           np.asarray([next_state]), np.asarray([done]))
+
+    def end_tick(self, tick: int, agents: Dict, state_fn) -> int:
+        alive = [(agents[agent_id], record) for agent_id, record in self.pending.items() if agent_id in agents]
+        self.pending = {}
+        if alive:
+            states, actions, wealth, happiness = (np.array(col) for col in zip(*(r for _, r in alive)))
+            rewards = (
+                (np.array([a.wealth for a, _ in alive]) - wealth) / self.wealth_scale
+                + (np.array([a.happiness for a, _ in alive]) - happiness) / self.happiness_scale
+            )
+            next_states = np.stack([state_fn(a) for a, _ in alive])
+            self.writer.append("citizen", tick, states, actions, rewards, next_states, np.zeros(len(alive), dtype=bool))
+        if tick % self.flush_every == 0:
+            self.writer.flush()
+        return len(alive)
+
+    def close(self):
+        self.writer.close()
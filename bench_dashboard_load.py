@@ -0,0 +1,185 @@
+"""
+Simulated dashboard load against the simulation API.
+
+Many frontends poll /state and /history (revalidating with If-None-Match) and occasionally
+tick, at several client counts and world sizes; prints throughput, per-route latency
+percentiles and how much slower a tick gets under load. Runs the app in-process on a
+fresh, non-persisting world by default, or against a running server with --url:
+
+    python bench_dashboard_load.py --clients 1,10,50 --populations 50,200
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+sys.path.append("backend")
+
+# Route name -> (method, path). A dashboard polls state and history every second and sometimes ticks
+ROUTES = {
+    "state": ("GET", "/api/simulation/state"),
+    "history": ("GET", "/api/simulation/history"),
+    "map": ("GET", "/api/simulation/map?level=4"),
+    "tick": ("POST", "/api/simulation/tick"),
+}
+# Requests per poll: whole part always, fractional part as a probability
+DEFAULT_MIX = {"state": 1.0, "history": 1.0, "map": 0.0, "tick": 0.05}
+
+def percentiles(values: List[float]) -> Dict:
+    if not values:
+        return {"p50": None, "p90": None, "p99": None, "max": None}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": ordered[-1]}
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def report(self, duration: float) -> Dict:
+        total = sum(len(v) for v in self.latencies.values())
+        ticks = len(self.latencies["tick"])
+        return {
+            "requests": total,
+            "throughput": total / duration,
+            "ticks_per_second": ticks / duration,
+            "errors": dict(self.errors),
+            "routes": {
+                route: dict(percentiles(values), count=len(values), statuses=dict(self.statuses[route]))
+                for route, values in self.latencies.items()
+            }
+        }
+
+class Dashboard:
+    """One simulated frontend: polls on an interval, revalidating with If-None-Match like a browser cache."""
+    def __init__(self, client, mix: Dict[str, float], interval: float, recorder: Recorder,
+                 conditional: bool = True, seed: Optional[int] = None):
+        self.client = client
+        self.mix = mix
+        self.interval = interval
+        self.recorder = recorder
+        self.conditional = conditional
+        self.rng = random.Random(seed)
+        self.etags: Dict[str, str] = {}
+
+    async def request(self, route: str):
+        method, path = ROUTES[route]
+        headers = {"If-None-Match": self.etags[route]} if self.conditional and route in self.etags else {}
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=headers)
+            await response.aread()
+        except Exception as e:
+            self.recorder.errors[type(e).__name__] += 1
+            return
+        self.recorder.latencies[route].append(time.perf_counter() - start)
+        self.recorder.statuses[route][response.status_code] += 1
+        if "etag" in response.headers:
+            self.etags[route] = response.headers["etag"]
+
+    async def run(self, deadline: float):
+        loop = asyncio.get_running_loop()
+        # Spread the clients over the first interval instead of polling in lockstep
+        await asyncio.sleep(self.rng.random() * self.interval)
+        while loop.time() < deadline:
+            started = loop.time()
+            for route, weight in self.mix.items():
+                for _ in range(int(weight) + (self.rng.random() < weight % 1)):
+                    await self.request(route)
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
+
+async def run_level(client, clients: int, duration: float, interval: float, mix: Dict[str, float],
+                    conditional: bool = True) -> Dict:
+    recorder = Recorder()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        Dashboard(client, mix, interval, recorder, conditional, seed=i).run(deadline) for i in range(clients)
+    ))
+    return recorder.report(time.perf_counter() - start)
+
+async def tick_baseline(client, ticks: int = 3) -> Optional[float]:
+    """Median latency of a few ticks with no other load (also warms the world up)."""
+    recorder = Recorder()
+    dashboard = Dashboard(client, {}, 0.0, recorder)
+    for _ in range(ticks):
+        await dashboard.request("tick")
+    return percentiles(recorder.latencies["tick"])["p50"]
+
+def _in_process_client(citizens_per_state: int):
+    """httpx client bound to the FastAPI app in this process, with a fresh in-memory world of the given size."""
+    import httpx
+    from app.api import simulation
+    from app.core.engine import SimulationEngine
+    from app.main import app
+    simulation.simulation_instance = SimulationEngine(citizens_per_state=citizens_per_state, persist=False)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=120)
+
+async def run(url: Optional[str], clients: List[int], populations: List[int], duration: float, interval: float,
+              mix: Dict[str, float], conditional: bool = True) -> List[Dict]:
+    """
+    Every (population, clients) combination for `duration` seconds. Against a URL the server's
+    world is used as-is (population reported as None). `tick_slowdown` is the p50 tick latency
+    under load relative to an unloaded tick of the same world.
+    """
+    import httpx
+    results = []
+    for population in (populations if url is None else [None]):
+        client = httpx.AsyncClient(base_url=url, timeout=120) if url else _in_process_client(population)
+        async with client:
+            baseline = await tick_baseline(client)
+            for n in clients:
+                report = await run_level(client, n, duration, interval, mix, conditional)
+                tick_p50 = report["routes"].get("tick", {}).get("p50")
+                report.update(population=population, clients=n, tick_baseline=baseline,
+                              tick_slowdown=tick_p50 / baseline if tick_p50 and baseline else None)
+                results.append(report)
+                print(_format(report), flush=True)
+    return results
+
+def _format(report: Dict) -> str:
+    ms = lambda v: "-" if v is None else f"{v * 1000:.1f}"
+    line = (f"pop/state={report['population']} clients={report['clients']}  {report['throughput']:.1f} req/s  "
+            f"{report['ticks_per_second']:.2f} ticks/s")
+    if report["tick_slowdown"]:
+        line += f" (tick x{report['tick_slowdown']:.2f})"
+    for route, stats in sorted(report["routes"].items()):
+        line += f"  {route} p50/p99 {ms(stats['p50'])}/{ms(stats['p99'])}ms"
+    return line + f"  errors={report['errors']}"
+
+def _ints(spec: str) -> List[int]:
+    return [int(part) for part in spec.split(",") if part]
+
+def _mix(spec: str) -> Dict[str, float]:
+    mix = dict(DEFAULT_MIX)
+    for item in filter(None, spec.split(",")):
+        route, _, weight = item.partition("=")
+        if route not in ROUTES:
+            raise SystemExit(f"Unknown route in mix: {route} (choose from {', '.join(ROUTES)})")
+        mix[route] = float(weight)
+    return mix
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulated dashboard load against the simulation API.")
+    parser.add_argument("--url", help="Base URL of a running server (default: the app in-process)")
+    parser.add_argument("--clients", default="1,10,50", help="Comma-separated client counts")
+    parser.add_argument("--populations", default="50", help="Citizens per state, in-process only")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between a client's polls")
+    parser.add_argument("--mix", default="", help='Requests per poll, e.g. "state=1,history=1,map=0.2,tick=0.05"')
+    parser.add_argument("--no-conditional", action="store_true", help="Don't send If-None-Match")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.url, _ints(args.clients), _ints(args.populations), args.duration,
+                              args.interval, _mix(args.mix), conditional=not args.no_conditional))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,86 @@
+"""
+Actor-learner check for AsyncDQNLearner.
+
+1. Publishing: the acting copy stays frozen while the learner thread trains, and
+   `maybe_publish` copies the trained weights exactly every `publish_every` ticks.
+2. Flush: with a backlog of transitions queued for two policies, `flush` returns only after
+   every transition of its policy reached the replay memory and was trained.
+3. Retire: a leader retired right after its terminal election reward (behind a backlog, and
+   again with the learner thread stopped) must have that reward in its replay memory and in
+   the pool's shared experience, and be detached from the learner.
+"""
+import sys
+import numpy as np
+import torch
+
+sys.path.append("backend")
+from app.core.engine import SimulationEngine
+from app.ml.async_learner import AsyncDQNLearner
+from app.ml.brain_stack import DQNPolicy
+
+PUBLISH_EVERY, TICKS = 5, 23
+
+def same_weights(a, b):
+    return all(torch.equal(x, y) for x, y in zip(a.state_dict().values(), b.state_dict().values()))
+
+def transition(reward=0.0, done=False):
+    return np.random.random(7), np.random.randint(4), reward, np.random.random(7), done
+
+def queue_terminal(engine, leader_id, backlog):
+    """A leader's backlog of ordinary transitions followed by its terminal election reward."""
+    policy = engine.agent_policies[leader_id]
+    for _ in range(backlog):
+        policy.learn(*transition())
+    policy.learn(*transition(reward=-123.0, done=True))
+    return policy
+
+def terminal_kept(memory):
+    return any(t[2] == -123.0 and t[4] for t in memory)
+
+if __name__ == "__main__":
+    learner = AsyncDQNLearner(publish_every=PUBLISH_EVERY)
+    policy = DQNPolicy(7, 4)
+    learner.attach(policy)
+    learner.start()
+    for tick in range(1, TICKS + 1):
+        for _ in range(16):
+            policy.learn(*transition())
+        assert learner.flush(policy)
+        # Learning starts once the replay memory holds a batch (tick 2)
+        behind = not same_weights(policy.acting_model, policy.agent.model)
+        learner.maybe_publish(tick)
+        if tick % PUBLISH_EVERY:
+            assert tick < 2 or behind, f"acting copy caught up without a publish at tick {tick}"
+        else:
+            assert same_weights(policy.acting_model, policy.agent.model), f"no publish at tick {tick}"
+    assert learner.publishes == TICKS // PUBLISH_EVERY
+    print(f"publish: {learner.publishes} publishes in {TICKS} ticks (every {PUBLISH_EVERY}), "
+          f"{learner.learn_steps} learner steps, acting copy frozen in between")
+
+    other = DQNPolicy(7, 4)
+    learner.attach(other)
+    before = len(policy.agent.memory), learner.learn_steps
+    for _ in range(300):
+        policy.learn(*transition())
+        other.learn(*transition())
+    assert learner.flush(policy)
+    assert id(policy) not in learner.outstanding and len(policy.agent.memory) == min(2000, before[0] + 300)
+    assert learner.flush(other) and not learner.outstanding and learner.transitions.empty()
+    assert learner.learn_steps == before[1] + 600
+    print("flush: 600 queued transitions for two policies all trained, queue empty")
+    learner.stop()
+
+    engine = SimulationEngine(citizens_per_state=10, persist=False, async_learning=True, publish_every=PUBLISH_EVERY)
+    leaders = [a_id for a_id, p in engine.agent_policies.items() if isinstance(p, DQNPolicy) and not p.long_horizon]
+    for leader_id, backlog, running in ((leaders[0], 200, True), (leaders[1], 20, False)):
+        if not running:
+            engine.async_learner.stop()
+        retired = queue_terminal(engine, leader_id, backlog)
+        engine._retire_policy(leader_id)
+        assert terminal_kept(retired.agent.memory) and terminal_kept(engine.leader_pool.shared_experience)
+        assert retired.learner is None and id(retired) not in engine.async_learner.policies
+        assert id(retired) not in engine.async_learner.outstanding
+        print(f"retire ({'learner running' if running else 'learner stopped'}, backlog {backlog}): "
+              f"terminal reward trained and harvested, brain detached")
+    engine.close()
+    print("OK")
@@ -0,0 +1,62 @@
+"""
+Histogram sketches vs exact statistics.
+
+Synthetic wealth distributions (uniform, lognormal, Pareto) are split across states and fed
+to the DistributionTracker. The binned Gini must be within 0.01 of the exact Gini over the
+sorted values. p10/p50/p90 must be within one log-spaced wealth bin (about 6%) of
+np.quantile. Per-state histograms must merge into exactly the national counts and means.
+The same bounds are checked for the engine's distribution_metrics() on a small world.
+"""
+import sys
+from types import SimpleNamespace
+import numpy as np
+
+sys.path.append("backend")
+from app.core.sketches import DistributionTracker
+from app.core.engine import SimulationEngine
+
+STATES = ["north", "south", "east"]
+
+def exact_gini(values):
+    values = np.sort(values)
+    n = len(values)
+    return float((2 * np.arange(1, n + 1) - n - 1) @ values / (n * values.sum()))
+
+def check(wealth, metrics, label):
+    quantiles = np.quantile(wealth, [0.1, 0.5, 0.9])
+    sketch = [metrics["wealth_p10"], metrics["wealth_median"], metrics["wealth_p90"]]
+    q_error = max(abs(s - q) / q for s, q in zip(sketch, quantiles))
+    g_error = abs(metrics["gini"] - exact_gini(wealth))
+    print(f"{label:>10} | gini {exact_gini(wealth):.3f} vs {metrics['gini']:.3f} | "
+          f"p10/p50/p90 {np.round(quantiles, 2).tolist()} vs {np.round(sketch, 2).tolist()} | max q error {q_error:.3f}")
+    assert g_error < 0.01 and q_error < 0.06, label
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 90000
+    samples = {
+        "uniform": rng.uniform(5, 15, n),
+        "lognormal": rng.lognormal(3.0, 1.2, n),
+        "pareto": (rng.pareto(1.5, n) + 1) * 10,
+    }
+    for label, wealth in samples.items():
+        groups = rng.integers(0, len(STATES), n)
+        citizens = [SimpleNamespace(state_id=STATES[g], wealth=w, trust_score=50.0, happiness=50.0)
+                    for g, w in zip(groups.tolist(), wealth.tolist())]
+        tracker = DistributionTracker()
+        tracker.update("v", 0, STATES, citizens)
+        check(wealth, tracker.metrics(), label)
+
+        national = tracker.national["wealth"]
+        parts = [tracker.by_state[s]["wealth"] for s in STATES]
+        assert np.array_equal(national.counts, sum(p.counts for p in parts)) and national.count == n
+        assert np.isclose(national.mean(), wealth.mean())
+        for g, state in enumerate(STATES):
+            assert np.isclose(tracker.by_state[state]["wealth"].mean(), wealth[groups == g].mean())
+
+    engine = SimulationEngine(citizens_per_state=300, persist=False)
+    for _ in range(5):
+        engine.advance()
+    wealth = np.array([a.wealth for a in engine.agents.values() if a.type == "citizen"])
+    check(wealth, engine.distribution_metrics(), "engine")
+    print("OK")
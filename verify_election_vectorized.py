@@ -0,0 +1,81 @@
+"""
+Vectorized elections vs the per-state baseline.
+
+The default two-candidate plurality race must keep the baseline odds: every voter perceives
+the incumbent's trust with uniform noise against one fixed challenger score. Incumbent win
+rates of the vectorized tally are compared with the scalar rule over many trials, and a
+ranked-choice race is checked to hand the seat to the majority's second choice.
+
+With several challengers, voters perceive every candidate with their own noise, so races
+drawn through `perceive` must split the challenger vote and let instant-runoff eliminate
+candidates (with fixed challenger scores the top challenger took every challenger vote).
+"""
+import random
+import sys
+import numpy as np
+
+sys.path.append("backend")
+from app.core.election import ElectionService
+from app.models.world import State
+
+VOTERS, TRIALS = 200, 2000
+
+def baseline_rate(service, trust):
+    wins = 0
+    for _ in range(TRIALS):
+        challenger = service.challenger_trust + random.uniform(-service.challenger_spread, service.challenger_spread)
+        perception = trust + service.rng.uniform(-service.perception_noise, service.perception_noise, VOTERS)
+        incumbent = np.count_nonzero(perception >= challenger)
+        wins += incumbent >= VOTERS - incumbent
+    return wins / TRIALS
+
+def vectorized_rate(service, trust):
+    voters = np.zeros(VOTERS, dtype=np.intp)
+    wins = 0
+    for _ in range(TRIALS):
+        scores = np.array([[trust, service.challenger_trust + service.rng.uniform(-service.challenger_spread,
+                                                                                  service.challenger_spread)]])
+        winners, _, _ = service.tally(service.perceive(scores, voters), voters, 1)
+        wins += winners[0] == 0
+    return wins / TRIALS
+
+if __name__ == "__main__":
+    random.seed(0)
+    service = ElectionService()
+    service.rng = np.random.default_rng(0)
+    print(f"{'trust':>5} | {'baseline':>8} | {'vectorized':>10}")
+    for trust in (40, 45, 50, 55, 60):
+        base, vec = baseline_rate(service, trust), vectorized_rate(service, trust)
+        print(f"{trust:>5} | {base:>8.3f} | {vec:>10.3f}")
+        assert abs(base - vec) < 0.05, f"incumbent odds changed at trust {trust}"
+
+    # 45% rank A first, 35% B, 20% C (whose voters prefer B): B wins the runoff, A the plurality
+    ranked = ElectionService(perception_noise=0.0)
+    voters = np.zeros(100, dtype=np.intp)
+    perceptions = np.array([[3, 2, 1]] * 45 + [[1, 3, 2]] * 35 + [[1, 2, 3]] * 20, dtype=np.float32)
+    plurality, _, _ = ranked.tally(perceptions, voters, 1, "plurality")
+    runoff, counts, rounds = ranked.tally(perceptions, voters, 1, "ranked_choice")
+    print(f"plurality winner {plurality[0]}, ranked-choice winner {runoff[0]} after {rounds[0]} rounds {counts[0].tolist()}")
+    assert plurality[0] == 0 and runoff[0] == 1 and rounds[0] == 2
+
+    # Four-way instant-runoff race through perceive: fixed challenger scores vs per-voter noise
+    scores = [49, 51, 50, 48]
+    _, fixed = ElectionService(challenger_noise=False).conduct_multi_candidate_election(scores, 10000, "ranked_choice")
+    _, noisy = ElectionService().conduct_multi_candidate_election(scores, 10000, "ranked_choice")
+    for label, race in (("fixed challenger scores", fixed), ("per-voter noise", noisy)):
+        print(f"4-way ranked choice, {label}: {race['candidate_votes']} after {race['rounds']} rounds")
+    assert np.count_nonzero(fixed["candidate_votes"][1:]) == 1 and fixed["rounds"] == 1
+    assert noisy["rounds"] > 1 and noisy["candidate_votes"].count(0) == noisy["rounds"] - 1
+
+    states = [State(id=f"s{i}", name=f"s{i}", population=300) for i in range(200)]
+    leaders = {s.id: ElectionService().create_new_leader(s.id) for s in states}
+    voters = np.repeat(np.arange(len(states)), 300)
+    print(f"{'national, 3 challengers':>26} | split challenger vote | runoff")
+    for label, service in (("fixed challenger scores", ElectionService(challenger_noise=False)), ("per-voter noise", ElectionService())):
+        plurality = service.conduct_national_election(states, leaders, voters, challengers=3).values()
+        split = np.mean([np.count_nonzero(d["candidate_votes"][1:]) > 1 for _, d in plurality])
+        ranked = service.conduct_national_election(states, leaders, voters, challengers=3, method="ranked_choice").values()
+        runoffs = np.mean([d["rounds"] > 1 for _, d in ranked])
+        print(f"{label:>26} | {split:>21.0%} | {runoffs:>6.0%}")
+    assert split > 0.5 and runoffs > 0
+    print("OK")
@@ -0,0 +1,38 @@
+"""
+Batched hybrid-ensemble voting vs the per-agent Counter vote it replaced.
+
+Every combination of four voters (strategic DQN + three scikit-learn models) over four
+actions is decided in one batch; the winner must match Counter.most_common, where ties
+go to the action voted by the earliest voter. 'Steal' (action 1) may additionally be
+reverted to 'Maintain' by the fuzzy morality constraint.
+"""
+import itertools
+import sys
+from collections import Counter
+import numpy as np
+
+sys.path.append("backend")
+from app.ml.brain_stack import HybridEnsemble
+
+class FixedVotes:
+    def __init__(self, votes):
+        self.votes = votes
+
+    def predict(self, states):
+        return self.votes
+
+if __name__ == "__main__":
+    combos = np.array(list(itertools.product(range(4), repeat=4)))
+    ensemble = HybridEnsemble(7, 4, background=False)
+    ensemble.models = [FixedVotes(combos[:, i]) for i in (1, 2, 3)]
+    states = np.random.default_rng(0).random((len(combos), 7))
+    actions = ensemble.decide_batch(states, combos[:, 0])
+
+    expected = np.array([Counter(c).most_common(1)[0][0] for c in combos.tolist()])
+    steal = expected == 1
+    mismatches = int((actions[~steal] != expected[~steal]).sum())
+    print(f"{len(combos)} vote combinations, {mismatches} mismatches, "
+          f"{int((actions[steal] == 0).sum())}/{int(steal.sum())} steals reverted by morality")
+    assert mismatches == 0
+    assert set(actions[steal].tolist()) <= {0, 1}
+    print("OK")
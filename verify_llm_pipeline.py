@@ -0,0 +1,78 @@
+"""
+Non-blocking LLM feedback pipeline against the local LLM stub (HTTP, on localhost).
+
+1. `request` returns at once while the stub takes its latency; the text arrives on a later poll.
+2. Requests queued together go to the backend as one batch.
+3. A repeated leader/context is answered from the cache; a new leader of the same state is not.
+4. A backend slower than the pipeline timeout resolves to a template response on poll.
+5. A failing backend (nothing listening) resolves to a template response as well.
+"""
+import sys
+import time
+
+sys.path.append("backend")
+from app.core.llm import FeedbackPipeline, HTTPFeedbackBackend, LLMFeedbackService
+from app.core.llm_stub import LocalLLMStub
+
+LATENCY = 0.3
+
+def info(state, leader="Leader A"):
+    return {"state_name": state, "leader_name": leader}
+
+def templates(context):
+    service = LLMFeedbackService()
+    return {t.format(**context) for t in service.complaint_templates + service.propaganda_templates}
+
+def wait_for(pipeline, count, timeout=5.0):
+    done, deadline = [], time.monotonic() + timeout
+    while len(done) < count and time.monotonic() < deadline:
+        done += pipeline.poll()
+        time.sleep(0.01)
+    return dict(done)
+
+if __name__ == "__main__":
+    stub = LocalLLMStub(latency=LATENCY).start()
+    pipeline = FeedbackPipeline(HTTPFeedbackBackend(stub.url), batch_window=0.1)
+
+    start = time.perf_counter()
+    immediate = pipeline.request("north", info("North"), False, 30.0)
+    returned = time.perf_counter() - start
+    assert immediate is None and returned < 0.05 and pipeline.poll() == []
+    done = wait_for(pipeline, 1)
+    arrived = time.perf_counter() - start
+    north = done["north"]
+    assert north in templates(info("North")) and arrived >= LATENCY
+    print(f"non-blocking: request returned in {returned * 1000:.1f}ms, text arrived on a poll after {arrived:.2f}s")
+
+    batches = stub.batches_served
+    for i in range(6):
+        pipeline.request(i, info(f"State {i}"), i % 2 == 0, 50.0)
+    done = wait_for(pipeline, 6)
+    assert len(done) == 6 and stub.batches_served == batches + 1
+    print(f"batching: 6 requests served in {stub.batches_served - batches} backend call")
+
+    hits = pipeline.stats["cache_hits"]
+    cached = pipeline.request("again", info("North"), False, 35.0)
+    successor = pipeline.request("successor", info("North", leader="Leader B"), False, 35.0)
+    # 30 and 35 fall in the same sentiment bucket
+    assert cached == north and pipeline.stats["cache_hits"] == hits + 1 and successor is None
+    wait_for(pipeline, 1)
+    print(f"cache: repeated leader/context answered at once ({pipeline.stats['cache_hits']} hits), new leader queued")
+    pipeline.close()
+
+    stub.latency = 2.0
+    slow = FeedbackPipeline(HTTPFeedbackBackend(stub.url), timeout=0.3)
+    slow.request("late", info("East"), True, 80.0)
+    done = wait_for(slow, 1)
+    assert done["late"] in templates(info("East")) and slow.stats["timeouts"] == 1 and not slow.cache
+    print(f"timeout: template response after {slow.timeout}s, not cached")
+    slow.close()
+    stub.stop()
+
+    broken = FeedbackPipeline(HTTPFeedbackBackend(stub.url, timeout=1.0))
+    broken.request("down", info("West"), False, 10.0)
+    done = wait_for(broken, 1)
+    assert done["down"] in templates(info("West")) and broken.stats["fallbacks"] == 1 and not broken.cache
+    print(f"backend error: template response, {broken.stats['fallbacks']} fallback batch")
+    broken.close()
+    print("OK")
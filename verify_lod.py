@@ -0,0 +1,95 @@
+"""
+Level-of-detail check: collapse happens at realistic world sizes, is lossless, and the
+aggregate rules stay close to the individual ones.
+
+LOD region and cohort sizes are derived from the population, so rule-based citizens form
+cohorts even at the default 50 citizens per state. For each population:
+- collapsing and re-materializing every cohort must preserve the population averages exactly;
+- each cohort, advanced for a few budget cycles with the aggregate economy rules, must end
+  within 5% (wealth) and 10 points (happiness, trust) of its own members advanced one by one
+  with the individual rules; the remaining gap comes from individuals clamped at 0 or 100;
+- tick times and the mean collapsed share of the LOD world are reported next to a fully
+  individual world of the same size.
+"""
+import copy
+import sys
+import time
+import numpy as np
+
+sys.path.append("backend")
+from app.core.engine import SimulationEngine
+from app.models.agents import AgentType
+
+WARMUP, TICKS, CYCLES, REPEATS = 30, 10, 10, 200
+FIELDS = ["avg_wealth", "avg_happiness", "avg_trust"]
+
+def run(engine, ticks):
+    """Mean tick time, and for LOD worlds the mean number of collapsed citizens after each tick."""
+    start, collapsed = time.perf_counter(), 0
+    for _ in range(ticks):
+        engine.advance()
+        collapsed += engine.lod.population if engine.lod else 0
+    return (time.perf_counter() - start) / ticks, collapsed / ticks
+
+def same_stats(a, b):
+    return all(np.isclose(a[f], b[f], rtol=1e-9, atol=1e-9) for f in FIELDS)
+
+def economy_error(engine, cohort, action):
+    """
+    Wealth (relative) and happiness/trust (points) gap between a cohort and its members after
+    CYCLES budgets. The members run REPEATS times side by side (with REPEATS times the budget,
+    so per-citizen shares match) to average out the individual rules' dice.
+    """
+    economy = engine.economy_service
+    leader = copy.deepcopy(next(a for a in engine.agents.values() if a.type == AgentType.LEADER))
+    leader.last_action, leader.wealth = action, 0.0
+    aggregate = copy.deepcopy(cohort)
+    members = [c for _ in range(REPEATS) for c in cohort.materialize()]
+    for _ in range(CYCLES):
+        leader.budget_allocated = 1000.0 / engine.num_states
+        economy.process_state_economy(leader, [], engine.inflation_rate, engine.unemployment_rate, [aggregate])
+        leader.budget_allocated *= REPEATS
+        economy.process_state_economy(leader, members, engine.inflation_rate, engine.unemployment_rate)
+    wealth = np.mean([c.wealth for c in members])
+    return (abs(aggregate.mean_of("wealth") - wealth) / wealth,
+            abs(aggregate.mean_of("happiness") - np.mean([c.happiness for c in members])),
+            abs(aggregate.mean_of("trust_score") - np.mean([c.trust_score for c in members])))
+
+if __name__ == "__main__":
+    print(f"{'pop/state':>9} | {'region':>6} | {'min':>3} | {'collapsed':>9} | {'cohorts':>7} | {'tick full':>9} | "
+          f"{'tick LOD':>8} | wealth err | happiness/trust err")
+    for citizens_per_state in (50, 150):
+        full = SimulationEngine(citizens_per_state=citizens_per_state, persist=False)
+        lod = SimulationEngine(citizens_per_state=citizens_per_state, persist=False, lod=True)
+        run(full, WARMUP)
+        run(lod, WARMUP)
+        (full_tick, _), (lod_tick, collapsed) = run(full, TICKS), run(lod, TICKS)
+        citizens = citizens_per_state * lod.num_states
+        assert collapsed > 0, f"nothing collapsed at {citizens_per_state} citizens per state"
+        # Disinformation campaigns re-materialize whole regions, so cohorts can be gone at any one tick
+        for _ in range(WARMUP):
+            if lod.lod.cohorts:
+                break
+            lod.advance()
+        cohorts = list(lod.lod.cohorts.values())
+        assert cohorts, f"no cohorts left at {citizens_per_state} citizens per state"
+
+        errors = np.array([economy_error(lod, cohort, action) for cohort in cohorts for action in range(4)])
+        wealth_error, points_error = errors[:, 0].max(), errors[:, 1:].max()
+
+        # Materializing every cohort and collapsing the same citizens again keeps the averages
+        before = lod._citizen_stats()
+        lod._materialize(list(lod.lod.cohorts))
+        assert same_stats(before, lod._citizen_stats())
+        tick = lod.scheduler.current_tick
+        lod._phase_lod_collapse(tick + 10, {}, None)
+        lod._phase_lod_collapse(tick + 20, {}, None)
+        assert same_stats(before, lod._citizen_stats())
+
+        print(f"{citizens_per_state:>9} | {lod.lod.region_size:>6.0f} | {lod.lod.min_cohort:>3} | "
+              f"{collapsed:>4.0f}/{citizens:<4} | {len(cohorts):>7} | {full_tick * 1000:>7.0f}ms | {lod_tick * 1000:>6.0f}ms | "
+              f"{wealth_error:>10.3f} | {points_error:.2f}")
+        assert wealth_error < 0.05 and points_error < 10.0, "cohort economy drifted from its members"
+        lod.close()
+        full.close()
+    print("OK")
@@ -0,0 +1,83 @@
+"""
+Mean-field influence mode vs the dense radius model.
+
+1. Random citizens are propagated once with InfluenceService(mode="mean_field"). The reference
+   takes every citizen's exact neighbourhood (within influence_radius) from a dense N x N
+   distance matrix and applies the same update. Trust must stay within 1 point of it on
+   average, and ideology within 0.02.
+2. error_report must shrink as cells get finer, and agree with the dense neighbour means.
+3. GET /influence/error must serve the report for a mean-field world, and 404 otherwise.
+"""
+import copy
+import sys
+import numpy as np
+
+sys.path.append("backend")
+from fastapi.testclient import TestClient
+from app.api import simulation
+from app.core.engine import SimulationEngine
+from app.core.mean_field import MeanFieldGrid, error_report
+from app.core.social import InfluenceService
+from app.main import app
+from app.models.agents import CitizenAgent
+
+N = 3000
+
+def citizens(rng):
+    return [CitizenAgent(id=f"c{i}", state_id="s", honesty=0.5, greed=0.5, competence=0.5,
+                         x=float(rng.uniform(0, 800)), y=float(rng.uniform(0, 600)),
+                         trust_score=float(rng.uniform(0, 100)), ideology=rng.uniform(-1, 1, 2).tolist(),
+                         education=float(rng.random()), memory_decay=float(rng.uniform(0, 0.1)))
+            for i in range(N)]
+
+def dense_means(x, y, values, radius):
+    distance = np.hypot(x[:, None] - x[None, :], y[:, None] - y[None, :])
+    neighbours = (distance < radius) & ~np.eye(len(x), dtype=bool)
+    counts = neighbours.sum(axis=1)
+    return neighbours @ values / np.maximum(counts, 1)[:, None], counts
+
+def dense_step(people, radius, base_learning_rate=0.1):
+    x, y = np.array([c.x for c in people]), np.array([c.y for c in people])
+    values = np.array([[c.trust_score, *c.ideology] for c in people])
+    means, counts = dense_means(x, y, values, radius)
+    education = np.array([c.education for c in people])
+    susceptibility = np.where(counts > 0, np.clip(base_learning_rate / (education + 0.1), 0.0, 0.5), 0.0)
+    trust = values[:, 0] + susceptibility * (means[:, 0] - values[:, 0])
+    trust = np.clip(trust * (1.0 - np.array([c.memory_decay for c in people]) * 0.1), 0, 100)
+    ideology = np.clip(values[:, 1:] + 0.5 * susceptibility[:, None] * (means[:, 1:] - values[:, 1:]), -1.0, 1.0)
+    return trust, ideology
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    service = InfluenceService(mode="mean_field")
+    people = citizens(rng)
+    before = copy.deepcopy(people)
+    service.propagate_influence(people)
+    expected_trust, expected_ideology = dense_step(before, service.influence_radius)
+    trust_error = np.abs(np.array([c.trust_score for c in people]) - expected_trust).mean()
+    ideology_error = np.abs(np.array([c.ideology for c in people]) - expected_ideology).mean()
+    print(f"one step, {N} citizens, 10-unit cells: mean |error| vs dense trust {trust_error:.3f}, ideology {ideology_error:.4f}")
+    assert trust_error < 1.0 and ideology_error < 0.02
+
+    x, y = np.array([c.x for c in before]), np.array([c.y for c in before])
+    values = np.array([[c.trust_score, *c.ideology] for c in before])
+    dense, counts = dense_means(x, y, values, service.influence_radius)
+    trust_mae = []
+    for cell_size in (40.0, 20.0, 10.0, 5.0):
+        grid = MeanFieldGrid(cell_size=cell_size)
+        report = error_report(grid, x, y, values, service.influence_radius, max_exact=N)
+        approx, _ = grid.neighbour_mean(x, y, values, service.influence_radius)
+        trust_mae.append(report["fields"]["dim_0"]["mae"])
+        print(f"cell {cell_size:>4.0f}: trust neighbour-mean MAE {trust_mae[-1]:.3f}, "
+              f"neighbour count MAE {report['neighbour_count_mae']:.2f}")
+        assert np.isclose(trust_mae[-1], np.abs(approx[:, 0] - dense[:, 0])[counts > 0].mean())
+    assert trust_mae == sorted(trust_mae, reverse=True)
+
+    simulation.simulation_instance = SimulationEngine(citizens_per_state=20, persist=False, influence_mode="mean_field")
+    client = TestClient(app)
+    report = client.get("/api/simulation/influence/error?cell_size=20").json()
+    assert report["cell_size"] == 20.0 and set(report["fields"]) == {"trust", "ideology_economic", "ideology_social"}
+    simulation.simulation_instance = SimulationEngine(citizens_per_state=20, persist=False)
+    assert client.get("/api/simulation/influence/error").status_code == 404
+    print(f"GET /influence/error: trust MAE {report['fields']['trust']['mae']:.3f} on {report['agents']} citizens; 404 in proximity mode")
+    print("OK")
@@ -0,0 +1,59 @@
+"""
+Memory accounting and budget enforcement.
+
+1. sizeof must count NumPy buffers, tensors and module parameters by their real byte size,
+   and count an object reachable twice only once, including a buffer shared by NumPy views.
+2. A small world with tight replay_buffers and event_feed budgets runs past its memory check.
+   The check must cut the replay capacity, drop unpersisted events, record the enforcements
+   and leave the world ticking.
+3. GET /memory must report every registered subsystem with its budget and the enforcements.
+"""
+import sys
+import numpy as np
+import torch
+
+sys.path.append("backend")
+from fastapi.testclient import TestClient
+from app.api import simulation
+from app.core.engine import SimulationEngine
+from app.core.memory import MB, sizeof
+from app.main import app
+
+if __name__ == "__main__":
+    array = np.zeros(MB // 8)
+    tensor = torch.zeros(MB // 4)
+    layer = torch.nn.Linear(256, 256)
+    assert MB <= sizeof(array) < MB + 1024 and MB <= sizeof(tensor) < MB + 1024
+    assert sizeof(layer) >= (256 * 256 + 256) * 4
+    assert sizeof([array, array, {"again": array}]) < sizeof(array) + 1024
+    print(f"sizeof: 1 MB array {sizeof(array)}, 1 MB tensor {sizeof(tensor)}, array listed thrice {sizeof([array, array, {'again': array}])}")
+    views = [array[:1024], array[::2], array.reshape(2, -1)]
+    assert sizeof(views) < sizeof(array) + 1024 and sizeof([array, views]) < sizeof(array) + 1024
+    assert sizeof(array[:1024].copy()) < 16 * 1024
+    print(f"sizeof: three views of the 1 MB array {sizeof(views)}, array and its views {sizeof([array, views])}")
+
+    budgets = {"replay_buffers": 4 * 1024, "event_feed": 4 * 1024}
+    engine = SimulationEngine(citizens_per_state=20, persist=False, memory_budgets=budgets, memory_check_every=10)
+    capacity = engine.memory.measure()["replay_buffers"]["capacity"]
+    for _ in range(20):
+        engine.advance()
+    replay = engine.memory.measure()["replay_buffers"]
+    actions = list(engine.memory.enforcements)
+    shrunk = {action["subsystem"] for action in actions}
+    for action in actions:
+        print(f"  tick {action['tick']}: {action['subsystem']} {action['before']} -> {action['after']}: {action['action']}")
+    assert shrunk == set(budgets)
+    # Young replay memories hold few transitions: the budget caps their capacity instead
+    print(f"replay capacity {capacity} -> {replay['capacity']} transitions ({replay['transitions']} held)")
+    assert replay["capacity"] < capacity
+    assert all(action["after"] < action["before"] for action in actions if action["subsystem"] == "event_feed")
+    assert engine.get_state()["tick"] == 20
+
+    simulation.simulation_instance = engine
+    report = TestClient(app).get("/api/simulation/memory").json()
+    assert set(engine.memory.subsystems) <= set(report["subsystems"])
+    assert all(report["subsystems"][name]["budget"] == budget for name, budget in budgets.items())
+    assert len(report["enforcements"]) == len(actions) and report["accounted"] > 0
+    print(f"GET /memory: {len(report['subsystems'])} subsystems, {report['accounted']} bytes accounted, "
+          f"rss {report['process']['rss']}")
+    print("OK")
@@ -0,0 +1,47 @@
+"""
+ETag / 304 check for the cached read endpoints.
+
+Against the app in-process on a small in-memory world: repeated GET /state at one world
+version must serve identical cached bytes with a stable ETag, and a request carrying that
+ETag in If-None-Match must get an empty 304. After a tick the ETag must change and the old
+tag must no longer match. Each format and query shape gets its own ETag.
+"""
+import sys
+
+sys.path.append("backend")
+from fastapi.testclient import TestClient
+from app.api import simulation
+from app.core.engine import SimulationEngine
+from app.core.response_cache import ResponseCache
+from app.main import app
+
+if __name__ == "__main__":
+    simulation.simulation_instance = SimulationEngine(citizens_per_state=10, persist=False)
+    simulation.response_cache = cache = ResponseCache()
+    client = TestClient(app)
+
+    first = client.get("/api/simulation/state")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+    again = client.get("/api/simulation/state")
+    assert again.headers["etag"] == etag and again.content == first.content and cache.hits == 1
+
+    revalidated = client.get("/api/simulation/state", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b"" and revalidated.headers["etag"] == etag
+    print(f"GET /state: 200 with ETag {etag}, then cache hit, then 304 on If-None-Match")
+
+    packed = client.get("/api/simulation/state", headers={"Accept": "application/msgpack"})
+    projected = client.get("/api/simulation/state?fields=wealth")
+    assert len({etag, packed.headers["etag"], projected.headers["etag"]}) == 3
+    assert client.get("/api/simulation/state?fields=wealth", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/api/simulation/tick")
+    stale = client.get("/api/simulation/state", headers={"If-None-Match": etag})
+    assert stale.status_code == 200 and stale.headers["etag"] != etag
+    assert stale.json()["tick"] == first.json()["tick"] + 1
+    print(f"after a tick: 200 with ETag {stale.headers['etag']}")
+
+    map_etag = client.get("/api/simulation/map?level=2").headers["etag"]
+    assert client.get("/api/simulation/map?level=2", headers={"If-None-Match": map_etag}).status_code == 304
+    print(f"cache stats: {cache.stats()}")
+    print("OK")
@@ -0,0 +1,77 @@
+"""
+Session manager check: LRU eviction to disk and transparent reload.
+
+With room for one resident world, working on a second session must snapshot the first
+to disk. The next call on the first session reloads it at the tick where it stopped,
+with the same citizens. Idle sessions are evicted by `evict_idle`, and worlds over the
+agent limit are refused. Boolean options parse "false"/"0" as False and reject anything
+that is not a boolean; worlds past `warn_agents` keep ticking and count warnings.
+"""
+import os
+import sys
+import tempfile
+
+sys.path.append("backend")
+from app.core.sessions import SessionManager, parse_bool
+
+CONFIG = {"num_states": 2, "citizens_per_state": 10}
+
+def citizen_wealth(engine):
+    return {a.id: a.wealth for a in engine.agents.values() if a.type == "citizen"}
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        manager = SessionManager(max_resident=1, idle_timeout=0.0, snapshot_dir=snapshot_dir, max_agents=100)
+        first = manager.create(CONFIG).result()["id"]
+        manager.tick(first, steps=3).result()
+
+        second = manager.create(CONFIG).result()["id"]
+        manager.tick(second).result()
+        evicted = manager.get(first)
+        assert not evicted.resident and evicted.evictions == 1
+        assert os.path.exists(manager._path(first))
+        print(f"session {first} evicted to disk ({evicted.snapshot_bytes} bytes) when {second} was used")
+
+        result = manager.tick(first).result()
+        reloaded = manager.get(first)
+        assert reloaded.resident and reloaded.loads == 2 and not os.path.exists(manager._path(first))
+        assert result["state"]["tick"] == 4, result["state"]["tick"]
+        assert not manager.get(second).resident
+        print(f"session {first} reloaded at tick {result['state']['tick']}, {second} evicted in turn")
+
+        # Reload without ticking: the snapshot holds exactly the world as it was evicted
+        wealth = manager.submit(first, citizen_wealth).result()
+        manager.evict(reloaded)
+        assert manager.submit(first, citizen_wealth).result() == wealth
+
+        assert manager.evict_idle() == 1 and not any(s.resident for s in manager.sessions.values())
+        print("idle sessions evicted")
+
+        try:
+            manager.create({"num_states": 3, "citizens_per_state": 50})
+            raise AssertionError("oversized session accepted")
+        except ValueError as e:
+            print(f"oversized session refused: {e}")
+
+        config = manager.validate({**CONFIG, "lod": "false", "prioritized_replay": "0", "warm_start_leaders": "Yes",
+                                   "election_challenger_noise": 1})
+        assert config == {**CONFIG, "lod": False, "prioritized_replay": False, "warm_start_leaders": True,
+                          "election_challenger_noise": True}
+        for bad in ("maybe", 2, None):
+            try:
+                manager.validate({**CONFIG, "lod": bad})
+                raise AssertionError(f"lod={bad!r} accepted")
+            except ValueError:
+                pass
+        assert parse_bool(False) is False and parse_bool(" TRUE ") is True
+        print("boolean options: 'false'/'0' -> False, 'Yes'/1 -> True, 'maybe'/2/None refused")
+        manager.shutdown()
+
+        watched = SessionManager(snapshot_dir=snapshot_dir, max_agents=100, warn_agents=5)
+        session_id = watched.create(CONFIG).result()["id"]
+        results = [watched.tick(session_id, steps=2).result() for _ in range(2)]
+        stats = watched.get(session_id).stats()
+        assert [r["steps"] for r in results] == [2, 2] and stats["agent_warnings"] == 2 and watched.stats()["warn_agents"] == 5
+        print(f"{stats['agents']} agents over a warning threshold of 5: ticked on, {stats['agent_warnings']} warnings")
+        watched.shutdown()
+    print("OK")
@@ -0,0 +1,52 @@
+"""
+Convergence check for the vectorized tabular Q-learner.
+
+Many citizens share one Q-table, so a batch routinely holds dozens of updates for the
+same (state, action) cell. With a fixed terminal reward the cell must converge to that
+reward from below, whatever the crowd size, and a per-agent table must reach the same value.
+Per-agent tables saved by a smaller learner must load into a larger one without breaking
+its slots: saved tables are restored, the remaining slots start from zero and keep learning.
+"""
+import os
+import sys
+import tempfile
+import numpy as np
+
+sys.path.append("backend")
+from app.ml.learner import VectorizedQLearner
+
+def train(learner, slots, reward=1.0, updates=100):
+    n = len(slots)
+    curve = []
+    for _ in range(updates):
+        learner.learn(slots, np.zeros(n, dtype=int), np.zeros(n, dtype=int), np.full(n, reward),
+                      np.zeros(n, dtype=int), np.ones(n, dtype=bool))
+        curve.append(float(learner.q[0, 0, 0]))
+    return curve
+
+if __name__ == "__main__":
+    for agents in (1, 10, 50, 500):
+        curve = train(VectorizedQLearner(shared=True), np.arange(agents))
+        monotone = all(b >= a for a, b in zip(curve, curve[1:]))
+        print(f"shared table, {agents:>3} agents per cell: Q after 10/100 updates = {curve[9]:.3f} / {curve[-1]:.3f}")
+        assert monotone and max(curve) <= 1.0 + 1e-6, f"shared update overshoots with {agents} agents"
+        assert abs(curve[-1] - 1.0) < 1e-3
+
+    learner = VectorizedQLearner(shared=False, capacity=8)
+    slots = np.array([learner.allocate() for _ in range(8)])
+    train(learner, slots)
+    print(f"per-agent tables: Q = {learner.q[slots, 0, 0].round(3).tolist()}")
+    assert np.allclose(learner.q[slots, 0, 0], 1.0, atol=1e-3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "q_table.npy")
+        learner.save(path)
+        larger = VectorizedQLearner(shared=False, capacity=32)
+        slots = np.array([larger.allocate() for _ in range(32)])
+        larger.load(path)
+        assert larger.q.shape[0] == 32 and np.array_equal(larger.q[:8], learner.q)
+        assert not larger.q[8:].any()
+        train(larger, slots)
+        print(f"8 saved tables loaded into 32 slots: all slots trained to {larger.q[slots, 0, 0].min():.3f}+")
+        assert np.allclose(larger.q[slots, 0, 0], 1.0, atol=1e-3)
+    print("OK")